@@ -48,9 +48,26 @@ import logging         # For session logging
 import os              # For file operations
 from pathlib import Path  # For file path handling
 from datetime import datetime  # For timestamps
+import cv2             # For decoding received video frames
+import numpy as np     # For wrapping frame bytes for the decoder
 from PyQt6.QtWidgets import QApplication  # Qt GUI framework
 from PyQt6.QtCore import QObject, pyqtSignal, QTimer  # Qt signals for thread-safe UI updates
 from ui.main_window import EnhancedMainWindow  # Main application window
+from media import (MEDIA_HEADER, MEDIA_HEADER_SIZE, STREAM_VIDEO, STREAM_AUDIO,
+                   MIXED_AUDIO_STREAM_ID, MAX_UDP_PAYLOAD, FLAG_CACHED_FRAME, media_timestamp,
+                   next_sequence, pack_media_header)  # UDP wire format
+from media import AUDIO_CODEC_PREFERENCE, get_audio_codec  # Audio compression
+from media import AdaptiveJitterBuffer  # Audio playout buffering
+from media import ALL_VIDEO_LAYERS, VIDEO_LAYER_MASK, video_layer_for_tile  # Simulcast video layers
+from media import REPORT_INTERVAL, VideoReceiveStats, VideoRateController  # Video feedback loop
+from media import VIDEO_CHANGE_THRESHOLD, FrameChangeDetector  # Skip unchanged camera frames
+from media import StageTimings, DecodePool  # Camera pipeline timings, video decode workers
+from media import ScreenTileEncoder, pack_screen_frame, parse_screen_frame  # Dirty-tile screen sharing
+from media import TCP_BINARY_FLAG, TCP_LENGTH_MASK, tcp_length_prefix  # Binary TCP frames
+from media import (FRAGMENT_HEADER, FRAGMENT_HEADER_SIZE, MAX_DATAGRAM_SIZE, FrameReassembler,
+                   iter_fragments)  # Video frames as MTU-sized fragments
+from media import (AUDIO_SAMPLE_RATES, DEFAULT_SAMPLE_RATE, DEFAULT_FRAME_MS,
+                   frame_samples)  # Negotiated audio format
 
 # Try to import msgpack for efficient binary serialization (fallback to JSON)
 try:
@@ -62,6 +79,10 @@ except ImportError:
     print("⚠️  msgpack not available, falling back to JSON")
     USE_MSGPACK = False
 
+def decode_video_frame(data):
+    """JPEG bytes -> BGR image, or None if undecodable (runs on decode workers)"""
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
 """
 ===================================================================================
 SIGNAL CLASS FOR THREAD-SAFE UI UPDATES
@@ -76,12 +97,12 @@ class StreamSignals(QObject):
     updated from the main thread. These signals bridge the gap safely.
     
     SIGNALS:
-    - video_received: Emitted when video frame arrives (client_id, frame_data)
-    - audio_received: Emitted when audio packet arrives (client_id, audio_data)
+    - video_received: Emitted when a video frame has been decoded (client_id, BGR image)
+    - screen_update: Emitted when a screen sharing update arrives (presenter_id, update)
     - message_received: Emitted when TCP message arrives (message_dict)
     """
-    video_received = pyqtSignal(str, bytes)  # (client_id, video_data)
-    audio_received = pyqtSignal(object, bytes)  # (client_id, audio_data)
+    video_received = pyqtSignal(str, object)  # (client_id, decoded numpy image)
+    screen_update = pyqtSignal(str, object)  # (presenter_id, {'width', 'height', 'full', 'tiles'})
     message_received = pyqtSignal(dict)  # (message_dictionary)
 
 """
@@ -106,7 +127,7 @@ class OptimizedConferenceClient:
     - Video Capture Thread: Captures camera frames and sends via UDP
     """
     
-    def __init__(self):
+    def __init__(self, video_change_threshold=VIDEO_CHANGE_THRESHOLD):
         """
         Initialize the conference client.
         
@@ -114,6 +135,9 @@ class OptimizedConferenceClient:
         - tcp_socket: TCP connection to server (reliable messaging)
         - udp_socket: UDP socket for media streaming (low latency)
         - server_address: (IP, UDP_port) tuple for UDP packets
+        
+        video_change_threshold: cell luma change (0-255) below which a camera
+        frame counts as unchanged and is not sent (see media/motion.py)
         """
         # Network sockets (initialized when connecting)
         self.tcp_socket = None  # TCP socket for reliable communication
@@ -123,6 +147,25 @@ class OptimizedConferenceClient:
         # User and session information
         self.username = None  # User's display name
         self.client_id = None  # Unique identifier assigned by server
+        self.stream_id = None  # 32-bit UDP stream ID assigned by server
+        self.stream_clients = {}  # stream_id -> client_id of other participants
+        self.video_subscription = None  # client_ids whose video we last asked the server for
+        self.video_layers = ALL_VIDEO_LAYERS  # Simulcast layers to encode (the server narrows this)
+        self.video_bandwidth_kbps = None  # Downlink video budget declared to the server (None = unlimited)
+        self.video_receive_stats = VideoReceiveStats()  # Loss/jitter/bitrate per sender, for receiver reports
+        self.video_rate = VideoRateController()  # Camera quality/resolution/fps from 'video_feedback'
+        self.video_change = FrameChangeDetector(video_change_threshold)  # Static-scene gate for the camera
+        self.video_timings = StageTimings()  # Camera capture/encode/preview times (UI pipeline threads)
+        self.next_receiver_report = 0.0
+        self.tcp_send_lock = threading.Lock()  # Keeps concurrent framed messages from interleaving
+        self.udp_sequence = {}  # stream type -> last sequence number sent
+        self.audio_codec = get_audio_codec(None)  # Negotiated at join (pcm16 until then)
+        self.audio_playout = AdaptiveJitterBuffer()  # Filled by the UDP thread, drained by the UI's audio output
+        self.capture_rates = list(AUDIO_SAMPLE_RATES)  # Rates the sound card supports (set by the UI)
+        self.requested_audio_format = {'sample_rate': DEFAULT_SAMPLE_RATE,
+                                       'frame_ms': DEFAULT_FRAME_MS}  # Asked for when creating a meeting
+        self.audio_rate = DEFAULT_SAMPLE_RATE  # Negotiated capture/playback rate
+        self.audio_frame_ms = DEFAULT_FRAME_MS  # Negotiated frame duration
         self.meeting_code = None  # 6-character meeting code
         self.is_host = False  # Whether this client is the meeting host
         self.connected = False  # Connection status
@@ -135,6 +178,10 @@ class OptimizedConferenceClient:
         # Screen sharing state
         self.current_presenter = None  # Who is currently presenting
         self.is_presenting = False  # Whether this client is presenting
+        self.screen_tiles = ScreenTileEncoder()  # Finds changed regions of our shared screen
+        self.screen_sequence = 0  # Sequence number of the last screen update sent
+        self.screen_received_seq = None  # Sequence number of the last update received
+        self.screen_refresh_asked = None  # When we last asked for a screen refresh
         
         # UI reference
         self.ui = None  # Will be set to main window
@@ -150,6 +197,11 @@ class OptimizedConferenceClient:
         # Reason: Reusing buffers reduces memory allocation overhead
         self.tcp_send_buffer = bytearray(65536)  # 64KB buffer for TCP messages
         self.udp_send_buffer = bytearray(65536)  # 64KB buffer for UDP packets
+        self.video_send_buffer = bytearray(MAX_DATAGRAM_SIZE)  # One video fragment (camera encoder thread only)
+        self.video_frame_id = 0  # Frame ID carried by every fragment of a video frame
+        self.video_reassembler = FrameReassembler()  # Incoming fragments -> frames (UDP thread only)
+        self.video_decoder = DecodePool(decode_video_frame,
+                                        self.signals.video_received.emit)  # Frames -> images, newest per sender
         
         # Background threads for network operations
         self.tcp_thread = None  # Thread for receiving TCP messages
@@ -196,7 +248,7 @@ class OptimizedConferenceClient:
     def set_ui(self, ui):
         self.ui = ui
         self.signals.video_received.connect(ui.handle_video_stream)
-        self.signals.audio_received.connect(ui.handle_audio_stream)
+        self.signals.screen_update.connect(ui.handle_screen_update)
         self.signals.message_received.connect(ui.handle_server_message)
 
     def set_server(self, ip, port):
@@ -272,6 +324,41 @@ class OptimizedConferenceClient:
             print(f"Data starts with: {data[:10].hex() if len(data) >= 10 else data.hex()}")
             raise ValueError("Could not deserialize message with any format")
         
+    def _follow_redirect(self, response, message_data):
+        """
+        Reconnect to the worker process named in a 'redirect' response.
+        
+        PURPOSE: A server started with --workers shards meetings across processes.
+        Its front door only answers the first create/join request with the
+        worker's ports; the same request is then resent to that worker, and
+        media is streamed to the worker's UDP port.
+        """
+        worker_tcp_port = response['tcp_port']
+        worker_udp_port = response.get('udp_port', worker_tcp_port + 1)
+        self.logger.info(f'Redirected to worker at {self.server_ip}:{worker_tcp_port}')
+        
+        try:
+            self.tcp_socket.close()
+        except:
+            pass
+        
+        self.tcp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.tcp_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.tcp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.tcp_socket.connect((self.server_ip, worker_tcp_port))
+        self.server_address = (self.server_ip, worker_udp_port)
+        
+        self.tcp_socket.send(message_data)
+        response_data = self.tcp_socket.recv(4096)
+        if not response_data:
+            raise ConnectionError("No response from worker")
+        
+        try:
+            return self._deserialize_message(response_data)
+        except (json.JSONDecodeError, ValueError) as e:
+            print(f"Failed to parse worker response: {e}")
+            raise ConnectionError("Invalid response from worker")
+    
     def create_meeting(self, username):
         """
         Create a new meeting by connecting to the server.
@@ -345,6 +432,7 @@ class OptimizedConferenceClient:
             
             # SO_REUSEADDR for UDP
             self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._size_udp_receive_buffer()
             
             # Bind to any available port (0 = OS chooses port)
             # 0.0.0.0 = listen on all network interfaces
@@ -360,7 +448,13 @@ class OptimizedConferenceClient:
             # SEND CREATE MEETING REQUEST (TCP)
             # ========================================================================
             # Serialize message to JSON format
-            message_data = self._serialize_message({'type': 'create_meeting', 'username': username})
+            message_data = self._serialize_message({
+                'type': 'create_meeting',
+                'username': username,
+                'audio_codecs': list(AUDIO_CODEC_PREFERENCE),
+                'audio_format': dict(self.requested_audio_format),
+                'capture_rates': self.capture_rates
+            })
             
             # Send via TCP (guaranteed delivery)
             # TCP ensures this message arrives at server correctly
@@ -378,11 +472,21 @@ class OptimizedConferenceClient:
                 print(f"Raw response: {response_data}")
                 raise ConnectionError("Invalid response from server")
             
+            if response['type'] == 'redirect':
+                response = self._follow_redirect(response, message_data)
+            
             if response['type'] == 'meeting_created':
                 self.connected = True
                 self.running = True
                 self.meeting_code = response['meeting_code']
                 self.client_id = response['client_id']
+                self.stream_id = response['stream_id']
+                self.stream_clients = {}
+                self.video_subscription = None
+                self.video_layers = ALL_VIDEO_LAYERS
+                self.video_receive_stats = VideoReceiveStats()
+                self.video_rate = VideoRateController()
+                self._apply_audio_settings(response)
                 self.is_host = response['is_host']
                 
                 self.logger.info('='*80)
@@ -427,6 +531,7 @@ class OptimizedConferenceClient:
             # Create UDP socket
             self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._size_udp_receive_buffer()
             self.udp_socket.bind(('0.0.0.0', 0))
             
             self.server_address = (self.server_ip, self.tcp_port + 1)
@@ -436,7 +541,9 @@ class OptimizedConferenceClient:
             message_data = self._serialize_message({
                 'type': 'join_meeting',
                 'username': username,
-                'meeting_code': meeting_code
+                'meeting_code': meeting_code,
+                'audio_codecs': list(AUDIO_CODEC_PREFERENCE),
+                'capture_rates': self.capture_rates
             })
             self.tcp_socket.send(message_data)
             
@@ -452,11 +559,24 @@ class OptimizedConferenceClient:
                 print(f"Raw response: {response_data}")
                 raise ConnectionError("Invalid response from server")
             
+            if response['type'] == 'redirect':
+                response = self._follow_redirect(response, message_data)
+            
             if response['type'] == 'join_success':
                 self.connected = True
                 self.running = True
                 self.meeting_code = response['meeting_code']
                 self.client_id = response['client_id']
+                self.stream_id = response['stream_id']
+                self.stream_clients = {
+                    p['stream_id']: p['client_id'] for p in response.get('participants', [])
+                    if p['client_id'] != self.client_id
+                }
+                self.video_subscription = None
+                self.video_layers = ALL_VIDEO_LAYERS
+                self.video_receive_stats = VideoReceiveStats()
+                self.video_rate = VideoRateController()
+                self._apply_audio_settings(response)
                 self.is_host = response['is_host']
                 
                 # Start background threads
@@ -481,35 +601,38 @@ class OptimizedConferenceClient:
         while self.running:
             try:
                 # Read message length
-                length_bytes = b''
-                while len(length_bytes) < 4 and self.running:
-                    chunk = self.tcp_socket.recv(4 - len(length_bytes))
-                    if not chunk:
-                        raise ConnectionResetError("Connection closed")
-                    length_bytes += chunk
+                length_bytes = self._recv_exactly(4)
                 
                 if not self.running:
                     break
                     
                 msg_length = struct.unpack('!I', length_bytes)[0]
+                binary = msg_length & TCP_BINARY_FLAG
+                msg_length &= TCP_LENGTH_MASK
                 
                 if msg_length > 10485760:  # 10MB limit
                     break
                 
                 # Read message data
-                data = b''
-                while len(data) < msg_length and self.running:
-                    chunk = self.tcp_socket.recv(min(4096, msg_length - len(data)))
-                    if not chunk:
-                        raise ConnectionResetError("Connection closed")
-                    data += chunk
+                data = self._recv_exactly(msg_length)
                 
                 if not self.running:
                     break
                 
+                if binary:
+                    # Raw media frame (screen sharing), no JSON involved
+                    self._handle_binary_frame(data)
+                    continue
+                
                 # Decode message
                 message = self._deserialize_message(data)
                 
+                # Keep the UDP stream_id -> participant map current
+                if message.get('type') == 'user_joined':
+                    self.stream_clients[message['stream_id']] = message['client_id']
+                elif message.get('type') == 'user_left':
+                    self._forget_stream(message.get('client_id'))
+                
                 # Handle file transfer messages internally
                 if message.get('type') == 'file_chunk':
                     self._handle_file_chunk(message)
@@ -519,14 +642,29 @@ class OptimizedConferenceClient:
                     self._handle_file_request(message)
                 elif message.get('type') == 'screen_share_started':
                     self.current_presenter = message.get('presenter_id')
+                    self.screen_received_seq = None
                 elif message.get('type') == 'screen_share_stopped':
                     self.current_presenter = None
+                    self.screen_received_seq = None
+                elif message.get('type') == 'screen_refresh':
+                    # A receiver lost an update or just joined: send a full frame next
+                    self.screen_tiles.request_refresh()
                 elif message.get('type') == 'screen_share_denied':
                     # Emit to UI to handle the denial
                     self.signals.message_received.emit(message)
-                elif message.get('type') == 'screen_frame':
-                    # Handle incoming screen frame
-                    self._handle_screen_frame(message)
+                elif message.get('type') == 'video_feedback':
+                    # Receivers' view of our camera video: adapt the send rate
+                    if self.video_rate.update(message.get('loss', 0)):
+                        self.logger.info(f"📉 Video rate {self.video_rate.rate:.2f}: "
+                                         f"{self.video_rate.fps} fps, scale {self.video_rate.scale}, "
+                                         f"quality {self.video_rate.quality} "
+                                         f"(loss {message.get('loss')}, {message.get('receivers')} receivers)")
+                elif message.get('type') == 'video_layers':
+                    # Simulcast layers somebody is watching (empty = nobody)
+                    self.video_layers = tuple(
+                        layer for layer in message.get('layers', ())
+                        if layer in ALL_VIDEO_LAYERS
+                    )
                 else:
                     # Emit other messages to UI thread
                     self.signals.message_received.emit(message)
@@ -544,40 +682,88 @@ class OptimizedConferenceClient:
             # Schedule disconnect in main thread
             QTimer.singleShot(0, self.disconnect)
     
+    def _recv_exactly(self, length):
+        """Read exactly length bytes from the TCP socket into one buffer"""
+        buffer = bytearray(length)
+        view = memoryview(buffer)
+        received = 0
+        while received < length and self.running:
+            count = self.tcp_socket.recv_into(view[received:])
+            if not count:
+                raise ConnectionResetError("Connection closed")
+            received += count
+        return buffer
+    
+    def _size_udp_receive_buffer(self):
+        """
+        Enlarge the UDP receive buffer: a video frame now arrives as a burst of
+        MTU-sized fragments, and a burst that overflows the OS default (~200KB)
+        loses fragments and therefore whole frames.
+        """
+        try:
+            self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        except OSError:
+            pass
+    
+    def _apply_audio_settings(self, response):
+        """Adopt the codec and audio format the server chose for us"""
+        self.audio_codec = get_audio_codec(response.get('audio_codec'))
+        audio_format = response.get('audio_format') or {}
+        self.audio_rate = audio_format.get('sample_rate', DEFAULT_SAMPLE_RATE)
+        self.audio_frame_ms = audio_format.get('frame_ms', DEFAULT_FRAME_MS)
+        self.audio_playout.reset(self.audio_rate)
+        self.logger.info(f'Audio: {self.audio_codec.name}, {self.audio_rate} Hz, '
+                         f'{self.audio_frame_ms} ms frames')
+    
+    @property
+    def audio_frame_samples(self):
+        """Samples per captured/played audio frame"""
+        return frame_samples(self.audio_rate, self.audio_frame_ms)
+    
     def _receive_udp_streams(self):
         """UDP receiver thread with improved video/audio handling"""
         self.udp_socket.settimeout(0.05)
         
         while self.running:
             try:
+                if time.monotonic() >= self.next_receiver_report:
+                    self._send_receiver_report()
+                
                 data, addr = self.udp_socket.recvfrom(65535)
                 
-                if len(data) < 3:
+                if len(data) < MEDIA_HEADER_SIZE:
                     continue
                 
-                stream_type = chr(data[0])
+                stream_type, flags, stream_id, seq, timestamp = MEDIA_HEADER.unpack_from(data)
+                payload = data[MEDIA_HEADER_SIZE:]
+                if not payload:
+                    continue
                 
-                if stream_type == 'A' and data[1:3] == b'\x00\x00':
-                    # Audio packet
-                    audio_data = data[3:]
-                    if len(audio_data) > 0:
-                        self.signals.audio_received.emit(None, audio_data)
-                    
-                elif stream_type == 'V':
-                    # Video packet
+                if stream_type == STREAM_AUDIO and stream_id == MIXED_AUDIO_STREAM_ID:
+                    # Audio packet (already mixed by the server): decode and hand to
+                    # the jitter buffer; the audio output thread plays it out
                     try:
-                        client_id_len = struct.unpack('!H', data[1:3])[0]
-                        if len(data) < 3 + client_id_len:
-                            continue
-                        
-                        client_id = data[3:3+client_id_len].decode('utf-8')
-                        video_data = data[3+client_id_len:]
-                        
-                        if len(video_data) > 0 and client_id:
-                            self.signals.video_received.emit(client_id, video_data)
-                    except (struct.error, UnicodeDecodeError) as e:
-                        print(f"Video packet decode error: {e}")
+                        samples = self.audio_codec.decode(payload)
+                    except ValueError:
                         continue
+                    self.audio_playout.push(seq, timestamp, samples)
+                    
+                elif stream_type == STREAM_VIDEO:
+                    # Video fragment: map the numeric stream ID back to its participant,
+                    # then emit the frame once all of its fragments are in
+                    client_id = self.stream_clients.get(stream_id)
+                    # Frames replayed from the server's cache have old sequence
+                    # numbers and timestamps: keep them out of the receiver reports
+                    if client_id and not flags & FLAG_CACHED_FRAME:
+                        self.video_receive_stats.add(stream_id, flags & VIDEO_LAYER_MASK, seq,
+                                                     timestamp, len(data))
+                    if client_id and len(payload) > FRAGMENT_HEADER_SIZE:
+                        frame_id, index, count = FRAGMENT_HEADER.unpack_from(payload)
+                        frame = self.video_reassembler.add(stream_id, frame_id, index, count,
+                                                           memoryview(payload)[FRAGMENT_HEADER_SIZE:])
+                        if frame is not None:
+                            # Decoded by the worker pool, which emits video_received
+                            self.video_decoder.submit(client_id, frame)
                     
             except socket.timeout:
                 continue
@@ -590,6 +776,20 @@ class OptimizedConferenceClient:
                     print(f"UDP receive error: {e}")
                 time.sleep(0.001)
     
+    def _send_receiver_report(self):
+        """Report loss/jitter/bitrate of the video received from each sender"""
+        self.next_receiver_report = time.monotonic() + REPORT_INTERVAL
+        streams = self.video_receive_stats.report()
+        if streams:
+            self.send_tcp_message({'type': 'receiver_report', 'streams': streams})
+    
+    def _forget_stream(self, client_id):
+        """Drop a departed participant from the stream_id map and decode queue"""
+        self.video_decoder.forget(client_id)
+        for stream_id, owner in list(self.stream_clients.items()):
+            if owner == client_id:
+                del self.stream_clients[stream_id]
+    
     def _handle_file_chunk(self, message):
         """Handle incoming file chunk"""
         try:
@@ -658,35 +858,49 @@ class OptimizedConferenceClient:
         except Exception as e:
             print(f"Error handling file end: {e}")
     
-    def _handle_screen_frame(self, message):
-        """Handle incoming screen frame from presenter"""
+    def _handle_binary_frame(self, data):
+        """Handle a binary TCP frame: a screen sharing update (media/tiles.py)"""
         try:
-            presenter_id = message.get('presenter_id')
-            frame_data = message.get('frame_data')
-            
-            if not presenter_id or not frame_data:
-                self.logger.debug("Screen frame missing presenter_id or frame_data")
-                return
-            
-            # Only process if this is from the current presenter
-            if presenter_id != self.current_presenter:
-                self.logger.debug(f"Ignoring screen frame from {presenter_id}, current presenter is {self.current_presenter}")
-                return
-            
-            # Decode base64 frame data
-            if isinstance(frame_data, str):
-                frame_bytes = base64.b64decode(frame_data)
-            else:
-                frame_bytes = frame_data
-            
-            self.logger.debug(f"Received screen frame from {presenter_id}, size: {len(frame_bytes)} bytes")
-            
-            # Emit to UI for display
-            self.signals.video_received.emit(presenter_id, frame_bytes)
-            
-        except Exception as e:
-            self.logger.error(f"Error handling screen frame: {e}", exc_info=True)
-            print(f"Error handling screen frame: {e}")
+            stream_id, seq, width, height, full, tiles = parse_screen_frame(data)
+        except ValueError as e:
+            self.logger.debug(f"Ignoring malformed binary frame: {e}")
+            return
+        presenter_id = self.stream_clients.get(stream_id)
+        if presenter_id:
+            self._apply_screen_update(presenter_id, seq, width, height, full, tiles)
+    
+    def _apply_screen_update(self, presenter_id, seq, width, height, full, tiles):
+        """
+        Hand a screen update to the UI. A gap in seq (an update dropped under
+        backpressure), or tiles before any full frame, means our canvas is
+        stale: ask for a refresh (the server resends its cached full frame
+        and updates, or forwards the request to the presenter).
+        """
+        # Only process if this is from the current presenter
+        if presenter_id != self.current_presenter:
+            self.logger.debug(f"Ignoring screen frame from {presenter_id}, current presenter is {self.current_presenter}")
+            return
+        
+        expected = None if self.screen_received_seq is None else self.screen_received_seq + 1
+        self.screen_received_seq = seq
+        if full:
+            self.screen_refresh_asked = None
+        elif seq is None or seq != expected:
+            now = time.monotonic()
+            if self.screen_refresh_asked is None or now - self.screen_refresh_asked > 2.0:
+                self.screen_refresh_asked = now
+                self.send_tcp_message({'type': 'screen_refresh'})
+        
+        self.logger.debug(f"Received screen update from {presenter_id}: "
+                          f"{len(tiles)} region(s), {sum(len(t[2]) for t in tiles)} bytes")
+        
+        # Emit to UI for compositing and display
+        self.signals.screen_update.emit(presenter_id, {
+            'width': width,
+            'height': height,
+            'full': full,
+            'tiles': tiles
+        })
     
     def _handle_file_request(self, message):
         """Handle file request from another client"""
@@ -806,24 +1020,39 @@ class OptimizedConferenceClient:
             length = struct.pack('!I', len(data))
             
             # Send length prefix + data via TCP
-            # sendall() ensures all data is sent (handles partial sends)
-            self.tcp_socket.sendall(length + data)
+            # sendall() ensures all data is sent (handles partial sends);
+            # the lock keeps messages from different threads whole
+            with self.tcp_send_lock:
+                self.tcp_socket.sendall(length + data)
         except Exception as e:
             print(f"TCP send error: {e}")
             
-    def send_udp_stream(self, stream_type, data):
+    def send_binary_frame(self, body):
+        """Send a binary TCP frame (length prefix with TCP_BINARY_FLAG, then the raw body)"""
+        if not self.connected:
+            return
+        with self.tcp_send_lock:
+            self.tcp_socket.sendall(tcp_length_prefix(len(body), binary=True))
+            self.tcp_socket.sendall(body)
+    
+    def send_udp_stream(self, stream_type, data, flags=0):
         """
         Send audio or video data to server via UDP.
         
         PROTOCOL: UDP (User Datagram Protocol)
         PURPOSE: Low-latency streaming of real-time media
         
-        PACKET STRUCTURE:
-        [Stream Type (1 byte)][Client ID Length (2 bytes)][Client ID][Media Data]
+        PACKET STRUCTURE (see media/protocol.py):
+        [Type (1)][Flags (1)][Stream ID (4)][Sequence (2)][Timestamp (4)][Media Data]
+        
+        The server identifies the sender from the numeric stream ID it assigned at
+        join time, so no client ID string travels with each packet. flags sets the
+        header's flag bits (e.g. the VAD's speech/silence start markers, or the
+        simulcast layer index of a video frame).
         
         Stream Types:
-        - 'V': Video frame (JPEG compressed image)
-        - 'A': Audio packet (PCM audio samples)
+        - 'V': Video frame (JPEG compressed image, sent as fragments)
+        - 'A': Audio packet (PCM samples in, sent encoded with the negotiated codec)
         - 'I': Initialization packet (establishes UDP address)
         
         WHY UDP:
@@ -835,26 +1064,31 @@ class OptimizedConferenceClient:
         PACKET SIZE LIMIT:
         - Maximum UDP packet size: 65,507 bytes
         - Reason: IP packet limit (65,535) - IP header (20) - UDP header (8)
-        - Larger data must be split into multiple packets
+        - Video frames are always split into MTU-sized fragments (see
+          _send_video_fragments), so frame size is not limited by this
         
         USED FOR:
-        - Video frames (20 FPS, ~10-30 KB per frame)
-        - Audio packets (44.1 kHz, 1024 samples, ~2 KB per packet)
+        - Video frames (20 FPS, ~10-30 KB per frame, sent as ~1.2 KB fragments)
+        - Audio packets (negotiated rate, 10/20 ms frames; 640 bytes of PCM
+          or 164 bytes of ADPCM at 16 kHz / 20 ms)
         """
-        if not self.connected or not self.client_id or not data:
+        if not self.connected or self.stream_id is None or not data:
             return
         
         try:
-            # Encode client ID to bytes
-            client_id_bytes = self.client_id.encode('utf-8')
-            client_id_len = len(client_id_bytes)
+            if stream_type == 'V':
+                self._send_video_fragments(data, flags)
+                return
+            
+            if stream_type == 'A':
+                # Compress the PCM chunk with the codec negotiated at join
+                data = self.audio_codec.encode(data)
             
-            # Calculate total packet size
-            # 1 byte (stream type) + 2 bytes (ID length) + ID + media data
-            packet_size = 1 + 2 + client_id_len + len(data)
+            # Calculate total packet size: 12-byte header + media data
+            packet_size = MEDIA_HEADER_SIZE + len(data)
             
             # Check UDP packet size limit (65,507 bytes maximum)
-            if packet_size > 65507:
+            if packet_size > MAX_UDP_PAYLOAD:
                 print(f"Packet too large: {packet_size} bytes")
                 return
             
@@ -864,27 +1098,47 @@ class OptimizedConferenceClient:
             else:
                 packet = bytearray(packet_size)
             
-            # Build UDP packet structure:
-            # Byte 0: Stream type ('V' for video, 'A' for audio)
-            packet[0] = ord(stream_type)
-            
-            # Bytes 1-2: Client ID length (2 bytes, network byte order)
-            struct.pack_into('!H', packet, 1, client_id_len)
-            
-            # Bytes 3 to 3+len: Client ID
-            packet[3:3+client_id_len] = client_id_bytes
+            # Per-stream sequence number (wraps at 65536)
+            seq = next_sequence(self.udp_sequence.get(stream_type, -1))
+            self.udp_sequence[stream_type] = seq
             
-            # Remaining bytes: Media data (video frame or audio samples)
-            packet[3+client_id_len:packet_size] = data
+            # Build UDP packet structure: header, then media data
+            # (video frame or audio samples)
+            pack_media_header(packet, ord(stream_type), self.stream_id, seq, media_timestamp(), flags)
+            packet[MEDIA_HEADER_SIZE:packet_size] = data
             
             # Send UDP packet to server
             # sendto() sends one packet (no connection, just fire and forget)
             # No guarantee of delivery or order
-            self.udp_socket.sendto(bytes(packet[:packet_size]), self.server_address)
+            self.udp_socket.sendto(memoryview(packet)[:packet_size], self.server_address)
             
         except Exception as e:
             print(f"UDP send error: {e}")
             
+    def _send_video_fragments(self, data, flags=0):
+        """
+        Send one video frame as MTU-sized fragments (see media/fragment.py).
+        
+        Each datagram stays under MAX_DATAGRAM_SIZE, so IP never fragments it,
+        and frames larger than one UDP datagram (64 KB) can be sent. flags
+        carries the simulcast layer; all layers share the frame ID counter but
+        each has its own sequence numbers, so receivers can measure loss on
+        the one layer they get.
+        """
+        self.video_frame_id = (self.video_frame_id + 1) % 65536
+        timestamp = media_timestamp()  # Same for every fragment of the frame
+        packet = self.video_send_buffer
+        offset = MEDIA_HEADER_SIZE + FRAGMENT_HEADER_SIZE
+        sequence_key = ('V', flags & VIDEO_LAYER_MASK)
+        for index, count, chunk in iter_fragments(data):
+            seq = next_sequence(self.udp_sequence.get(sequence_key, -1))
+            self.udp_sequence[sequence_key] = seq
+            pack_media_header(packet, STREAM_VIDEO, self.stream_id, seq, timestamp, flags)
+            FRAGMENT_HEADER.pack_into(packet, MEDIA_HEADER_SIZE, self.video_frame_id, index, count)
+            end = offset + len(chunk)
+            packet[offset:end] = chunk
+            self.udp_socket.sendto(memoryview(packet)[:end], self.server_address)
+    
     def send_udp_init(self):
         """Send UDP initialization packet"""
         self.send_udp_stream('I', b'init')
@@ -901,17 +1155,45 @@ class OptimizedConferenceClient:
             'state': 'started' if is_enabled else 'stopped'
         })
     
-    def send_screen_frame_tcp(self, frame_data):
-        """Send screen frame via TCP for reliability and clarity"""
+    def send_video_subscription(self, client_ids, tile_size=None):
+        """
+        Tell the server whose video this client currently renders, so it only
+        forwards those streams, and how large the tiles are on screen
+        (tile_size: (width, height) in device pixels) so it can pick each
+        stream's simulcast layer. Only sent when the set, the layer the tile
+        size maps to, or the bandwidth budget actually changes.
+        """
+        if not self.connected:
+            return
+        client_ids = sorted(set(cid for cid in client_ids if cid != self.client_id))
+        layer = video_layer_for_tile(*tile_size) if tile_size else 0
+        subscription = (client_ids, layer, self.video_bandwidth_kbps)
+        if subscription == self.video_subscription:
+            return
+        self.video_subscription = subscription
+        message = {'type': 'video_subscription', 'client_ids': client_ids}
+        if tile_size:
+            size = [int(tile_size[0]), int(tile_size[1])]
+            message['tile_sizes'] = {cid: size for cid in client_ids}
+        if self.video_bandwidth_kbps:
+            message['max_video_kbps'] = self.video_bandwidth_kbps
+        self.send_tcp_message(message)
+    
+    def send_screen_frame_tcp(self, width, height, full, tiles):
+        """
+        Send one screen update via TCP for reliability and clarity.
+        
+        tiles: [(x, y, jpeg_bytes)]; a full frame is the single tile (0, 0).
+        Sent as a binary TCP frame (media/tiles.py): raw JPEG bytes behind a
+        small header, no base64 or JSON, relayed by the server unparsed.
+        """
         if not self.connected or not hasattr(self, 'is_presenting') or not self.is_presenting:
             return
         
         try:
-            self.send_tcp_message({
-                'type': 'screen_frame',
-                'frame_data': frame_data,
-                'presenter_id': self.client_id
-            })
+            self.screen_sequence += 1
+            body = pack_screen_frame(self.stream_id, self.screen_sequence, width, height, full, tiles)
+            self.send_binary_frame(body)
         except Exception as e:
             self.logger.error(f"Error sending screen frame via TCP: {e}")
             print(f"Error sending screen frame via TCP: {e}")
@@ -1117,6 +1399,12 @@ class OptimizedConferenceClient:
         self.logger.info('Disconnecting from server...')
         self.running = False
         self.connected = False
+        self.logger.info(f'Audio playout: {self.audio_playout.stats()}')
+        self.logger.info(f'Camera video: {self.video_change.stats()}')
+        self.logger.info(f'Camera pipeline timings: {self.video_timings.stats()}')
+        self.logger.info(f'Video decoding: {self.video_decoder.stats()}')
+        self.video_decoder.close()
+        self.logger.info(f'Screen sharing: {self.screen_tiles.stats()}')
         
         # Close all file handles
         with self.file_lock:
@@ -0,0 +1,156 @@
+"""
+Media Package - Shared real-time media code
+Wire format and helpers used by both the server and the client
+(including video fragmentation/reassembly, simulcast layers and video
+receiver reports with the sender's rate controller), plus camera
+static-scene detection, capture/encode and decode pipeline helpers, dirty-tile
+screen sharing, the server's last-frame cache, audio format negotiation
+and resampling, the audio codecs, the server's audio mixer and the client's
+voice activity detector and playout jitter buffer
+"""
+
+from .protocol import (
+    MEDIA_HEADER,
+    MEDIA_HEADER_SIZE,
+    STREAM_VIDEO,
+    STREAM_AUDIO,
+    STREAM_INIT,
+    MIXED_AUDIO_STREAM_ID,
+    MAX_UDP_PAYLOAD,
+    FLAG_SPEECH_START,
+    FLAG_SILENCE_START,
+    FLAG_CACHED_FRAME,
+    TCP_BINARY_FLAG,
+    TCP_LENGTH_MASK,
+    media_timestamp,
+    next_sequence,
+    pack_media_header,
+    build_media_packet,
+    tcp_length_prefix,
+)
+from .fragment import (
+    FRAGMENT_HEADER,
+    FRAGMENT_HEADER_SIZE,
+    FRAGMENT_PAYLOAD_SIZE,
+    MAX_DATAGRAM_SIZE,
+    FrameReassembler,
+    iter_fragments,
+)
+from .simulcast import (
+    VIDEO_LAYERS,
+    VIDEO_LAYER_KBPS,
+    VIDEO_LAYER_MASK,
+    ALL_VIDEO_LAYERS,
+    fit_video_layers,
+    nearest_video_layer,
+    video_layer_for_tile,
+)
+from .feedback import (
+    REPORT_INTERVAL,
+    REPORT_MAX_AGE,
+    VideoReceiveStats,
+    VideoRateController,
+)
+from .motion import VIDEO_CHANGE_THRESHOLD, FrameChangeDetector
+from .pipeline import FrameSlot, StageTimings, DecodePool
+from .tiles import (
+    SCREEN_TILE_SIZE,
+    SCREEN_FRAME_HEADER,
+    BINARY_SCREEN_FRAME,
+    SCREEN_FLAG_FULL,
+    ScreenTileEncoder,
+    ScreenCanvas,
+    pack_screen_frame,
+    parse_screen_frame,
+)
+from .framecache import VideoFrameCache, ScreenFrameCache
+from .codecs import (
+    AudioCodec,
+    AUDIO_CODECS,
+    AUDIO_CODEC_PREFERENCE,
+    DEFAULT_AUDIO_CODEC,
+    get_audio_codec,
+    negotiate_audio_codec,
+)
+from .resample import (
+    AUDIO_SAMPLE_RATES,
+    AUDIO_FRAME_DURATIONS,
+    DEFAULT_SAMPLE_RATE,
+    DEFAULT_FRAME_MS,
+    Resampler,
+    frame_samples,
+    negotiate_audio_format,
+    negotiate_capture_rate,
+)
+from .mixer import NMinusOneMixer
+from .vad import VoiceActivityDetector
+from .jitter import AdaptiveJitterBuffer
+
+__all__ = [
+    'MEDIA_HEADER',
+    'MEDIA_HEADER_SIZE',
+    'STREAM_VIDEO',
+    'STREAM_AUDIO',
+    'STREAM_INIT',
+    'MIXED_AUDIO_STREAM_ID',
+    'MAX_UDP_PAYLOAD',
+    'FLAG_SPEECH_START',
+    'FLAG_SILENCE_START',
+    'FLAG_CACHED_FRAME',
+    'TCP_BINARY_FLAG',
+    'TCP_LENGTH_MASK',
+    'media_timestamp',
+    'next_sequence',
+    'pack_media_header',
+    'build_media_packet',
+    'tcp_length_prefix',
+    'FRAGMENT_HEADER',
+    'FRAGMENT_HEADER_SIZE',
+    'FRAGMENT_PAYLOAD_SIZE',
+    'MAX_DATAGRAM_SIZE',
+    'FrameReassembler',
+    'iter_fragments',
+    'VIDEO_LAYERS',
+    'VIDEO_LAYER_KBPS',
+    'VIDEO_LAYER_MASK',
+    'ALL_VIDEO_LAYERS',
+    'fit_video_layers',
+    'nearest_video_layer',
+    'video_layer_for_tile',
+    'REPORT_INTERVAL',
+    'REPORT_MAX_AGE',
+    'VideoReceiveStats',
+    'VideoRateController',
+    'VIDEO_CHANGE_THRESHOLD',
+    'FrameChangeDetector',
+    'FrameSlot',
+    'StageTimings',
+    'DecodePool',
+    'SCREEN_TILE_SIZE',
+    'SCREEN_FRAME_HEADER',
+    'BINARY_SCREEN_FRAME',
+    'SCREEN_FLAG_FULL',
+    'ScreenTileEncoder',
+    'ScreenCanvas',
+    'pack_screen_frame',
+    'parse_screen_frame',
+    'VideoFrameCache',
+    'ScreenFrameCache',
+    'AudioCodec',
+    'AUDIO_CODECS',
+    'AUDIO_CODEC_PREFERENCE',
+    'DEFAULT_AUDIO_CODEC',
+    'get_audio_codec',
+    'negotiate_audio_codec',
+    'AUDIO_SAMPLE_RATES',
+    'AUDIO_FRAME_DURATIONS',
+    'DEFAULT_SAMPLE_RATE',
+    'DEFAULT_FRAME_MS',
+    'Resampler',
+    'frame_samples',
+    'negotiate_audio_format',
+    'negotiate_capture_rate',
+    'NMinusOneMixer',
+    'VoiceActivityDetector',
+    'AdaptiveJitterBuffer',
+]
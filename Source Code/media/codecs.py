@@ -0,0 +1,221 @@
+"""
+===================================================================================
+AUDIO CODECS - CODECS.PY
+===================================================================================
+Pluggable compression for the UDP 'A' (audio) stream, pure Python/NumPy.
+
+CODECS (name -> ratio vs 16-bit PCM):
+- 'pcm16':     Raw little-endian int16 samples (1x, no CPU cost)
+- 'pcmu':      G.711 mu-law, 8 bits per sample (2x), table lookups only
+- 'ima-adpcm': IMA ADPCM, 4 bits per sample (~4x)
+
+NEGOTIATION:
+The client lists the codecs it supports (preferred first) in its create/join
+request as 'audio_codecs'; the server answers with the chosen 'audio_codec'.
+That codec is used for the client's uplink and for the mix it receives.
+Clients that send no list get 'pcm16'.
+
+Every packet is self-contained (ADPCM carries its own predictor state), so a
+lost packet never corrupts the ones after it.
+===================================================================================
+"""
+
+import struct
+from bisect import bisect_left
+
+import numpy as np
+
+class AudioCodec:
+    """
+    Base class: encode int16 samples to bytes and back.
+
+    encode() accepts an int16 array or raw PCM bytes; decode() returns an int16
+    array and raises ValueError for a malformed payload.
+    """
+    name = 'pcm16'
+
+    @staticmethod
+    def as_samples(data):
+        """int16 view of PCM bytes (arrays pass through)"""
+        if isinstance(data, np.ndarray):
+            return data
+        return np.frombuffer(data, dtype=np.int16)
+
+    def encode(self, samples) -> bytes:
+        return self.as_samples(samples).astype('<i2', copy=False).tobytes()
+
+    def decode(self, payload) -> np.ndarray:
+        if len(payload) % 2:
+            raise ValueError("PCM payload has an odd number of bytes")
+        return np.frombuffer(payload, dtype='<i2')
+
+class Pcm16Codec(AudioCodec):
+    """Uncompressed 16-bit PCM (the original format)"""
+    name = 'pcm16'
+
+# G.711 mu-law: both directions are single table lookups. The 64K-entry encode
+# table covers every int16 value, built once at import with the reference
+# (bias 0x84, clip 32635) algorithm.
+MULAW_BIAS = 0x84
+MULAW_CLIP = 32635
+
+def _build_mulaw_tables():
+    values = np.arange(-32768, 32768, dtype=np.int32)
+    sign = np.where(values < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(values), MULAW_CLIP) + MULAW_BIAS
+    exponent = np.frexp(magnitude.astype(np.float64))[1] - 8  # Highest set bit - 7
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    encoded = (~(sign | (exponent << 4) | mantissa)) & 0xFF
+    # Index by the int16 bit pattern viewed as uint16
+    encode_table = np.empty(65536, dtype=np.uint8)
+    encode_table[values.astype(np.int16).view(np.uint16)] = encoded
+
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (codes >> 4) & 0x07
+    magnitude = (((codes & 0x0F) << 3) + MULAW_BIAS) << exponent
+    decode_table = np.where(codes & 0x80, MULAW_BIAS - magnitude, magnitude - MULAW_BIAS).astype(np.int16)
+    return encode_table, decode_table
+
+MULAW_ENCODE_TABLE, MULAW_DECODE_TABLE = _build_mulaw_tables()
+
+class MuLawCodec(AudioCodec):
+    """G.711 mu-law (8 bits per sample)"""
+    name = 'pcmu'
+
+    def encode(self, samples) -> bytes:
+        samples = self.as_samples(samples).astype(np.int16, copy=False)
+        return MULAW_ENCODE_TABLE[samples.view(np.uint16)].tobytes()
+
+    def decode(self, payload) -> np.ndarray:
+        return MULAW_DECODE_TABLE[np.frombuffer(payload, dtype=np.uint8)]
+
+# IMA ADPCM (as in IMA/DVI WAV files). Each packet is one block:
+#     [first sample: int16][step index: uint8][padding: uint8][4-bit codes...]
+# Two codes per byte, low nibble first; padding = 1 if the last high nibble is unused.
+IMA_INDEX_TABLE = (-1, -1, -1, -1, 2, 4, 6, 8, -1, -1, -1, -1, 2, 4, 6, 8)
+IMA_STEP_TABLE = (
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45,
+    50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230,
+    253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876, 963,
+    1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272, 2499, 2749, 3024, 3327,
+    3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442,
+    11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794,
+    32767
+)
+IMA_BLOCK_HEADER = struct.Struct('<hBB')
+
+class ImaAdpcmCodec(AudioCodec):
+    """
+    IMA ADPCM (4 bits per sample).
+
+    The coder is inherently sequential (each sample's step depends on the
+    previous one), so it runs as a tight Python loop over plain ints: about a
+    millisecond per 1024-sample frame. The server therefore decodes and encodes
+    on the mixer thread, once per source and once per distinct mix.
+    """
+    name = 'ima-adpcm'
+
+    def encode(self, samples) -> bytes:
+        values = self.as_samples(samples).tolist()
+        if not values:
+            return b''
+        predictor = values[0]
+        # Start at the step size closest to the first difference, so each
+        # (stateless) block does not have to ramp up from the smallest step
+        first_delta = abs(values[1] - values[0]) if len(values) > 1 else 0
+        index = start_index = min(bisect_left(IMA_STEP_TABLE, first_delta), 88)
+
+        codes = bytearray(len(values) // 2)
+        step_table, index_table = IMA_STEP_TABLE, IMA_INDEX_TABLE
+        for position, sample in enumerate(values[1:]):
+            step = step_table[index]
+            diff = sample - predictor
+            code = 0
+            if diff < 0:
+                code = 8
+                diff = -diff
+            delta = step >> 3
+            if diff >= step:
+                code |= 4
+                diff -= step
+                delta += step
+            step >>= 1
+            if diff >= step:
+                code |= 2
+                diff -= step
+                delta += step
+            step >>= 1
+            if diff >= step:
+                code |= 1
+                delta += step
+
+            predictor = predictor - delta if code & 8 else predictor + delta
+            if predictor > 32767:
+                predictor = 32767
+            elif predictor < -32768:
+                predictor = -32768
+            index += index_table[code]
+            if index < 0:
+                index = 0
+            elif index > 88:
+                index = 88
+
+            if position & 1:
+                codes[position >> 1] |= code << 4
+            else:
+                codes[position >> 1] = code
+
+        padding = 1 if (len(values) - 1) % 2 else 0
+        return IMA_BLOCK_HEADER.pack(values[0], start_index, padding) + bytes(codes)
+
+    def decode(self, payload) -> np.ndarray:
+        if len(payload) < IMA_BLOCK_HEADER.size:
+            raise ValueError("ADPCM payload shorter than its block header")
+        predictor, index, padding = IMA_BLOCK_HEADER.unpack_from(payload)
+        if index > 88 or padding > 1:
+            raise ValueError("Invalid ADPCM block header")
+
+        data = bytes(payload[IMA_BLOCK_HEADER.size:])
+        count = len(data) * 2 - padding
+        out = [predictor]
+        step_table, index_table = IMA_STEP_TABLE, IMA_INDEX_TABLE
+        for position in range(count):
+            byte = data[position >> 1]
+            code = (byte >> 4) if position & 1 else (byte & 0x0F)
+            step = step_table[index]
+            delta = step >> 3
+            if code & 4:
+                delta += step
+            if code & 2:
+                delta += step >> 1
+            if code & 1:
+                delta += step >> 2
+            predictor = predictor - delta if code & 8 else predictor + delta
+            if predictor > 32767:
+                predictor = 32767
+            elif predictor < -32768:
+                predictor = -32768
+            index += index_table[code]
+            if index < 0:
+                index = 0
+            elif index > 88:
+                index = 88
+            out.append(predictor)
+        return np.array(out, dtype=np.int16)
+
+AUDIO_CODECS = {
+    codec.name: codec for codec in (Pcm16Codec(), MuLawCodec(), ImaAdpcmCodec())
+}
+DEFAULT_AUDIO_CODEC = 'pcm16'  # Used when a client offers nothing we support
+AUDIO_CODEC_PREFERENCE = ('ima-adpcm', 'pcmu', 'pcm16')  # What clients offer, best first
+
+def get_audio_codec(name: str) -> AudioCodec:
+    """Codec instance by name (falls back to pcm16)"""
+    return AUDIO_CODECS.get(name, AUDIO_CODECS[DEFAULT_AUDIO_CODEC])
+
+def negotiate_audio_codec(offered) -> str:
+    """Pick the first offered codec this side supports"""
+    for name in offered or ():
+        if name in AUDIO_CODECS:
+            return name
+    return DEFAULT_AUDIO_CODEC
@@ -0,0 +1,208 @@
+"""
+===================================================================================
+VIDEO FEEDBACK & RATE CONTROL - FEEDBACK.PY
+===================================================================================
+Receiver reports for camera video and the sender's adaptive bitrate controller.
+
+PURPOSE: Camera video used to be open-loop (fixed 20 fps, fixed JPEG quality),
+so a congested link just lost more and more fragments until frames stopped
+completing. Receivers now measure what they get and the sender backs off.
+
+RECEIVER REPORTS (client -> server, TCP, every REPORT_INTERVAL):
+    {'type': 'receiver_report',
+     'streams': [{'stream_id', 'loss', 'jitter_ms', 'kbps'}, ...]}
+- loss: fraction of packets missing in the interval, from per-layer header
+  sequence numbers (each simulcast layer has its own sequence space)
+- jitter_ms: RFC 3550 interarrival jitter over frame timestamps
+- kbps: video bitrate actually received from that sender
+
+FEEDBACK (server -> sender, at most once per REPORT_INTERVAL):
+    {'type': 'video_feedback', 'loss', 'max_loss', 'jitter_ms', 'kbps', 'receivers'}
+The server combines the fresh reports about one sender: 'loss' and 'jitter_ms'
+are medians over receivers. One receiver on a bad link is served by simulcast
+layer selection; loss seen by most receivers means the sender's own path is
+congested, which is what the sender can fix.
+
+CONTROLLER (sender, AIMD):
+- loss above LOSS_TARGET -> rate x RATE_DECREASE (multiplicative decrease),
+  then hold for RATE_HOLD seconds while older reports drain
+- loss below LOSS_TARGET / 2 -> rate + RATE_INCREASE (additive increase)
+- the rate (share of full quality) selects a step of VIDEO_QUALITY_LADDER,
+  trading JPEG quality, resolution and frame rate
+===================================================================================
+"""
+
+import threading
+import time
+
+from .jitter import sequence_delta
+
+REPORT_INTERVAL = 1.0  # Seconds between receiver reports (and sender feedback)
+REPORT_MAX_AGE = 3.0  # Reports older than this are ignored when aggregating
+STREAM_TIMEOUT = 2.0  # A stream idle this long restarts its sequence tracking
+MAX_DROPOUT = 3000  # Sequence jump treated as a restart rather than loss
+MAX_MISORDER = 100  # Packets further back than this also restart tracking
+
+LOSS_TARGET = 0.02  # Controller keeps loss below 2%
+RATE_DECREASE = 0.7  # Multiplicative decrease on loss
+RATE_INCREASE = 0.05  # Additive increase per clean report
+RATE_HOLD = 2.0  # Seconds without increases after a decrease
+MIN_RATE = 0.04
+
+# (relative cost, resolution scale, fps, JPEG quality), best first. Cost is the
+# approximate share of the full-quality bitrate (pixels x fps x quality factor).
+VIDEO_QUALITY_LADDER = (
+    (1.00, 1.0, 20, 60),
+    (0.75, 1.0, 15, 60),
+    (0.60, 1.0, 15, 45),
+    (0.34, 0.75, 15, 45),
+    (0.22, 0.75, 10, 45),
+    (0.10, 0.5, 10, 45),
+    (0.075, 0.5, 10, 30),
+    (0.04, 0.5, 5, 30),
+)
+
+class StreamReceiveStats:
+    """Counters for one (stream, layer) sequence space"""
+    __slots__ = ('highest', 'reported', 'received', 'bytes', 'last_arrival',
+                 'last_timestamp', 'last_transit', 'jitter_ms')
+
+    def __init__(self, seq, now):
+        self.highest = seq  # Extended (unwrapped) highest sequence number
+        self.reported = seq - 1  # highest at the previous report
+        self.received = 0
+        self.bytes = 0
+        self.last_arrival = now
+        self.last_timestamp = None
+        self.last_transit = None
+        self.jitter_ms = 0.0
+
+class VideoReceiveStats:
+    """
+    Loss, jitter and bitrate of the video this client receives, per sender.
+
+    USAGE:
+        stats.add(stream_id, layer, seq, timestamp, size)   # every video packet
+        streams = stats.report()                            # every REPORT_INTERVAL
+
+    add() runs on the UDP receiver thread; report() may run elsewhere, so both
+    take a lock.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.streams = {}  # (stream_id, layer) -> StreamReceiveStats
+        self.last_report = time.monotonic()
+
+    def add(self, stream_id, layer, seq, timestamp, size, now=None):
+        """Account one received video packet"""
+        if now is None:
+            now = time.monotonic()
+        key = (stream_id, layer)
+        with self.lock:
+            stats = self.streams.get(key)
+            if stats is not None and now - stats.last_arrival <= STREAM_TIMEOUT:
+                delta = sequence_delta(stats.highest, seq)
+                if -MAX_MISORDER <= delta <= MAX_DROPOUT:
+                    if delta > 0:
+                        stats.highest += delta
+                else:
+                    stats = None  # Sender restarted or layer resumed: new sequence space
+            if stats is None:
+                stats = self.streams[key] = StreamReceiveStats(seq, now)
+
+            stats.received += 1
+            stats.bytes += size
+            stats.last_arrival = now
+
+            # Jitter once per frame (fragments of a frame share a timestamp
+            # and are sent back to back, which is not network jitter)
+            if timestamp != stats.last_timestamp:
+                stats.last_timestamp = timestamp
+                transit = now * 1000.0 - timestamp
+                if stats.last_transit is not None:
+                    change = abs(transit - stats.last_transit)
+                    stats.jitter_ms += (min(change, 1000.0) - stats.jitter_ms) / 16.0
+                stats.last_transit = transit
+
+    def report(self, now=None) -> list:
+        """Per-sender loss/jitter/kbps since the last report; resets the interval"""
+        if now is None:
+            now = time.monotonic()
+        with self.lock:
+            elapsed = max(now - self.last_report, 1e-3)
+            self.last_report = now
+            totals = {}  # stream_id -> [expected, received, bytes, jitter]
+            for key, stats in list(self.streams.items()):
+                if now - stats.last_arrival > STREAM_TIMEOUT:
+                    del self.streams[key]
+                    continue
+                expected = stats.highest - stats.reported
+                total = totals.setdefault(key[0], [0, 0, 0, 0.0])
+                total[0] += expected
+                total[1] += stats.received
+                total[2] += stats.bytes
+                total[3] = max(total[3], stats.jitter_ms)
+                stats.reported = stats.highest
+                stats.received = 0
+                stats.bytes = 0
+
+        return [
+            {
+                'stream_id': stream_id,
+                'loss': round(max(0, expected - received) / expected, 4) if expected > 0 else 0.0,
+                'jitter_ms': round(jitter, 2),
+                'kbps': round(size * 8 / 1000.0 / elapsed, 1),
+            }
+            for stream_id, (expected, received, size, jitter) in totals.items()
+        ]
+
+class VideoRateController:
+    """
+    AIMD bitrate controller for the camera sender.
+
+    USAGE:
+        controller.update(feedback['loss'])   # on every 'video_feedback'
+        controller.quality / .scale / .fps    # read by the capture loop
+
+    The rate is a share of full quality (MIN_RATE..1.0); the ladder step is the
+    best one whose cost fits it.
+    """
+    def __init__(self):
+        self.rate = 1.0
+        self.hold_until = 0.0
+        self.step = VIDEO_QUALITY_LADDER[0]
+
+    @property
+    def scale(self) -> float:
+        """Resolution factor applied to every simulcast layer"""
+        return self.step[1]
+
+    @property
+    def fps(self) -> int:
+        return self.step[2]
+
+    @property
+    def quality(self) -> int:
+        """JPEG quality"""
+        return self.step[3]
+
+    @property
+    def frame_interval_ms(self) -> int:
+        return int(1000 / self.fps)
+
+    def update(self, loss, now=None) -> bool:
+        """Apply one feedback report; returns True if the ladder step changed"""
+        if now is None:
+            now = time.monotonic()
+        if loss > LOSS_TARGET:
+            if now >= self.hold_until:
+                self.rate = max(MIN_RATE, self.rate * RATE_DECREASE)
+                self.hold_until = now + RATE_HOLD
+        elif loss < LOSS_TARGET / 2 and now >= self.hold_until:
+            self.rate = min(1.0, self.rate + RATE_INCREASE)
+
+        step = next((step for step in VIDEO_QUALITY_LADDER if step[0] <= self.rate + 1e-9),
+                    VIDEO_QUALITY_LADDER[-1])
+        changed = step != self.step
+        self.step = step
+        return changed
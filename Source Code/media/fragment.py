@@ -0,0 +1,157 @@
+"""
+===================================================================================
+VIDEO FRAGMENTATION - FRAGMENT.PY
+===================================================================================
+Splits video frames into MTU-sized datagrams and puts them back together.
+
+PURPOSE: A JPEG frame used to travel as one datagram. Frames over 65,507 bytes
+could not be sent at all, and anything above the path MTU (~1500 bytes) was
+split by IP: losing any one IP fragment silently discarded the whole datagram,
+and the kernel gives no way to see or bound that. Fragmenting in the
+application keeps every datagram under the MTU and makes the frame size
+limit a configurable number instead of a protocol wall.
+
+PACKET STRUCTURE (video only, after the 12-byte media header):
+    [Frame ID (2)][Fragment index (2)][Fragment count (2)][Chunk]
+
+- Frame ID: per-sender frame counter, wraps at 65536
+- Every fragment of a frame carries the same media header timestamp
+- A frame that fits in one datagram is simply fragment 0 of 1
+
+The server forwards fragments untouched (no reassembly there); only receiving
+clients reassemble.
+===================================================================================
+"""
+
+import struct
+import time
+
+from .protocol import MEDIA_HEADER_SIZE
+
+FRAGMENT_HEADER = struct.Struct('!HHH')  # frame_id, index, count
+FRAGMENT_HEADER_SIZE = FRAGMENT_HEADER.size  # 6 bytes
+MAX_DATAGRAM_SIZE = 1200  # Whole datagram; fits a 1500-byte MTU with room for tunnels/VPNs
+FRAGMENT_PAYLOAD_SIZE = MAX_DATAGRAM_SIZE - MEDIA_HEADER_SIZE - FRAGMENT_HEADER_SIZE
+MAX_FRAGMENTS = 2048  # ~2.4 MB per frame; larger counts are rejected as corrupt
+REASSEMBLY_TIMEOUT = 0.5  # Seconds an incomplete frame is kept before eviction
+FRAME_ID_MODULO = 1 << 16
+
+def fragment_count(size: int, chunk_size: int = FRAGMENT_PAYLOAD_SIZE) -> int:
+    """Number of fragments a frame of this size needs (at least one)"""
+    return max(1, -(-size // chunk_size))
+
+def iter_fragments(data, chunk_size: int = FRAGMENT_PAYLOAD_SIZE):
+    """
+    Yield (index, count, chunk) for one frame. Chunks are memoryview slices
+    of data, so nothing is copied until they are written into a packet.
+    """
+    view = memoryview(data)
+    count = fragment_count(len(view), chunk_size)
+    for index in range(count):
+        yield index, count, view[index * chunk_size:(index + 1) * chunk_size]
+
+class PartialFrame:
+    """Fragments received so far for one frame"""
+    __slots__ = ('count', 'chunks', 'received', 'started')
+
+    def __init__(self, count, now):
+        self.count = count
+        self.chunks = [None] * count
+        self.received = 0
+        self.started = now
+
+class FrameReassembler:
+    """
+    Rebuilds frames from fragments, per sender stream.
+
+    USAGE:
+        frame = reassembler.add(stream_id, frame_id, index, count, chunk)
+        if frame is not None: decode and show it
+
+    POLICY:
+    - A frame is returned as soon as its last missing fragment arrives
+    - Incomplete frames are evicted after REASSEMBLY_TIMEOUT
+    - Once a frame completes, older incomplete frames from the same stream
+      are dropped (they would only be shown out of order)
+    - Fragments of frames already completed or evicted are ignored
+
+    Used from the client's UDP receiver thread only, so it is not locked.
+    """
+    def __init__(self, timeout=REASSEMBLY_TIMEOUT):
+        self.timeout = timeout
+        self.partial = {}  # (stream_id, frame_id) -> PartialFrame
+        self.last_complete = {}  # stream_id -> newest frame_id delivered
+        self.next_sweep = 0.0
+
+        # Statistics
+        self.completed = 0
+        self.evicted = 0  # Incomplete frames given up on (lost fragments)
+        self.stale = 0  # Fragments for frames already delivered or superseded
+
+    def add(self, stream_id, frame_id, index, count, chunk, now=None):
+        """Add one fragment; returns the complete frame (bytes) or None"""
+        if now is None:
+            now = time.monotonic()
+        if now >= self.next_sweep:
+            self.evict(now)
+
+        if count == 0 or count > MAX_FRAGMENTS or index >= count:
+            return None
+        if count == 1:
+            return self._deliver(stream_id, frame_id, bytes(chunk))
+        if self._is_old(stream_id, frame_id):
+            self.stale += 1
+            return None
+
+        key = (stream_id, frame_id)
+        frame = self.partial.get(key)
+        if frame is None:
+            frame = self.partial[key] = PartialFrame(count, now)
+        elif frame.count != count:
+            return None  # Corrupt or mismatched fragment
+        if frame.chunks[index] is not None:
+            return None  # Duplicate
+        frame.chunks[index] = bytes(chunk)
+        frame.received += 1
+        if frame.received < frame.count:
+            return None
+
+        del self.partial[key]
+        return self._deliver(stream_id, frame_id, b''.join(frame.chunks))
+
+    def evict(self, now=None):
+        """Give up on frames that have waited longer than the timeout"""
+        if now is None:
+            now = time.monotonic()
+        self.next_sweep = now + self.timeout / 2
+        expired = [key for key, frame in self.partial.items()
+                   if now - frame.started > self.timeout]
+        for key in expired:
+            del self.partial[key]
+        self.evicted += len(expired)
+
+    @property
+    def pending(self) -> int:
+        """Incomplete frames currently held"""
+        return len(self.partial)
+
+    def _is_old(self, stream_id, frame_id) -> bool:
+        """True if frame_id is not newer than the last frame delivered for the stream"""
+        last = self.last_complete.get(stream_id)
+        if last is None:
+            return False
+        return (frame_id - last) % FRAME_ID_MODULO >= FRAME_ID_MODULO // 2 or frame_id == last
+
+    def _deliver(self, stream_id, frame_id, data):
+        """Record a completed frame and drop older partial frames of the stream"""
+        if self._is_old(stream_id, frame_id):
+            self.stale += 1
+            return None
+        self.last_complete[stream_id] = frame_id
+        self.completed += 1
+        older = [key for key in self.partial
+                 if key[0] == stream_id and self._is_old(stream_id, key[1])]
+        for key in older:
+            del self.partial[key]
+        self.evicted += len(older)
+        return data
@@ -0,0 +1,157 @@
+"""
+===================================================================================
+LAST-FRAME CACHE - FRAMECACHE.PY
+===================================================================================
+The server's copy of the newest picture of every stream, replayed to whoever
+starts watching it.
+
+PURPOSE: A participant who joins mid-meeting, or scrolls the grid to a new
+page, used to see black tiles until each sender's next frame happened to
+arrive (up to a second for a static camera scene), and a late screen share
+viewer waited for the presenter's next full refresh. Replaying a cached frame
+makes time-to-first-frame a single round trip.
+
+CAMERA VIDEO (VideoFrameCache, fed from the UDP receive path):
+- The server never reassembles video, so a frame is cached as the datagrams
+  that carried it, one complete frame per (sender, simulcast layer)
+- To keep copying off the relay hot path, a new frame is captured at most
+  every FRAME_CACHE_INTERVAL seconds; a frame with a lost fragment is simply
+  replaced by the next one
+- Cached datagrams carry FLAG_CACHED_FRAME so receivers leave them out of
+  their loss/jitter reports (their sequence numbers and timestamps are old)
+
+SCREEN SHARING (ScreenFrameCache): the last full frame plus every tile update
+sent since, as relayed binary TCP frames, so a new viewer can rebuild the
+current slide exactly. When the updates outgrow SCREEN_CACHE_MAX_BYTES the
+cache is dropped and the caller asks the presenter for a full refresh.
+
+MEMORY BOUNDS: at most one complete and one partial frame per (sender, layer),
+each under FRAME_CACHE_MAX_BYTES, and one screen chain per meeting under
+SCREEN_CACHE_MAX_BYTES. Entries are removed when a sender leaves.
+===================================================================================
+"""
+
+from .fragment import FRAGMENT_HEADER, MAX_FRAGMENTS
+from .protocol import MEDIA_HEADER_SIZE, FLAG_CACHED_FRAME
+
+FRAME_CACHE_INTERVAL = 0.5  # Seconds between captures of a stream's newest frame
+FRAME_CACHE_MAX_BYTES = 512 * 1024  # Larger video frames are not cached
+SCREEN_CACHE_MAX_BYTES = 4 * 1024 * 1024  # Full screen frame + tile updates since
+
+class CapturedFrame:
+    """Datagrams of one video frame being captured"""
+    __slots__ = ('frame_id', 'packets', 'received', 'size')
+
+    def __init__(self, frame_id, count):
+        self.frame_id = frame_id
+        self.packets = [None] * count
+        self.received = 0
+        self.size = 0
+
+class VideoFrameCache:
+    """
+    Newest complete camera frame per (sender, layer), as ready-to-send datagrams.
+
+    USAGE:
+        cache.add(sender, layer, packet, now)    # every relayed video datagram
+        for packet in cache.frame(sender, layer):
+            sendto(packet, new_receiver)
+
+    add() runs on the UDP receive path only; frame() and forget() may be
+    called from other threads. Completed frames are published as tuples with a
+    single assignment, so readers never see a frame being built.
+    """
+    def __init__(self, interval=FRAME_CACHE_INTERVAL, max_bytes=FRAME_CACHE_MAX_BYTES):
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.frames = {}  # (sender, layer) -> tuple of datagrams of the last complete frame
+        self.capturing = {}  # (sender, layer) -> CapturedFrame
+        self.next_capture = {}  # (sender, layer) -> time the next capture may start
+
+    def add(self, sender, layer, packet, now):
+        """Look at one video datagram; copies it only while a frame is being captured"""
+        key = (sender, layer)
+        capture = self.capturing.get(key)
+        if capture is None and now < self.next_capture.get(key, 0.0):
+            return
+        if len(packet) <= MEDIA_HEADER_SIZE + FRAGMENT_HEADER.size:
+            return
+        frame_id, index, count = FRAGMENT_HEADER.unpack_from(packet, MEDIA_HEADER_SIZE)
+        if count == 0 or count > MAX_FRAGMENTS or index >= count:
+            return
+        if capture is None or capture.frame_id != frame_id or len(capture.packets) != count:
+            # Start on this frame (an unfinished one lost a fragment: give up on it)
+            capture = self.capturing[key] = CapturedFrame(frame_id, count)
+        if capture.packets[index] is not None:
+            return
+        capture.size += len(packet)
+        if capture.size > self.max_bytes:
+            del self.capturing[key]
+            self.next_capture[key] = now + self.interval
+            return
+
+        copy = bytearray(packet)  # packet is a view into a reused receive buffer
+        copy[1] |= FLAG_CACHED_FRAME
+        capture.packets[index] = bytes(copy)
+        capture.received += 1
+        if capture.received == count:
+            self.frames[key] = tuple(capture.packets)
+            del self.capturing[key]
+            self.next_capture[key] = now + self.interval
+
+    def frame(self, sender, layer) -> tuple:
+        """Datagrams of the sender's newest cached frame at this layer (may be empty)"""
+        return self.frames.get((sender, layer), ())
+
+    def forget(self, sender):
+        """Drop everything cached for a sender that left"""
+        for table in (self.frames, self.capturing, self.next_capture):
+            for key in [key for key in list(table) if key[0] == sender]:
+                table.pop(key, None)
+
+    @property
+    def cached_bytes(self) -> int:
+        return sum(len(packet) for frame in list(self.frames.values()) for packet in frame)
+
+class ScreenFrameCache:
+    """
+    Binary screen frames (TCP length prefix included) needed to rebuild the
+    presenter's current screen: the last full frame and the updates since.
+
+    USAGE:
+        if not cache.add(presenter_id, frame, full):
+            ask the presenter for a full refresh
+        for frame in cache.frames_for(presenter_id):
+            queue it for the new viewer
+
+    Callers hold the meeting lock, so frames are cached and relayed in the
+    same order.
+    """
+    def __init__(self, max_bytes=SCREEN_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.clear()
+
+    def clear(self):
+        self.presenter = None
+        self.frames = []
+        self.size = 0
+
+    def add(self, presenter, frame, full) -> bool:
+        """Cache one relayed frame; False if the chain overflowed and was dropped"""
+        if full or presenter != self.presenter:
+            self.clear()
+            if not full:
+                return True  # Nothing to build on until the next full frame
+            self.presenter = presenter
+        elif not self.frames:
+            return True
+        if self.size + len(frame) > self.max_bytes:
+            self.clear()
+            return False
+        self.frames.append(frame)
+        self.size += len(frame)
+        return True
+
+    def frames_for(self, presenter) -> list:
+        """The cached chain if it belongs to this presenter, else an empty list"""
+        return list(self.frames) if presenter == self.presenter else []
@@ -0,0 +1,223 @@
+"""
+===================================================================================
+ADAPTIVE JITTER BUFFER - JITTER.PY
+===================================================================================
+Client-side playout buffer for the server-mixed audio stream.
+
+PURPOSE: Packets arrive with network jitter, in bursts, and on the server's
+clock rather than the sound card's. Writing them straight to the device turns
+every burst and every bit of clock drift into latency that is never recovered.
+This buffer releases exactly one frame each time the playback device asks for
+one, and keeps its depth close to what the measured jitter requires.
+
+HOW IT WORKS:
+- Ordering: frames are keyed by header sequence number and played in order;
+  duplicates and packets older than the playout point are discarded (late)
+- Adaptive target: interarrival jitter is estimated from header timestamps vs
+  arrival times (RFC 3550 style); the target depth covers JITTER_COVERAGE x jitter
+- Prefill: playout (re)starts once the target depth is queued
+- Catch-up: while the depth exceeds the target, frames are shortened by
+  cutting a slice out with a crossfade (time-scale, pitch is unchanged), so
+  built-up latency drains within a second or two instead of persisting
+- Loss concealment: a missing frame (later ones present) is replaced by the
+  previous frame, faded; gaps longer than CONCEAL_MAX_FRAMES are skipped
+- Underrun: the buffer is empty (talkspurt ended or packets late) -> playout
+  stops and re-primes on the next packet
+
+THREADING: push() runs on the UDP receiver thread, pop() on the audio output
+thread; both take the buffer's lock briefly.
+===================================================================================
+"""
+
+import math
+import threading
+import time
+
+import numpy as np
+
+from .protocol import SEQUENCE_MODULO, TIMESTAMP_MODULO
+
+JITTER_MIN_DEPTH = 2  # Frames queued before playout starts (never less)
+JITTER_MAX_DEPTH = 8  # Upper bound for the adaptive target
+JITTER_CAPACITY = 25  # Hard limit; the oldest frames are dropped beyond it
+JITTER_COVERAGE = 3.0  # Target depth covers this many times the measured jitter
+CATCHUP_MARGIN = 1  # Frames above target before catch-up starts
+CATCHUP_FRACTION = 8  # Catch-up removes 1/8 of a frame each time
+CONCEAL_MAX_FRAMES = 3  # Consecutive frames replaced before falling silent
+CONCEAL_FADE = 0.5  # Gain applied per concealed frame
+
+HALF_SEQUENCE = SEQUENCE_MODULO // 2
+HALF_TIMESTAMP = TIMESTAMP_MODULO // 2
+
+def sequence_delta(a: int, b: int) -> int:
+    """Signed distance from sequence a to b, accounting for wraparound"""
+    return (b - a + HALF_SEQUENCE) % SEQUENCE_MODULO - HALF_SEQUENCE
+
+class AdaptiveJitterBuffer:
+    """
+    Sequence- and timestamp-aware audio playout buffer.
+
+    USAGE:
+        buffer.push(seq, timestamp, samples)   # receiver thread
+        frame = buffer.pop()                   # output thread, once per frame
+        if frame is None: play silence
+
+    METRICS: depth, target_depth, jitter_ms and stats() (counters for late,
+    duplicate, lost, concealed, underruns, shortened and dropped frames).
+    """
+    def __init__(self, sample_rate=16000, min_depth=JITTER_MIN_DEPTH,
+                 max_depth=JITTER_MAX_DEPTH, capacity=JITTER_CAPACITY):
+        self.sample_rate = sample_rate
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, sample_rate=None):
+        """Forget all queued audio and timing state (e.g. on rejoin)"""
+        with self.lock:
+            if sample_rate:
+                self.sample_rate = sample_rate
+            self.frames = {}  # seq -> int16 samples
+            self.next_seq = None  # Sequence number to play next
+            self.newest_seq = None  # Highest sequence number received
+            self.playing = False
+            self.last_frame = None  # For concealment
+            self.concealed_run = 0
+            self.last_transit = None
+            self.jitter_ms = 0.0
+            self.frame_ms = 20.0  # Updated from the length of real frames
+            self.counters = dict.fromkeys(
+                ('received', 'played', 'late', 'duplicate', 'lost', 'concealed',
+                 'underruns', 'shortened', 'dropped'), 0)
+
+    @property
+    def depth(self) -> int:
+        """Frames currently queued"""
+        return len(self.frames)
+
+    @property
+    def target_depth(self) -> int:
+        """Depth the buffer is steering toward, from the measured jitter"""
+        needed = math.ceil(self.jitter_ms * JITTER_COVERAGE / self.frame_ms) + 1
+        return max(self.min_depth, min(self.max_depth, needed))
+
+    def push(self, seq: int, timestamp: int, samples, arrival=None):
+        """Add one received frame (int16 samples) with its header seq/timestamp"""
+        if arrival is None:
+            arrival = time.monotonic()
+        with self.lock:
+            self.counters['received'] += 1
+            newer = self.newest_seq is None or sequence_delta(self.newest_seq, seq) > 0
+
+            # Jitter estimate from in-order packets only (reordering is not jitter)
+            if newer:
+                self.newest_seq = seq
+                transit = (int(arrival * 1000) - timestamp) % TIMESTAMP_MODULO
+                if self.last_transit is not None:
+                    change = abs((transit - self.last_transit + HALF_TIMESTAMP)
+                                 % TIMESTAMP_MODULO - HALF_TIMESTAMP)
+                    self.jitter_ms += (min(change, 1000) - self.jitter_ms) / 16.0
+                self.last_transit = transit
+
+            if self.next_seq is not None:
+                behind = sequence_delta(self.next_seq, seq)
+                # While re-priming, a packet far behind means the stream moved on
+                # during a long silence (not a late packet)
+                if behind < 0 and (self.playing or behind >= -self.capacity):
+                    self.counters['late'] += 1
+                    return
+            if seq in self.frames:
+                self.counters['duplicate'] += 1
+                return
+
+            self.frames[seq] = samples
+            if len(samples):
+                self.frame_ms += (len(samples) * 1000.0 / self.sample_rate - self.frame_ms) / 8.0
+
+            # Hard limit: drop the oldest frames
+            while len(self.frames) > self.capacity:
+                del self.frames[self._oldest_seq()]
+                self.counters['dropped'] += 1
+                if self.playing:
+                    self.next_seq = self._oldest_seq()
+
+    def pop(self):
+        """
+        Next frame to play (int16 array), or None for silence.
+
+        Call once per output frame, paced by the playback device.
+        """
+        with self.lock:
+            if not self.playing:
+                if len(self.frames) < self.target_depth:
+                    return None
+                self.playing = True
+                self.next_seq = self._oldest_seq()
+
+            frame = self.frames.pop(self.next_seq, None)
+            if frame is None:
+                if not self.frames:
+                    # Nothing left: stop and re-prime on the next packet
+                    self.playing = False
+                    self.counters['underruns'] += 1
+                    return None
+                oldest = self._oldest_seq()
+                if sequence_delta(self.next_seq, oldest) <= CONCEAL_MAX_FRAMES:
+                    return self._conceal()
+                # Long gap (nothing useful to conceal with): jump to what we have
+                self.next_seq = oldest
+                frame = self.frames.pop(oldest)
+
+            self.next_seq = (self.next_seq + 1) % SEQUENCE_MODULO
+            self.last_frame = frame
+            self.concealed_run = 0
+            self.counters['played'] += 1
+
+            # Catch-up: too much queued -> play this frame slightly shorter
+            if len(self.frames) > self.target_depth + CATCHUP_MARGIN:
+                frame = self._shorten(frame)
+                self.counters['shortened'] += 1
+            return frame
+
+    def stats(self) -> dict:
+        """Current depth/target/jitter plus all counters"""
+        with self.lock:
+            stats = dict(self.counters)
+            stats.update(depth=len(self.frames), target_depth=self.target_depth,
+                         jitter_ms=round(self.jitter_ms, 2))
+        return stats
+
+    def _oldest_seq(self) -> int:
+        """Oldest queued sequence number (relative to the newest, so wrap-safe)"""
+        return max(self.frames, key=lambda seq: (self.newest_seq - seq) % SEQUENCE_MODULO)
+
+    def _conceal(self):
+        """Stand in for a lost frame (caller holds the lock; later frames exist)"""
+        self.counters['lost'] += 1
+        self.next_seq = (self.next_seq + 1) % SEQUENCE_MODULO
+        self.concealed_run += 1
+        if self.last_frame is None or self.concealed_run > CONCEAL_MAX_FRAMES:
+            return None
+        self.counters['concealed'] += 1
+        gain = CONCEAL_FADE ** self.concealed_run
+        return (self.last_frame * gain).astype(np.int16)
+
+    @staticmethod
+    def _shorten(frame):
+        """
+        Remove 1/CATCHUP_FRACTION of a frame from its middle, crossfading across
+        the cut so there is no click. Pitch is unchanged (unlike resampling).
+        """
+        length = len(frame)
+        cut = length // CATCHUP_FRACTION
+        fade = min(cut, length // 8)
+        start = (length - cut - fade) // 2
+        if cut <= 0 or fade <= 0 or start < 0:
+            return frame
+        ramp = np.linspace(1.0, 0.0, fade, dtype=np.float32)
+        head = frame[start:start + fade].astype(np.float32)
+        tail = frame[start + cut:start + cut + fade].astype(np.float32)
+        blended = (head * ramp + tail * (1.0 - ramp)).astype(np.int16)
+        return np.concatenate((frame[:start], blended, frame[start + cut + fade:]))
@@ -0,0 +1,110 @@
+"""
+===================================================================================
+N-MINUS-ONE AUDIO MIXER - MIXER.PY
+===================================================================================
+Produces, in one pass, the mix every participant should hear: everyone except
+themselves (an "N-1" mix), plus the full mix for listen-only participants.
+
+ALGORITHM (all NumPy, no per-recipient Python loop):
+1. Copy this tick's frames into rows of a preallocated 2-D float32 array
+2. Sum the rows once -> the full bus
+3. Every N-1 mix = bus - own row, computed for all rows in one subtraction
+4. Soft-limit everything in place, then convert to int16
+
+LIMITER:
+Mixes are summed, not averaged, so a single talker keeps their level no matter
+how many others are connected. Peaks above the knee are compressed with tanh
+toward full scale instead of being hard-clipped (or everyone being scaled down).
+===================================================================================
+"""
+
+import numpy as np
+
+FULL_SCALE = 32767.0  # int16 peak
+LIMITER_KNEE = 0.6 * FULL_SCALE  # Below this the signal passes unchanged
+
+class NMinusOneMixer:
+    """
+    Reusable N-1 mixer with preallocated work arrays.
+
+    USAGE:
+        mixes = mixer.mix(frames)   # frames: list of int16 arrays
+        mixes[i]  -> what source i hears (everyone but i)
+        mixes[-1] -> the full mix (for participants who are not talking)
+
+    The returned array is owned by the mixer and overwritten by the next call.
+    Work arrays grow (never shrink) to the largest source count / frame size seen.
+    """
+    def __init__(self, max_sources=8, frame_samples=1024):
+        self.sources = np.zeros((0, 0), dtype=np.float32)
+        self.mixes = np.zeros((0, 0), dtype=np.float32)
+        self.scratch = np.zeros((0, 0), dtype=np.float32)
+        self.output = np.zeros((0, 0), dtype=np.int16)
+        self.bus = np.zeros(0, dtype=np.float32)
+        self._ensure_capacity(max_sources, frame_samples)
+
+    def _ensure_capacity(self, sources, samples):
+        """Grow the work arrays if this tick needs more rows or samples"""
+        rows, cols = self.sources.shape
+        if sources <= rows and samples <= cols:
+            return
+        rows, cols = max(sources, rows), max(samples, cols)
+        self.sources = np.zeros((rows, cols), dtype=np.float32)
+        self.mixes = np.zeros((rows + 1, cols), dtype=np.float32)
+        self.scratch = np.zeros((rows + 1, cols), dtype=np.float32)
+        self.output = np.zeros((rows + 1, cols), dtype=np.int16)
+        self.bus = np.zeros(cols, dtype=np.float32)
+
+    def mix(self, frames):
+        """
+        Mix one tick of frames.
+
+        RETURNS: int16 array of shape (len(frames) + 1, samples); row i is the
+        N-1 mix for frames[i], the last row is the full mix. Shorter frames are
+        zero-padded to the longest one.
+        """
+        count = len(frames)
+        samples = max(len(frame) for frame in frames)
+        self._ensure_capacity(count, samples)
+
+        # 1. Stack sources
+        stack = self.sources[:count, :samples]
+        for row, frame in zip(stack, frames):
+            length = len(frame)
+            row[:length] = frame
+            row[length:] = 0
+
+        # 2. Full bus, summed once
+        bus = self.bus[:samples]
+        np.sum(stack, axis=0, out=bus)
+
+        # 3. Every N-1 mix in one vectorized subtraction (+ the full bus as last row)
+        mixes = self.mixes[:count + 1, :samples]
+        np.subtract(bus, stack, out=mixes[:count])
+        mixes[count] = bus
+
+        # 4. Soft limiter, then int16
+        self._soft_limit(mixes, self.scratch[:count + 1, :samples])
+        output = self.output[:count + 1, :samples]
+        np.copyto(output, mixes, casting='unsafe')
+        return output
+
+    @staticmethod
+    def _soft_limit(mixes, scratch):
+        """
+        In-place soft-knee limiter.
+
+        |x| <= knee: unchanged. Above the knee the excess e is replaced by
+        headroom * tanh(e / headroom), which approaches full scale smoothly and
+        never exceeds it.
+        """
+        headroom = FULL_SCALE - LIMITER_KNEE
+        np.abs(mixes, out=scratch)
+        scratch -= LIMITER_KNEE
+        np.maximum(scratch, 0, out=scratch)  # Excess above the knee
+        scratch *= 1.0 / headroom
+        np.tanh(scratch, out=scratch)
+        scratch *= headroom  # Compressed excess
+        np.copysign(scratch, mixes, out=scratch)
+        np.clip(mixes, -LIMITER_KNEE, LIMITER_KNEE, out=mixes)
+        mixes += scratch
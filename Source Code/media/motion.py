@@ -0,0 +1,124 @@
+"""
+===================================================================================
+STATIC SCENE DETECTION - MOTION.PY
+===================================================================================
+Decides, per captured camera frame, whether it is worth encoding and sending.
+
+PURPOSE: The capture timer encodes and sends every frame, even when nobody in
+front of the camera moves. Comparing a tiny luminance thumbnail with the last
+frame sent costs far less than a JPEG encode, so unchanged frames are skipped
+(the camera-side counterpart of the microphone's voice activity detector).
+
+DETECTION:
+- Luminance is sampled on a coarse grid (every CHANGE_SAMPLE_STRIDE pixels) and
+  averaged into cells of CHANGE_CELL_SIZE x CHANGE_CELL_SIZE samples; averaging
+  cancels sensor noise, which would otherwise look like change everywhere
+- The frame counts as changed when any cell's mean moved by more than the
+  threshold (luma levels, 0-255) since the last frame sent, so small local
+  motion (a talking mouth) is caught even in an otherwise static picture
+- Keep-alive: a static scene is still refreshed every refresh_interval
+  seconds, so receivers that joined or lost packets catch up
+
+STATISTICS: skipped frames, plus estimates of the uplink (average bytes per
+sent frame) and encode time (average per sent frame) they saved.
+===================================================================================
+"""
+
+import time
+
+import numpy as np
+
+VIDEO_CHANGE_THRESHOLD = 2.0  # Cell mean luma change that counts as motion
+VIDEO_REFRESH_INTERVAL = 1.0  # Seconds between keep-alive frames of a static scene
+CHANGE_SAMPLE_STRIDE = 4  # Sample every 4th pixel in both directions
+CHANGE_CELL_SIZE = 8  # Samples per cell side (32x32 pixels at stride 4)
+LUMA_WEIGHTS = np.array([0.114, 0.587, 0.299], dtype=np.float32)  # BGR (OpenCV order)
+
+class FrameChangeDetector:
+    """
+    Skip-unchanged-frame gate for the camera sender.
+
+    USAGE:
+        if detector.check(frame):          # frame: BGR uint8 image
+            ... encode and send ...
+            detector.record(sent_bytes, encode_seconds)
+    """
+    def __init__(self, threshold=VIDEO_CHANGE_THRESHOLD, refresh_interval=VIDEO_REFRESH_INTERVAL):
+        self.threshold = threshold
+        self.refresh_interval = refresh_interval
+        self.reference = None  # Cell means of the last frame sent
+        self.last_sent = 0.0
+
+        # Statistics
+        self.frames_total = 0
+        self.frames_sent = 0
+        self.refreshes = 0  # Keep-alive frames sent for a static scene
+        self.check_seconds = 0.0  # Time spent in check() (the detector's own cost)
+        self.avg_bytes = 0.0  # Moving averages over sent frames
+        self.avg_encode_seconds = 0.0
+
+    def reset(self):
+        """Forget the reference so the next frame is sent (e.g. camera restarted)"""
+        self.reference = None
+
+    def check(self, frame, now=None) -> bool:
+        """True if the frame should be encoded and sent"""
+        if now is None:
+            now = time.monotonic()
+        started = time.perf_counter()
+        cells = self._cell_means(frame)
+        self.frames_total += 1
+
+        if self.reference is None or self.reference.shape != cells.shape:
+            changed = True
+        else:
+            changed = float(np.abs(cells - self.reference).max()) > self.threshold
+        refresh = not changed and now - self.last_sent >= self.refresh_interval
+        if changed or refresh:
+            self.reference = cells
+            self.last_sent = now
+            self.frames_sent += 1
+            self.refreshes += refresh
+        self.check_seconds += time.perf_counter() - started
+        return changed or refresh
+
+    def record(self, sent_bytes, encode_seconds):
+        """Cost of a frame that was sent (for the savings estimates)"""
+        if self.frames_sent <= 1:
+            self.avg_bytes = float(sent_bytes)
+            self.avg_encode_seconds = encode_seconds
+        else:
+            self.avg_bytes += (sent_bytes - self.avg_bytes) / 16.0
+            self.avg_encode_seconds += (encode_seconds - self.avg_encode_seconds) / 16.0
+
+    @property
+    def frames_skipped(self) -> int:
+        return self.frames_total - self.frames_sent
+
+    def stats(self) -> dict:
+        """Skipped frames and the uplink/CPU they are estimated to have saved"""
+        skipped = self.frames_skipped
+        return {
+            'frames': self.frames_total,
+            'sent': self.frames_sent,
+            'skipped': skipped,
+            'refreshes': self.refreshes,
+            'saved_kbytes': round(skipped * self.avg_bytes / 1024, 1),
+            'saved_encode_ms': round(skipped * self.avg_encode_seconds * 1000, 1),
+            'detector_ms': round(self.check_seconds * 1000, 1),
+        }
+
+    @staticmethod
+    def _cell_means(frame):
+        """Per-cell mean luminance of a coarse sample grid"""
+        samples = frame[::CHANGE_SAMPLE_STRIDE, ::CHANGE_SAMPLE_STRIDE]
+        if samples.ndim == 3:
+            luma = samples[..., :3].astype(np.float32) @ LUMA_WEIGHTS
+        else:
+            luma = samples.astype(np.float32)
+        rows = max(1, luma.shape[0] // CHANGE_CELL_SIZE)
+        cols = max(1, luma.shape[1] // CHANGE_CELL_SIZE)
+        size_y = min(CHANGE_CELL_SIZE, luma.shape[0])
+        size_x = min(CHANGE_CELL_SIZE, luma.shape[1])
+        luma = luma[:rows * size_y, :cols * size_x]
+        return luma.reshape(rows, size_y, cols, size_x).mean(axis=(1, 3))
@@ -0,0 +1,218 @@
+"""
+===================================================================================
+CAMERA PIPELINE HELPERS - PIPELINE.PY
+===================================================================================
+Hand-off and instrumentation for the client's camera capture/encode threads,
+and the worker pool that decodes received video off the GUI thread.
+
+PURPOSE: Capture, resize, JPEG encoding and the local preview used to run
+back to back on the Qt GUI thread from a timer, so a busy UI lowered the frame
+rate and a slow encode froze chat and controls. The work now runs on a
+capture thread and an encoder thread, and only the finished preview goes back
+to the GUI.
+
+HAND-OFF (FrameSlot): a queue of exactly one frame. The capture thread always
+overwrites it, so the encoder picks up the newest frame when it is free and a
+slow encode drops stale frames instead of adding latency or memory.
+
+TIMINGS (StageTimings): moving average and worst time per named stage
+(capture, resize, detect, encode, send, preview, queue wait), so it is
+visible where the frame budget goes.
+
+DECODING (DecodePool): received JPEG frames used to be decoded on the GUI
+thread, which with many participants left little time for anything else.
+A few worker threads decode instead (OpenCV releases the GIL while
+decoding). Each sender has a latest-wins slot: a frame that arrives before
+the previous one was picked up replaces it, so a backlog is dropped before
+any decode work is spent on it, and only decoded images reach the UI.
+===================================================================================
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+DECODE_WORKERS = max(2, min(4, (os.cpu_count() or 2) - 1))  # Video decode threads
+
+class FrameSlot:
+    """
+    Single-slot, latest-wins hand-off between two threads.
+
+    USAGE:
+        slot.put(frame)                  # producer, never blocks
+        item = slot.take(timeout)        # consumer: (frame, put_time) or None
+        slot.close()                     # wakes the consumer for shutdown
+    """
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.item = None  # (frame, time.perf_counter() when put)
+        self.closed = False
+
+        # Statistics
+        self.puts = 0
+        self.superseded = 0  # Frames replaced before the consumer took them
+
+    def put(self, frame):
+        with self.condition:
+            if self.item is not None:
+                self.superseded += 1
+            self.item = (frame, time.perf_counter())
+            self.puts += 1
+            self.condition.notify()
+
+    def take(self, timeout=None):
+        """Wait for a frame; None on timeout or once closed"""
+        with self.condition:
+            if self.item is None and not self.closed:
+                self.condition.wait(timeout)
+            item, self.item = self.item, None
+            return None if self.closed else item
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.item = None
+            self.condition.notify_all()
+
+class StageTimings:
+    """
+    Per-stage processing times, in milliseconds.
+
+    USAGE:
+        started = time.perf_counter()
+        ... work ...
+        timings.add('encode', time.perf_counter() - started)
+        timings.stats()   # {'encode': {'avg_ms', 'max_ms', 'count'}, ...}
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}  # name -> [count, average seconds, max seconds]
+
+    def add(self, stage, seconds):
+        with self.lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                self.stages[stage] = [1, seconds, seconds]
+                return
+            entry[0] += 1
+            entry[1] += (seconds - entry[1]) / 16.0
+            entry[2] = max(entry[2], seconds)
+
+    def reset(self):
+        with self.lock:
+            self.stages.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                stage: {'avg_ms': round(average * 1000, 2), 'max_ms': round(worst * 1000, 2),
+                        'count': count}
+                for stage, (count, average, worst) in self.stages.items()
+            }
+
+class DecodePool:
+    """
+    Worker threads decoding the newest frame of every sender.
+
+    USAGE:
+        pool = DecodePool(decode, deliver)   # decode(data) -> image or None
+        pool.submit(sender, data)            # any thread, never blocks
+        # deliver(sender, image) is called on a worker thread
+        pool.forget(sender) / pool.close()
+
+    ORDERING: a sender is decoded by one worker at a time, so its images are
+    delivered in arrival order; different senders decode in parallel.
+    """
+    def __init__(self, decode, deliver, workers=DECODE_WORKERS, name='video-decode'):
+        self.decode = decode
+        self.deliver = deliver
+        self.condition = threading.Condition()
+        self.pending = {}  # sender -> newest data not yet picked up
+        self.ready = deque()  # Senders with pending data and no worker on them, oldest first
+        self.busy = set()  # Senders a worker is decoding right now
+        self.closed = False
+        self.timings = StageTimings()
+
+        # Statistics
+        self.submitted = 0
+        self.superseded = 0  # Frames dropped before decode (a newer one arrived)
+        self.decoded = 0
+        self.failed = 0
+
+        self.threads = [threading.Thread(target=self._work, name=f'{name}-{index}', daemon=True)
+                        for index in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, sender, data):
+        """Queue a frame, replacing the sender's frame still waiting (if any)"""
+        with self.condition:
+            if self.closed:
+                return
+            self.submitted += 1
+            if sender in self.pending:
+                self.superseded += 1
+            elif sender not in self.busy:
+                self.ready.append(sender)
+                self.condition.notify()
+            self.pending[sender] = (data, time.perf_counter())
+
+    def forget(self, sender):
+        """Drop a departed sender's waiting frame"""
+        with self.condition:
+            if self.pending.pop(sender, None) is not None and sender in self.ready:
+                self.ready.remove(sender)
+
+    def close(self):
+        """Stop the workers; frames still waiting are discarded"""
+        with self.condition:
+            self.closed = True
+            self.pending.clear()
+            self.ready.clear()
+            self.condition.notify_all()
+
+    def stats(self) -> dict:
+        with self.condition:
+            counts = {
+                'submitted': self.submitted,
+                'superseded': self.superseded,
+                'decoded': self.decoded,
+                'failed': self.failed,
+            }
+        counts['timings'] = self.timings.stats()
+        return counts
+
+    def _work(self):
+        while True:
+            with self.condition:
+                while not self.ready and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                sender = self.ready.popleft()
+                data, submitted = self.pending.pop(sender)
+                self.busy.add(sender)
+
+            started = time.perf_counter()
+            self.timings.add('queue', started - submitted)
+            try:
+                image = self.decode(data)
+            except Exception:
+                image = None
+            self.timings.add('decode', time.perf_counter() - started)
+            if image is not None:
+                try:
+                    self.deliver(sender, image)
+                except Exception:
+                    pass
+
+            with self.condition:
+                self.busy.discard(sender)
+                if image is None:
+                    self.failed += 1
+                else:
+                    self.decoded += 1
+                if sender in self.pending and not self.closed:
+                    self.ready.append(sender)
+                    self.condition.notify()
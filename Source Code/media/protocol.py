@@ -0,0 +1,72 @@
+"""
+===================================================================================
+UDP MEDIA PACKET FORMAT - PROTOCOL.PY
+===================================================================================
+Shared by server.py and client.py so both ends agree on the wire format.
+
+PACKET STRUCTURE (12-byte header, network byte order, then the payload):
+    [Type (1)][Flags (1)][Stream ID (4)][Sequence (2)][Timestamp (4)][Payload]
+
+- Type: ord('V') video, ord('A') audio, ord('I') initialization
+- Flags: per-packet signalling bits (FLAG_*), 0 when unused
+- Stream ID: 32-bit number assigned by the server at join time (SSRC-style);
+  replaces the old variable-length 'username_ip_port' client_id string
+- Sequence: per-stream packet counter, wraps at 65536
+- Timestamp: sender's media clock in milliseconds, wraps at 2^32
+
+Stream ID 0 is reserved for audio mixed by the server.
+
+TCP FRAMING (control channel, after the unframed join handshake):
+    [Length (4)][Body]
+The top bit of the length (TCP_BINARY_FLAG) marks a binary frame: raw media
+such as screen sharing updates (see media/tiles.py), relayed by the server
+without decoding the payload. Otherwise the body is a JSON message.
+===================================================================================
+"""
+
+import struct
+import time
+
+MEDIA_HEADER = struct.Struct('!BBIHI')  # type, flags, stream_id, seq, timestamp
+MEDIA_HEADER_SIZE = MEDIA_HEADER.size  # 12 bytes
+
+STREAM_VIDEO = ord('V')
+STREAM_AUDIO = ord('A')
+STREAM_INIT = ord('I')
+
+MIXED_AUDIO_STREAM_ID = 0  # Server-mixed audio carries this stream ID
+MAX_UDP_PAYLOAD = 65507  # IP limit (65,535) - IP header (20) - UDP header (8)
+
+# Header flag bits
+FLAG_SPEECH_START = 0x01  # Audio: first packet after silence (talkspurt begins)
+FLAG_SILENCE_START = 0x02  # Audio: last packet before the sender goes silent
+FLAG_CACHED_FRAME = 0x04  # Video: replayed from the server's last-frame cache, not live
+
+# TCP length prefix bits
+TCP_BINARY_FLAG = 0x80000000  # Body is a binary frame, not JSON
+TCP_LENGTH_MASK = 0x7FFFFFFF
+
+SEQUENCE_MODULO = 1 << 16
+TIMESTAMP_MODULO = 1 << 32
+
+def media_timestamp() -> int:
+    """Current media clock value (milliseconds, wrapped to 32 bits)"""
+    return int(time.monotonic() * 1000) % TIMESTAMP_MODULO
+
+def next_sequence(seq: int) -> int:
+    """Sequence number following seq (wraps at 65536)"""
+    return (seq + 1) % SEQUENCE_MODULO
+
+def pack_media_header(buffer, stream_type: int, stream_id: int, seq: int,
+                      timestamp: int, flags: int = 0):
+    """Write a media header into the start of a preallocated buffer"""
+    MEDIA_HEADER.pack_into(buffer, 0, stream_type, flags, stream_id, seq, timestamp)
+
+def tcp_length_prefix(length: int, binary: bool = False) -> bytes:
+    """4-byte TCP frame prefix for a body of this length"""
+    return struct.pack('!I', length | TCP_BINARY_FLAG if binary else length)
+
+def build_media_packet(stream_type: int, stream_id: int, seq: int, timestamp: int,
+                       payload, flags: int = 0) -> bytes:
+    """Header + payload as a new bytes object"""
+    return MEDIA_HEADER.pack(stream_type, flags, stream_id, seq, timestamp) + bytes(payload)
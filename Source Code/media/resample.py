@@ -0,0 +1,113 @@
+"""
+===================================================================================
+AUDIO FORMAT & RESAMPLING - RESAMPLE.PY
+===================================================================================
+Meeting audio format negotiation and the server's sample-rate converter.
+
+AUDIO FORMAT:
+Each meeting runs at one sample rate and frame duration, chosen by the host's
+client at creation from AUDIO_SAMPLE_RATES x AUDIO_FRAME_DURATIONS (default
+16 kHz wideband, 20 ms frames). Every participant captures and plays at the
+meeting rate when its sound card supports it; otherwise it uses a rate it does
+support and the server converts in both directions. Frame duration is the same
+for everyone, so one frame is one mixer tick whatever the rate.
+
+RESAMPLER:
+Windowed-sinc interpolation evaluated for a whole frame at once: the tap
+positions and weights for a frame are computed once and reused, so each frame
+is one NumPy gather, multiply and row sum. Each stream keeps its own converter
+because the filter carries a few samples of history across frame boundaries
+(no clicks between frames); this delays the stream by RESAMPLER_HALF_TAPS
+input samples (well under a millisecond).
+===================================================================================
+"""
+
+import numpy as np
+
+AUDIO_SAMPLE_RATES = (8000, 16000, 24000, 48000)  # Supported meeting/device rates (Hz)
+AUDIO_FRAME_DURATIONS = (10, 20)  # Supported frame durations (ms)
+DEFAULT_SAMPLE_RATE = 16000  # Wideband speech
+DEFAULT_FRAME_MS = 20
+RESAMPLER_HALF_TAPS = 8  # Filter taps on each side of an output sample
+
+def frame_samples(sample_rate: int, frame_ms: int) -> int:
+    """Samples in one frame at this rate"""
+    return sample_rate * frame_ms // 1000
+
+def negotiate_audio_format(requested) -> dict:
+    """
+    Meeting format from the host's request ({'sample_rate', 'frame_ms'});
+    unsupported or missing values fall back to the defaults.
+    """
+    requested = requested if isinstance(requested, dict) else {}
+    sample_rate = requested.get('sample_rate')
+    frame_ms = requested.get('frame_ms')
+    return {
+        'sample_rate': sample_rate if sample_rate in AUDIO_SAMPLE_RATES else DEFAULT_SAMPLE_RATE,
+        'frame_ms': frame_ms if frame_ms in AUDIO_FRAME_DURATIONS else DEFAULT_FRAME_MS,
+    }
+
+def negotiate_capture_rate(meeting_rate: int, capture_rates) -> int:
+    """
+    Rate a participant should capture/play at: the meeting rate if its device
+    supports it (or it did not say), else the first supported rate it offered.
+    """
+    if not capture_rates or meeting_rate in capture_rates:
+        return meeting_rate
+    for rate in capture_rates:
+        if rate in AUDIO_SAMPLE_RATES:
+            return rate
+    return meeting_rate
+
+class Resampler:
+    """
+    Stateful sample-rate converter for one audio stream.
+
+    USAGE:
+        resampler = Resampler(48000, 16000)
+        out = resampler.process(frame)   # int16 in, int16 out, every frame
+
+    Frames must be a whole number of output samples long at the target rate
+    (true for every supported rate and frame duration).
+    """
+    def __init__(self, src_rate: int, dst_rate: int, half_taps=RESAMPLER_HALF_TAPS):
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.half_taps = half_taps
+        self.history = np.zeros(2 * half_taps, dtype=np.float32)
+        self._plan_length = None  # Input length the gather plan was built for
+        self._indices = None
+        self._weights = None
+
+    def _plan(self, length):
+        """Tap positions and weights for an input frame of this length"""
+        outputs = length * self.dst_rate // self.src_rate
+        step = self.src_rate / self.dst_rate
+        # Output n sits at input position half_taps + n * step of [history | frame]
+        centers = self.half_taps + np.arange(outputs) * step
+        base = np.floor(centers).astype(np.int64)
+        offsets = np.arange(-self.half_taps + 1, self.half_taps + 1)
+        indices = base[:, None] + offsets[None, :]
+        distance = centers[:, None] - indices  # In input samples
+
+        # Low-pass at the lower of the two Nyquist frequencies (anti-aliasing)
+        cutoff = min(1.0, self.dst_rate / self.src_rate)
+        window = 0.5 + 0.5 * np.cos(np.pi * distance / self.half_taps)  # Hann
+        weights = cutoff * np.sinc(cutoff * distance) * window
+        weights /= weights.sum(axis=1, keepdims=True)  # Unity gain at DC
+
+        self._plan_length = length
+        self._indices = indices
+        self._weights = weights.astype(np.float32)
+
+    def process(self, samples) -> np.ndarray:
+        """Convert one frame of int16 samples"""
+        if self.src_rate == self.dst_rate:
+            return samples
+        if len(samples) != self._plan_length:
+            self._plan(len(samples))
+        extended = np.concatenate((self.history, samples.astype(np.float32)))
+        self.history = extended[-2 * self.half_taps:]
+        out = (extended[self._indices] * self._weights).sum(axis=1)
+        np.clip(out, -32768, 32767, out=out)
+        return out.astype(np.int16)
@@ -0,0 +1,73 @@
+"""
+===================================================================================
+SIMULCAST VIDEO LAYERS - SIMULCAST.PY
+===================================================================================
+Spatial layers a camera sender encodes and how the server picks one per receiver.
+
+PURPOSE: A single 640x480 stream made every receiver pay for full resolution,
+even when it shows the sender as a thumbnail in a 4x4 grid or is on a slow
+link. The sender now encodes up to three spatial layers of each frame and the
+server forwards each receiver only the layer that suits it.
+
+LAYERS (index -> resolution, nominal bitrate at 20 fps JPEG quality 60):
+    0: 640x480  (~4.8 Mbit/s)
+    1: 320x240  (~1.6 Mbit/s)
+    2: 160x120  (~0.5 Mbit/s)
+
+WIRE FORMAT: the layer index travels in the low bits of the media header flags
+byte (VIDEO_LAYER_MASK). Each layer is fragmented on its own but shares the
+sender's frame ID counter, so fragments of different layers never mix.
+Senders that predate simulcast send flags 0, i.e. layer 0 only.
+
+SELECTION (server):
+- Each receiver reports the on-screen size of every tile it renders; the
+  wanted layer is the smallest one that still covers the tile
+- If the receiver declared a bandwidth budget, the most expensive streams are
+  stepped down a layer at a time until the total fits
+- A sender is told which layers anyone wants ('video_layers') and encodes
+  only those; until a wanted layer is seen on the wire the receiver gets the
+  nearest layer the sender does produce
+===================================================================================
+"""
+
+VIDEO_LAYERS = ((640, 480), (320, 240), (160, 120))  # Index 0 = full resolution
+VIDEO_LAYER_KBPS = (4800, 1600, 500)  # Nominal bitrate per layer (20 fps, JPEG q60)
+VIDEO_LAYER_MASK = 0x03  # Video header flags bits carrying the layer index
+ALL_VIDEO_LAYERS = tuple(range(len(VIDEO_LAYERS)))
+LOWEST_VIDEO_LAYER = len(VIDEO_LAYERS) - 1
+
+def video_layer_for_tile(width, height) -> int:
+    """Smallest layer that covers a tile of this size (device pixels)"""
+    for layer in range(LOWEST_VIDEO_LAYER, -1, -1):
+        layer_width, layer_height = VIDEO_LAYERS[layer]
+        if width <= layer_width and height <= layer_height:
+            return layer
+    return 0
+
+def nearest_video_layer(wanted: int, available) -> int:
+    """
+    Layer to forward when the sender may not produce the wanted one: the
+    wanted layer if available, else the closest, preferring higher resolution.
+    """
+    if not available or wanted in available:
+        return wanted
+    return min(available, key=lambda layer: (abs(layer - wanted), layer))
+
+def fit_video_layers(wanted: dict, budget_kbps=None) -> dict:
+    """
+    Step the most expensive streams down one layer at a time until the
+    nominal total fits budget_kbps (or everything is at the lowest layer).
+    wanted maps sender -> layer; returns a new dict.
+    """
+    layers = dict(wanted)
+    if not budget_kbps:
+        return layers
+    total = sum(VIDEO_LAYER_KBPS[layer] for layer in layers.values())
+    while total > budget_kbps:
+        reducible = [sender for sender, layer in layers.items() if layer < LOWEST_VIDEO_LAYER]
+        if not reducible:
+            break
+        sender = max(reducible, key=lambda s: VIDEO_LAYER_KBPS[layers[s]])
+        total -= VIDEO_LAYER_KBPS[layers[sender]] - VIDEO_LAYER_KBPS[layers[sender] + 1]
+        layers[sender] += 1
+    return layers
@@ -0,0 +1,248 @@
+"""
+===================================================================================
+SCREEN SHARING TILES - TILES.PY
+===================================================================================
+Dirty-tile updates for screen sharing: only the parts of the screen that
+changed are encoded and sent, and receivers paint them onto a persistent canvas.
+
+PURPOSE: The presenter used to JPEG-encode and send the whole (scaled) screen
+three times a second even when the slide had not changed. Most of the time
+nothing or very little changes (a static slide, a blinking caret, a scrolled
+pane), so nearly all of that was redundant.
+
+HOW IT WORKS (presenter, ScreenTileEncoder):
+- The frame is split into SCREEN_TILE_SIZE x SCREEN_TILE_SIZE tiles and
+  compared with the previous frame (exact, vectorized: every tile that
+  differs in any pixel is dirty)
+- Nothing dirty -> nothing is sent
+- Dirty tiles are merged into rectangles (runs within a tile row, stacked
+  when the rows below have the same run) so each update is a few JPEGs, not
+  one per tile; each rectangle carries its own position
+- Full refresh: the whole frame as one image when more than
+  SCREEN_FULL_FRACTION of it is dirty, every SCREEN_REFRESH_INTERVAL seconds,
+  on the first frame or a size change, and when a receiver asks for one
+
+RECEIVERS (ScreenCanvas): full frames replace the canvas, rectangles are
+pasted at their position. Updates carry a sequence number; a receiver that
+sees a gap (an update dropped under backpressure) or has no canvas yet asks
+for a refresh ('screen_refresh'). The server answers it from its cached chain
+(media/framecache.py) and only forwards it to the presenter without one.
+
+WIRE FORMAT (binary TCP frame, see TCP framing in media/protocol.py):
+    [Kind 'S' (1)][Flags (1)][Presenter stream ID (4)][Seq (4)]
+    [Width (2)][Height (2)][Tile count (2)]
+    then per tile: [X (2)][Y (2)][Length (4)][JPEG bytes]
+- Flags: SCREEN_FLAG_FULL for a full frame (one tile at 0, 0)
+- The server checks the header and relays the frame as-is; JPEG bytes are
+  never base64-encoded, JSON-wrapped or parsed on the way
+
+Image encoding is left to the caller (JPEG via OpenCV on the client), so
+this module only needs NumPy.
+===================================================================================
+"""
+
+import struct
+import time
+
+import numpy as np
+
+SCREEN_TILE_SIZE = 64  # Tile side in pixels
+SCREEN_REFRESH_INTERVAL = 10.0  # Seconds between unconditional full refreshes
+SCREEN_FULL_FRACTION = 0.5  # Dirty share of tiles above which a full frame is cheaper
+
+BINARY_SCREEN_FRAME = ord('S')  # Binary TCP frame kind
+SCREEN_FLAG_FULL = 0x01
+SCREEN_FRAME_HEADER = struct.Struct('!BBIIHHH')  # kind, flags, stream_id, seq, width, height, tiles
+SCREEN_TILE_HEADER = struct.Struct('!HHI')  # x, y, length
+
+def pack_screen_frame(stream_id, seq, width, height, full, tiles) -> bytes:
+    """Binary frame body for one update; tiles: [(x, y, jpeg_bytes)]"""
+    parts = [SCREEN_FRAME_HEADER.pack(BINARY_SCREEN_FRAME, SCREEN_FLAG_FULL if full else 0,
+                                      stream_id, seq, width, height, len(tiles))]
+    for x, y, data in tiles:
+        parts.append(SCREEN_TILE_HEADER.pack(x, y, len(data)))
+        parts.append(data)
+    return b''.join(parts)
+
+def parse_screen_frame(body):
+    """
+    Decode a binary frame body into (stream_id, seq, width, height, full, tiles)
+    where tiles is [(x, y, memoryview)]. Raises ValueError if malformed.
+    """
+    view = memoryview(body)
+    if len(view) < SCREEN_FRAME_HEADER.size:
+        raise ValueError("Screen frame shorter than its header")
+    kind, flags, stream_id, seq, width, height, count = SCREEN_FRAME_HEADER.unpack_from(view)
+    if kind != BINARY_SCREEN_FRAME:
+        raise ValueError("Not a screen frame")
+    tiles = []
+    offset = SCREEN_FRAME_HEADER.size
+    for _ in range(count):
+        if offset + SCREEN_TILE_HEADER.size > len(view):
+            raise ValueError("Truncated screen tile header")
+        x, y, length = SCREEN_TILE_HEADER.unpack_from(view, offset)
+        offset += SCREEN_TILE_HEADER.size
+        if offset + length > len(view):
+            raise ValueError("Truncated screen tile")
+        tiles.append((x, y, view[offset:offset + length]))
+        offset += length
+    return stream_id, seq, width, height, bool(flags & SCREEN_FLAG_FULL), tiles
+
+class ScreenTileEncoder:
+    """
+    Finds the changed regions of successive screen frames.
+
+    USAGE:
+        update = encoder.update(frame)       # BGR uint8 image
+        if update is not None:
+            full, regions = update           # regions: [(x, y, image view), ...]
+            ... encode each region and send ...
+
+    request_refresh() may be called from another thread; it only sets a flag.
+    """
+    def __init__(self, tile_size=SCREEN_TILE_SIZE, refresh_interval=SCREEN_REFRESH_INTERVAL,
+                 full_fraction=SCREEN_FULL_FRACTION):
+        self.tile_size = tile_size
+        self.refresh_interval = refresh_interval
+        self.full_fraction = full_fraction
+        self.reset()
+
+    def reset(self):
+        """Forget the previous frame (the next update is a full refresh)"""
+        self.previous = None
+        self.last_full = 0.0
+        self.refresh_requested = False
+
+        # Statistics
+        self.frames = 0
+        self.unchanged = 0
+        self.full_refreshes = 0
+        self.regions_sent = 0
+        self.tiles_sent = 0
+
+    def request_refresh(self):
+        """Send the whole frame next time (a receiver lost an update or just joined)"""
+        self.refresh_requested = True
+
+    def update(self, frame, now=None):
+        """
+        Compare with the previous frame.
+
+        RETURNS: None if nothing changed, else (full, regions) where regions is
+        [(x, y, view)] and a full refresh is the single region (0, 0, frame).
+        """
+        if now is None:
+            now = time.monotonic()
+        self.frames += 1
+        previous, self.previous = self.previous, frame.copy()
+        height, width = frame.shape[:2]
+        size = self.tile_size
+        rows, cols = -(-height // size), -(-width // size)
+
+        full = (previous is None or previous.shape != frame.shape or self.refresh_requested or
+                now - self.last_full >= self.refresh_interval)
+        if not full:
+            dirty = self._dirty_tiles(previous, frame, rows, cols)
+            count = int(dirty.sum())
+            if count == 0:
+                self.unchanged += 1
+                return None
+            full = count > self.full_fraction * rows * cols
+
+        if full:
+            self.refresh_requested = False
+            self.last_full = now
+            self.full_refreshes += 1
+            self.regions_sent += 1
+            self.tiles_sent += rows * cols
+            return True, [(0, 0, frame)]
+
+        regions = [
+            (x0 * size, y0 * size, frame[y0 * size:(y1 + 1) * size, x0 * size:(x1 + 1) * size])
+            for x0, y0, x1, y1 in self._rectangles(dirty)
+        ]
+        self.regions_sent += len(regions)
+        self.tiles_sent += count
+        return False, regions
+
+    def stats(self) -> dict:
+        return {
+            'frames': self.frames,
+            'unchanged': self.unchanged,
+            'full_refreshes': self.full_refreshes,
+            'regions': self.regions_sent,
+            'tiles': self.tiles_sent,
+        }
+
+    def _dirty_tiles(self, previous, frame, rows, cols):
+        """Boolean (rows, cols) grid: True where any pixel of the tile changed"""
+        changed = (previous != frame)
+        if changed.ndim == 3:
+            changed = changed.any(axis=2)
+        size = self.tile_size
+        padded = np.zeros((rows * size, cols * size), dtype=bool)
+        padded[:changed.shape[0], :changed.shape[1]] = changed
+        return padded.reshape(rows, size, cols, size).any(axis=(1, 3))
+
+    @staticmethod
+    def _rectangles(dirty):
+        """
+        Merge dirty tiles into rectangles (x0, y0, x1, y1 in tiles, inclusive):
+        horizontal runs per row, extended downwards while the next row has
+        exactly the same run.
+        """
+        rectangles = []
+        open_runs = {}  # (x0, x1) -> index in rectangles of the run ending on the row above
+        for y, row in enumerate(dirty):
+            runs = {}
+            x = 0
+            cols = len(row)
+            while x < cols:
+                if not row[x]:
+                    x += 1
+                    continue
+                start = x
+                while x < cols and row[x]:
+                    x += 1
+                run = (start, x - 1)
+                index = open_runs.get(run)
+                if index is None:
+                    index = len(rectangles)
+                    rectangles.append([start, y, x - 1, y])
+                else:
+                    rectangles[index][3] = y
+                runs[run] = index
+            open_runs = runs
+        return rectangles
+
+class ScreenCanvas:
+    """
+    Receiver side: the presenter's screen, rebuilt from full frames and
+    dirty-rectangle updates.
+
+    USAGE:
+        image = canvas.apply(width, height, full, [(x, y, decoded_image), ...])
+        if image is not None: show it
+    """
+    def __init__(self):
+        self.image = None
+
+    def reset(self):
+        self.image = None
+
+    def apply(self, width, height, full, regions):
+        """Paint one update; returns the canvas, or None if there is no base frame yet"""
+        if full:
+            self.image = None
+        if self.image is None or self.image.shape[:2] != (height, width):
+            if not full:
+                return None
+            self.image = np.zeros((height, width, 3), dtype=np.uint8)
+        for x, y, region in regions:
+            if region is None:
+                continue
+            h = min(region.shape[0], height - y)
+            w = min(region.shape[1], width - x)
+            if h > 0 and w > 0:
+                self.image[y:y + h, x:x + w] = region[:h, :w]
+        return self.image
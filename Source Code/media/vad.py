@@ -0,0 +1,105 @@
+"""
+===================================================================================
+VOICE ACTIVITY DETECTION - VAD.PY
+===================================================================================
+Decides, per captured audio chunk, whether it is worth sending.
+
+PURPOSE: An open microphone in a quiet room would otherwise send ~43 packets/s
+of silence that the server still has to receive and mix. The gate only lets
+speech through (plus a short hangover so word endings are not clipped).
+
+DETECTION:
+- Level = mean absolute sample value (same measure as the mic activity light)
+- Speech when level exceeds max(threshold, noise floor * margin)
+- The noise floor is updated on every chunk: it falls quickly to a quieter
+  level, follows the background while nobody is speaking, and keeps rising
+  slowly (VAD_NOISE_RISE_TIME) during "speech", so a sustained new noise
+  (a fan, HVAC) is learned within seconds instead of holding the gate open
+- Hangover: after the last speech chunk, keep sending for hangover_ms so
+  trailing syllables and short pauses are kept
+
+PACKET FLAGS (media header 'flags' byte):
+- FLAG_SPEECH_START on the first chunk sent after silence
+- FLAG_SILENCE_START on the last chunk before the gate closes; the server
+  then plays out what it has queued instead of waiting for more
+===================================================================================
+"""
+
+import numpy as np
+
+from .protocol import FLAG_SPEECH_START, FLAG_SILENCE_START
+
+VAD_THRESHOLD = 100.0  # Minimum mean |sample| treated as speech (int16)
+VAD_NOISE_MARGIN = 2.5  # Speech must be this many times above the noise floor
+VAD_NOISE_ADAPT = 0.05  # How fast the noise floor follows background level
+VAD_NOISE_FALL = 0.3  # How fast the noise floor drops to a quieter level
+VAD_NOISE_RISE_TIME = 10.0  # Time constant (s) of the floor rising under "speech"
+VAD_HANGOVER_MS = 280  # Keep sending this long after the last speech chunk
+
+class VoiceActivityDetector:
+    """
+    Energy-based speech gate with a hangover timer.
+
+    USAGE:
+        send, flags, level = vad.process(samples)
+        if send: client.send_udp_stream('A', data, flags)
+    """
+    def __init__(self, threshold=VAD_THRESHOLD, frame_ms=20, hangover_ms=VAD_HANGOVER_MS,
+                 noise_margin=VAD_NOISE_MARGIN, noise_adapt=VAD_NOISE_ADAPT,
+                 noise_fall=VAD_NOISE_FALL, noise_rise_time=VAD_NOISE_RISE_TIME):
+        self.threshold = threshold
+        self.hangover_frames = max(1, round(hangover_ms / frame_ms))
+        self.noise_margin = noise_margin
+        self.noise_adapt = noise_adapt
+        self.noise_fall = noise_fall
+        self.noise_rise = min(1.0, frame_ms / 1000.0 / noise_rise_time)
+        self.noise_floor = threshold / noise_margin
+        self.hangover = 0  # Chunks left before the gate closes
+        self.active = False  # Gate open (speech or hangover)
+
+        # Statistics
+        self.frames_total = 0
+        self.frames_sent = 0
+
+    def process(self, samples):
+        """
+        Classify one chunk of int16 samples.
+
+        RETURNS: (send, flags, level)
+        """
+        level = float(np.abs(samples).mean()) if len(samples) else 0.0
+        speech = level > max(self.threshold, self.noise_floor * self.noise_margin)
+        if level < self.noise_floor:
+            rate = self.noise_fall
+        elif speech:
+            rate = self.noise_rise  # Speech is bursty; only sustained sound moves the floor
+        else:
+            rate = self.noise_adapt
+        self.noise_floor += (level - self.noise_floor) * rate
+
+        self.frames_total += 1
+        flags = 0
+        if speech:
+            if not self.active:
+                flags = FLAG_SPEECH_START
+            self.active = True
+            self.hangover = self.hangover_frames
+        elif self.active:
+            self.hangover -= 1
+            if self.hangover <= 0:
+                self.active = False
+                flags = FLAG_SILENCE_START
+                self.frames_sent += 1
+                return True, flags, level  # Last chunk carries the end marker
+        else:
+            return False, 0, level
+
+        self.frames_sent += 1
+        return True, flags, level
+
+    @property
+    def suppressed_ratio(self):
+        """Fraction of chunks not sent so far"""
+        if not self.frames_total:
+            return 0.0
+        return 1.0 - self.frames_sent / self.frames_total
@@ -33,6 +33,11 @@ PROTOCOLS USED:
 # Import required libraries for network programming and data handling
 import socket          # For TCP/UDP socket programming
 import threading       # For concurrent handling of multiple clients
+import asyncio         # For the event-loop (coroutine) server engine
+import argparse        # For command-line server options
+import multiprocessing # For the multi-process (sharded) server mode
+import zlib            # For stable meeting-code -> worker hashing
+import itertools       # For the UDP stream ID counter
 import struct          # For packing/unpacking binary data in network packets
 import time            # For timestamps and timing operations
 import json            # For serializing/deserializing messages
@@ -46,6 +51,20 @@ from datetime import datetime  # For timestamps
 from typing import Dict, Set, Optional  # For type hints
 from collections import deque  # For efficient queue operations
 from pathlib import Path  # For file path handling
+from media import (MEDIA_HEADER, MEDIA_HEADER_SIZE, STREAM_VIDEO, STREAM_AUDIO,
+                   MIXED_AUDIO_STREAM_ID, FLAG_SPEECH_START, FLAG_SILENCE_START,
+                   media_timestamp, next_sequence)  # UDP wire format
+from media import TCP_BINARY_FLAG, TCP_LENGTH_MASK  # Binary TCP frames
+from media import (SCREEN_FRAME_HEADER, BINARY_SCREEN_FRAME,
+                   SCREEN_FLAG_FULL)  # Binary screen sharing updates
+from media import NMinusOneMixer  # Vectorized per-meeting audio mixing
+from media import get_audio_codec, negotiate_audio_codec  # Negotiated audio compression
+from media import (AUDIO_FRAME_DURATIONS, DEFAULT_SAMPLE_RATE, DEFAULT_FRAME_MS, Resampler,
+                   frame_samples, negotiate_audio_format, negotiate_capture_rate)  # Per-meeting audio format
+from media import (VIDEO_LAYER_MASK, fit_video_layers, nearest_video_layer,
+                   video_layer_for_tile)  # Simulcast layer selection
+from media import REPORT_INTERVAL, REPORT_MAX_AGE  # Video receiver reports
+from media import VideoFrameCache, ScreenFrameCache  # Last frames replayed to new viewers
 
 # Try to import msgpack for efficient binary serialization (fallback to JSON)
 try:
@@ -60,13 +79,64 @@ except ImportError:
 # Try to import uvloop for better async performance (optional optimization)
 try:
     import uvloop
-    import asyncio
-    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
-    USE_ASYNCIO = True
+    USE_UVLOOP = True
     print("✅ Using uvloop for better performance")
 except ImportError:
-    print("⚠️  uvloop not available, using threading model")
-    USE_ASYNCIO = False
+    print("⚠️  uvloop not available, asyncio engine will use the default event loop")
+    USE_UVLOOP = False
+
+# Server engines:
+# - 'asyncio': TCP sessions run as coroutines, UDP is read by a socket reader
+#   callback on the same event loop (uvloop when installed); loops without
+#   add_reader (Windows' ProactorEventLoop) fall back to a UDP receive thread
+# - 'threaded': one OS thread per client plus a blocking UDP receive thread
+#   (original model, kept as a fallback)
+ENGINE_ASYNCIO = 'asyncio'
+ENGINE_THREADED = 'threaded'
+USE_ASYNCIO = True  # asyncio ships with Python, so it is the default engine
+DEFAULT_ENGINE = ENGINE_ASYNCIO if USE_ASYNCIO else ENGINE_THREADED
+
+MAX_TCP_MESSAGE = 10485760  # 10MB limit for a single framed TCP message
+
+# Per-client outbound TCP queue limits (see OutboundQueue)
+OUTBOUND_QUEUE_MESSAGES = 256  # Max queued messages per client
+OUTBOUND_QUEUE_BYTES = 8 * 1024 * 1024  # Max queued bytes per client (8MB)
+OVERFLOW_DROP_OLDEST = 'drop-oldest'  # Evict the oldest droppable message to make room
+OVERFLOW_DROP_NEWEST = 'drop-newest'  # Reject the incoming droppable message
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST)
+
+# Message types that may be discarded when a receiver falls behind.
+# Everything else (control, chat, file transfer) is always delivered.
+DROPPABLE_MESSAGE_TYPES = {'emoji_reaction'}
+
+# UDP receive path (see UdpBufferPool)
+UDP_MAX_DATAGRAM = 65535  # Largest possible UDP payload
+UDP_RECEIVE_BUFFERS = 8  # Preallocated receive buffers per server
+UDP_READ_BATCH = 64  # Max datagrams drained per event loop wakeup
+UDP_SOCKET_BUFFER = 4 * 1024 * 1024  # Kernel send/receive buffer for the media port (4MB)
+
+# Audio mixer clock (see run_audio_mixer). A meeting is mixed once per frame of
+# its negotiated duration; the clock runs at the shortest supported duration.
+AUDIO_CLOCK_PERIOD = min(AUDIO_FRAME_DURATIONS) / 1000  # 10 ms
+AUDIO_JITTER_PREFILL = 2  # Frames queued before a talker is (re)started in the mix
+AUDIO_JITTER_MAX_FRAMES = 6  # Per-talker queue bound; older frames are discarded
+
+# Active speaker selection (see ActiveSpeakerTracker)
+ACTIVE_SPEAKER_LIMIT = 3  # Only the K loudest talkers are mixed
+SPEAKER_LEVEL_SMOOTHING = 0.3  # EMA weight of the newest frame's RMS
+SPEAKER_HYSTERESIS = 1.5  # A challenger must be this much louder than the weakest active speaker
+SPEAKER_MIN_LEVEL = 200.0  # Smoothed RMS below this never counts as speaking
+
+def shard_for_code(meeting_code: str, shard_count: int) -> int:
+    """
+    Map a meeting code to the worker process that owns it.
+    
+    Uses CRC32 (stable across processes and runs, unlike hash()) so the
+    supervisor and every worker agree without sharing any state.
+    """
+    if shard_count <= 1:
+        return 0
+    return zlib.crc32(meeting_code.upper().encode('utf-8')) % shard_count
 
 """
 ===================================================================================
@@ -85,20 +155,268 @@ class Meeting:
     - host_id: Client ID of the meeting host (has admin privileges)
     - participants: Dictionary of all connected participants
     - created_at: Timestamp when meeting was created
-    - audio_buffers: Temporary storage for audio mixing (UDP audio data)
+    - sample_rate / frame_ms: Negotiated audio format (all mixing happens at this rate)
+    - audio_queues: client_id -> AudioJitterQueue of frames waiting for the mixer clock
+    - speakers: ActiveSpeakerTracker choosing which talkers are mixed
     - muted_participants: Set of client IDs that are muted by host
     - locked_mics: Set of client IDs whose mics are locked by host
     - current_presenter: Client ID of user currently screen sharing (only one at a time)
+    - members: client_id -> ClientInfo for every connected member
+    - tcp_recipients: Immutable snapshot of (client_id, ClientInfo) pairs
+    - udp_recipients: Immutable snapshot of (client_id, UDP address) pairs
+    - video_routes: (sender client_id, layer) -> tuple of UDP addresses receiving that layer
+    - video_layer_demand: sender client_id -> layers at least one receiver wants
+    - new_video_routes: ((sender, layer), UDP address) pairs routed since last drained
+    - video_cache / screen_cache: Newest camera frames and screen frames (media/framecache.py)
+    - lock: Per-meeting lock guarding all of the mutable state above
+    
+    RECIPIENT INDEX:
+    tcp_recipients holds (client_id, ClientInfo) pairs so messages go through
+    each member's outbound queue. The recipient snapshots are copy-on-write
+    tuples. They are rebuilt only on join/leave/UDP-address learning/video
+    subscription changes, so the broadcast hot path reads a tuple without
+    taking any lock and costs O(participants in this meeting).
+    
+    SELECTIVE FORWARDING:
+    Each client reports which participants' video it currently renders (its
+    grid page or focused tile) with a 'video_subscription' message. A sender's
+    video is only forwarded to the addresses in video_routes[sender, layer]. Clients
+    that never subscribe receive everyone's video.
+    
+    SIMULCAST:
+    Senders encode up to three spatial layers (media/simulcast.py). With its
+    subscription a client reports each tile's on-screen size and optionally a
+    bandwidth budget; each receiver is routed the smallest layer covering the
+    tile, stepped down to fit the budget, or the nearest layer the sender has
+    actually been seen sending. video_layer_demand is announced to each sender
+    so it only encodes layers somebody watches.
+    
+    FIRST FRAME:
+    Every route a republish adds is recorded in new_video_routes; the server
+    drains it and replays the cached frame of that (sender, layer) to the new
+    address, so a tile that just came into view is painted within one round trip.
+    
+    LOCKING:
+    Each meeting owns its state behind its own lock, so independent meetings never
+    serialize against each other. The server's global meetings_lock/clients_lock
+    only protect the meeting and client maps and are taken on join/leave.
+    Lock order: meetings_lock -> Meeting.lock -> clients_lock.
     """
-    def __init__(self, code, host_id):
+    def __init__(self, code, host_id, sample_rate=DEFAULT_SAMPLE_RATE, frame_ms=DEFAULT_FRAME_MS):
         self.code = code
         self.host_id = host_id
         self.participants = {}
         self.created_at = datetime.now()
-        self.audio_buffers = {}  # For audio mixing functionality
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_samples = frame_samples(sample_rate, frame_ms)
+        self.tick_interval = max(1, round(frame_ms / 1000 / AUDIO_CLOCK_PERIOD))  # Mixer clock ticks per frame
+        self.audio_queues = {}  # client_id -> AudioJitterQueue (fed by UDP, drained by the mixer)
+        self.speakers = ActiveSpeakerTracker()  # Top-K loudest talkers
         self.muted_participants = set()
         self.locked_mics = set()
         self.current_presenter = None  # Track who is currently screen sharing
+        self.closed = False  # Set once the meeting is removed from the server
+        self.lock = threading.RLock()  # Guards this meeting's state (see LOCKING)
+        self.audio_mixer = NMinusOneMixer(frame_samples=self.frame_samples)  # Per-meeting mixing buffers
+        self.mix_sequence = 0  # Sequence number of the meeting's mixed audio packets
+        
+        # Recipient index for fan-out (see class docstring)
+        self.members: Dict[str, 'ClientInfo'] = {}
+        self.tcp_recipients = ()
+        self.udp_recipients = ()
+        self.video_routes = {}
+        self.video_layer_demand = {}
+        self.new_video_routes = []
+        self.video_cache = VideoFrameCache()
+        self.screen_cache = ScreenFrameCache()
+    
+    def add_member(self, client_id, client_info):
+        """Register a connected client and publish new recipient snapshots"""
+        with self.lock:
+            self.members[client_id] = client_info
+            client_info.meeting = self
+            self._publish_recipients()
+    
+    def remove_member(self, client_id):
+        """Drop a client and publish new recipient snapshots"""
+        with self.lock:
+            if self.members.pop(client_id, None) is not None:
+                self._publish_recipients()
+            self.video_cache.forget(client_id)
+    
+    def refresh_recipients(self):
+        """Republish snapshots after a member's UDP address was learned"""
+        with self.lock:
+            self._publish_recipients()
+    
+    def set_video_subscription(self, client_id, sender_ids, tile_layers=None, max_kbps=None):
+        """
+        Record whose video a member renders (None = everyone), the layer wanted
+        per sender (missing = full size) and its bandwidth budget; republish routes
+        """
+        with self.lock:
+            client_info = self.members.get(client_id)
+            if client_info is None:
+                return
+            client_info.video_subscriptions = None if sender_ids is None else frozenset(sender_ids)
+            client_info.video_layers = dict(tile_layers or {})
+            client_info.max_video_kbps = max_kbps
+            self._publish_recipients()
+    
+    def add_video_layer(self, client_id, layer):
+        """A sender was seen sending a new layer: reroute receivers waiting for it"""
+        with self.lock:
+            client_info = self.members.get(client_id)
+            if client_info is None or layer in client_info.video_layers_sent:
+                return
+            client_info.video_layers_sent = client_info.video_layers_sent | {layer}
+            self._publish_recipients()
+    
+    def _publish_recipients(self):
+        # Build new tuples and swap them in with a single assignment each;
+        # readers holding the old tuple keep a consistent view
+        members = list(self.members.items())
+        self.tcp_recipients = tuple(members)
+        self.udp_recipients = tuple(
+            (cid, cinfo.udp_address) for cid, cinfo in members if cinfo.udp_address
+        )
+        
+        # Video: pick each receiver's layer per sender, then group by (sender, layer)
+        routes = {}
+        demand = {sender: set() for sender, _ in members}
+        for cid, cinfo in members:
+            wanted = {
+                sender: cinfo.video_layers.get(sender, 0) for sender, _ in members
+                if sender != cid and
+                (cinfo.video_subscriptions is None or sender in cinfo.video_subscriptions)
+            }
+            for sender, layer in fit_video_layers(wanted, cinfo.max_video_kbps).items():
+                demand[sender].add(layer)
+                if cinfo.udp_address:
+                    layer = nearest_video_layer(layer, self.members[sender].video_layers_sent)
+                    routes.setdefault((sender, layer), []).append(cinfo.udp_address)
+        previous = self.video_routes
+        for key, addrs in routes.items():
+            known = previous.get(key, ())
+            self.new_video_routes.extend((key, addr) for addr in addrs if addr not in known)
+        self.video_routes = {key: tuple(addrs) for key, addrs in routes.items()}
+        self.video_layer_demand = {sender: tuple(sorted(layers)) for sender, layers in demand.items()}
+
+class AudioJitterQueue:
+    """
+    Per-talker FIFO of audio frames between the UDP receiver and the mixer clock.
+    
+    PURPOSE: Packets arrive with network jitter but are mixed on a fixed tick.
+    A talker only joins the mix once AUDIO_JITTER_PREFILL frames are queued, so
+    a late packet does not immediately cause a gap; after an underrun the queue
+    re-primes. The queue is bounded so a burst cannot build up latency: the
+    oldest frames are discarded instead.
+    
+    SILENCE: Clients stop sending while their voice activity detector says they
+    are silent. A missing frame is mixed as silence (the talker is left out of
+    that tick); old frames are never repeated. The packet flagged
+    FLAG_SILENCE_START ends a talkspurt: whatever is queued is played out even
+    below the prefill level, and the following empty tick is not an underrun.
+    
+    THREADING: push() runs on the UDP receiver, pop() only on the mixer thread
+    (deque append/popleft are thread-safe).
+    """
+    def __init__(self, prefill=AUDIO_JITTER_PREFILL, max_frames=AUDIO_JITTER_MAX_FRAMES):
+        self.frames = deque(maxlen=max_frames)
+        self.prefill = prefill
+        self.primed = False
+        self.draining = False  # Talkspurt ended: play out the tail without prefill
+        self.underruns = 0  # Ticks where a primed talker had no frame ready
+    
+    def push(self, frame, flags=0):
+        """Queue one frame (still-encoded payload) with its packet's header flags"""
+        if flags & FLAG_SPEECH_START:
+            self.draining = False
+        self.frames.append(frame)
+        if flags & FLAG_SILENCE_START:
+            self.draining = True
+    
+    def pop(self):
+        """Next frame for this tick, or None (silent / not primed yet / underrun)"""
+        if not self.primed:
+            if len(self.frames) < self.prefill and not self.draining:
+                return None
+            self.primed = True
+        try:
+            return self.frames.popleft()
+        except IndexError:
+            self.primed = False
+            if self.draining:
+                self.draining = False  # Expected end of talkspurt
+            else:
+                self.underruns += 1
+            return None
+
+class ActiveSpeakerTracker:
+    """
+    Picks the K loudest talkers of a meeting, tick by tick.
+    
+    PURPOSE: In a large meeting, summing every open microphone wastes CPU and
+    adds background noise. Only the active speakers are mixed.
+    
+    LEVEL: Per participant, an exponential moving average of each frame's RMS.
+    Ticks without a frame decay the level, so someone who stops talking fades out.
+    
+    HYSTERESIS: Current speakers keep their slot while above SPEAKER_MIN_LEVEL.
+    When all K slots are taken, a challenger replaces the weakest speaker only if
+    it is SPEAKER_HYSTERESIS times louder, so similar voices do not flap.
+    """
+    def __init__(self, limit=ACTIVE_SPEAKER_LIMIT, smoothing=SPEAKER_LEVEL_SMOOTHING,
+                 hysteresis=SPEAKER_HYSTERESIS, min_level=SPEAKER_MIN_LEVEL):
+        self.limit = limit
+        self.smoothing = smoothing
+        self.hysteresis = hysteresis
+        self.min_level = min_level
+        self.levels = {}  # client_id -> smoothed RMS
+        self.active = []  # Current speakers, loudest first
+    
+    def update(self, frames: dict) -> bool:
+        """
+        Feed one tick of frames (client_id -> int16 samples) and reselect.
+        
+        RETURNS: True if the set of active speakers changed.
+        """
+        alpha = self.smoothing
+        for pid in list(self.levels):
+            if pid not in frames:
+                level = self.levels[pid] * (1.0 - alpha)
+                if level < 1.0:
+                    del self.levels[pid]
+                else:
+                    self.levels[pid] = level
+        for pid, frame in frames.items():
+            rms = float(np.sqrt(np.mean(np.square(frame, dtype=np.float32))))
+            self.levels[pid] = self.levels.get(pid, rms) * (1.0 - alpha) + rms * alpha
+        
+        levels = self.levels
+        active = [pid for pid in self.active if levels.get(pid, 0.0) >= self.min_level]
+        challengers = sorted(
+            (pid for pid, level in levels.items() if level >= self.min_level and pid not in active),
+            key=levels.get, reverse=True
+        )
+        for pid in challengers:
+            if len(active) < self.limit:
+                active.append(pid)
+                continue
+            weakest = min(active, key=levels.get)
+            if levels[pid] < levels[weakest] * self.hysteresis:
+                break  # Challengers are sorted, nobody after this one qualifies either
+            active[active.index(weakest)] = pid
+        
+        active.sort(key=levels.get, reverse=True)
+        changed = set(active) != set(self.active)
+        self.active = active
+        return changed
+    
+    def forget(self, client_id):
+        """Drop a participant who left"""
+        self.levels.pop(client_id, None)
 
 class ClientInfo:
     """
@@ -113,14 +431,264 @@ class ClientInfo:
     - is_host: Whether this client has host privileges
     - udp_address: (IP, port) tuple for UDP streaming (video/audio)
     - last_seen: Timestamp of last activity (for connection monitoring)
+    - outbound: Bounded queue of framed TCP packets, drained by a dedicated writer
+    - meeting: The Meeting object this client belongs to (avoids global map lookups)
+    - client_id: Server-assigned 'username_ip_port' identifier
+    - stream_id: 32-bit UDP stream ID carried in every media packet header
+    - audio_codec: Codec negotiated at join, used for this client's uplink and its mix
+    - video_subscriptions: Participants whose video this client renders (see Meeting)
+    - video_layers / max_video_kbps: Simulcast layer wanted per sender and the
+      client's declared video bandwidth budget (None = unlimited)
+    - video_layers_sent: Layers this client has been seen sending
+    - video_layers_announced: Layer demand last sent to this client
+    - receiver_reports: receiver client_id -> latest report about this client's
+      video (see handle_receiver_report)
+    - sample_rate: Rate this client captures/plays at; when it differs from the
+      meeting's, uplink/downlink resamplers convert on the mixer thread
     """
-    def __init__(self, socket_conn, username, meeting_code, is_host):
+    def __init__(self, socket_conn, username, meeting_code, is_host, outbound=None,
+                 client_id=None, stream_id=0, audio_codec=None, sample_rate=None,
+                 meeting_rate=None):
         self.socket = socket_conn  # TCP socket for control messages
+        self.client_id = client_id
+        self.stream_id = stream_id
+        self.audio_codec = get_audio_codec(audio_codec)
+        self.sample_rate = sample_rate or meeting_rate or DEFAULT_SAMPLE_RATE
+        self.uplink_resampler = None  # Client rate -> meeting rate
+        self.downlink_resampler = None  # Meeting rate -> client rate
+        if meeting_rate and self.sample_rate != meeting_rate:
+            self.uplink_resampler = Resampler(self.sample_rate, meeting_rate)
+            self.downlink_resampler = Resampler(meeting_rate, self.sample_rate)
         self.username = username
         self.meeting_code = meeting_code
         self.is_host = is_host
         self.udp_address = None  # Will be set when UDP packets arrive
         self.last_seen = time.time()
+        self.outbound = outbound if outbound is not None else OutboundQueue()
+        self.meeting = None  # Set by Meeting.add_member()
+        self.video_subscriptions = None  # client_ids whose video this client renders (None = all)
+        self.video_layers = {}  # sender client_id -> wanted simulcast layer
+        self.max_video_kbps = None  # Declared downlink video budget
+        self.video_layers_sent = frozenset()  # Layers seen from this sender
+        self.video_layers_announced = None  # Last 'video_layers' demand sent to this client
+        self.receiver_reports = {}  # receiver client_id -> (time, loss, jitter_ms, kbps)
+        self.last_video_feedback = 0.0  # When 'video_feedback' was last sent to this client
+    
+    @property
+    def queue_depth(self):
+        """Number of TCP messages waiting to be written to this client"""
+        return self.outbound.depth
+
+class OutboundQueue:
+    """
+    Bounded queue of framed TCP packets for one client.
+    
+    PURPOSE: Senders (other clients' handlers, the mixer, host commands) only enqueue;
+    a per-client writer thread/task does the blocking socket writes. A slow receiver
+    therefore fills its own queue instead of stalling the sender and everyone behind it.
+    
+    OVERFLOW POLICY (applied when max_messages or max_bytes would be exceeded):
+    - drop-oldest: evict the oldest droppable messages (screen frames, emoji) to make room
+    - drop-newest: reject the incoming message if it is droppable
+    Control messages are never dropped; they are accepted even above the limits.
+    
+    LATEST-WINS SLOTS (put_latest): screen frames are queued under a slot key (the
+    presenter). While one is still waiting to be written, a newer frame for the same
+    slot replaces it in place instead of queueing behind it, so a viewer that cannot
+    keep up holds at most one pending frame per presenter and always gets the newest.
+    A pending full frame is never replaced by a tile update (the update would have
+    nothing to apply to): the update queues behind it instead. A replaced tile update
+    leaves a gap in the viewer's sequence numbers, which makes it ask the server to
+    repeat the cached screen chain.
+    """
+    def __init__(self, max_messages=OUTBOUND_QUEUE_MESSAGES, max_bytes=OUTBOUND_QUEUE_BYTES,
+                 policy=OVERFLOW_DROP_OLDEST):
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.items = deque()  # [packet, droppable, slot] in send order
+        self.slots = {}  # slot key -> its pending entry in items
+        self.full_slots = set()  # Slot keys whose pending entry is a full frame
+        self.bytes_queued = 0
+        self.dropped = 0  # Messages discarded by the overflow policy
+        self.superseded = 0  # Pending frames replaced by a newer one (put_latest)
+        self.closed = False
+        self.condition = threading.Condition()
+        self.on_ready = None  # Optional wakeup hook (asyncio writer)
+    
+    @property
+    def depth(self):
+        return len(self.items)
+    
+    def put(self, packet, droppable=False) -> bool:
+        """Enqueue a framed packet. Returns False if it was dropped."""
+        with self.condition:
+            if self.closed:
+                return False
+            if self._is_full(len(packet)) and not self._make_room(len(packet), droppable):
+                self.dropped += 1
+                return False
+            self.items.append([packet, droppable, None])
+            self.bytes_queued += len(packet)
+            self.condition.notify()
+        if self.on_ready:
+            self.on_ready()
+        return True
+    
+    def put_latest(self, packet, slot, full=False) -> bool:
+        """
+        Enqueue a droppable frame, superseding the frame still pending for the
+        same slot (if any). A tile update (full=False) does not supersede a
+        pending full frame; it is queued behind it. Returns False if it was dropped.
+        """
+        with self.condition:
+            if self.closed:
+                return False
+            entry = self.slots.get(slot)
+            if entry is not None and (full or slot not in self.full_slots):
+                self.bytes_queued += len(packet) - len(entry[0])
+                entry[0] = packet
+                self.superseded += 1
+                if full:
+                    self.full_slots.add(slot)
+                return True
+            if entry is not None:
+                # Keep the full frame queued as a plain droppable packet
+                entry[2] = None
+                del self.slots[slot]
+                self.full_slots.discard(slot)
+            if self._is_full(len(packet)) and not self._make_room(len(packet), True):
+                self.dropped += 1
+                return False
+            entry = self.slots[slot] = [packet, True, slot]
+            if full:
+                self.full_slots.add(slot)
+            self.items.append(entry)
+            self.bytes_queued += len(packet)
+            self.condition.notify()
+        if self.on_ready:
+            self.on_ready()
+        return True
+    
+    def _is_full(self, incoming):
+        return (len(self.items) >= self.max_messages or
+                self.bytes_queued + incoming > self.max_bytes)
+    
+    def _make_room(self, incoming, droppable):
+        """Apply the overflow policy. Returns False if the new packet must be dropped."""
+        if self.policy == OVERFLOW_DROP_OLDEST:
+            index = 0
+            while self._is_full(incoming) and index < len(self.items):
+                packet, old_droppable, slot = self.items[index]
+                if old_droppable:
+                    del self.items[index]
+                    self.bytes_queued -= len(packet)
+                    self.dropped += 1
+                    if slot is not None:
+                        del self.slots[slot]
+                        self.full_slots.discard(slot)
+                else:
+                    index += 1
+        return not (droppable and self._is_full(incoming))
+    
+    def get(self):
+        """Block until a packet is available (threaded writer). Returns None once closed."""
+        with self.condition:
+            while not self.items and not self.closed:
+                self.condition.wait()
+            if not self.items:
+                return None
+            packet, _, slot = self.items.popleft()
+            if slot is not None:
+                del self.slots[slot]
+                self.full_slots.discard(slot)
+            self.bytes_queued -= len(packet)
+            return packet
+    
+    def take_all(self):
+        """Remove and return every queued packet (asyncio writer)"""
+        with self.condition:
+            packets = [entry[0] for entry in self.items]
+            self.items.clear()
+            self.slots.clear()
+            self.full_slots.clear()
+            self.bytes_queued = 0
+            return packets
+    
+    def close(self):
+        """Stop accepting packets and wake the writer so it can exit"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.on_ready:
+            self.on_ready()
+
+class UdpBufferPool:
+    """
+    Fixed set of preallocated receive buffers for the UDP media port.
+    
+    PURPOSE: recvfrom() allocates a new bytes object for every datagram. Receiving
+    with recvfrom_into() into one of these buffers and passing memoryview slices
+    around means relaying a video packet never allocates or copies its payload.
+    
+    USAGE:
+    - acquire() hands out (index, memoryview) of a free buffer, or None if all are in use
+    - release(index) returns it once the datagram has been fully handled
+    - Anything that must outlive the handler (e.g. audio kept for mixing) copies
+      its bytes out first, since the buffer is reused for the next datagram
+    """
+    def __init__(self, count=UDP_RECEIVE_BUFFERS, size=UDP_MAX_DATAGRAM):
+        self.buffers = [bytearray(size) for _ in range(count)]
+        self.views = [memoryview(buffer) for buffer in self.buffers]
+        self.free = list(range(count))  # Stack of free buffer indices
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Take a free buffer: (index, memoryview) or None when exhausted"""
+        with self.lock:
+            if not self.free:
+                return None
+            index = self.free.pop()
+        return index, self.views[index]
+    
+    def release(self, index):
+        """Return a buffer to the pool"""
+        with self.lock:
+            self.free.append(index)
+
+class StreamSocket:
+    """
+    Socket-like wrapper around an asyncio StreamWriter.
+
+    PURPOSE: Lets the shared code paths (handshake responses, client writers)
+    call send()/sendall()/close() on a client without knowing which engine
+    accepted the connection
+
+    THREAD SAFETY:
+    - Calls made on the event loop thread write directly to the transport
+    - Calls from other threads are handed to the loop with call_soon_threadsafe
+    """
+    def __init__(self, writer, loop):
+        self.writer = writer
+        self.loop = loop
+        self.loop_thread_id = threading.get_ident()  # Created on the event loop thread
+
+    def sendall(self, data):
+        """Queue data on the transport (never blocks the caller)"""
+        self.call_soon(self.writer.write, data)
+
+    send = sendall
+
+    def call_soon(self, callback, *args):
+        """Run callback on the event loop thread (immediately if already on it)"""
+        if threading.get_ident() == self.loop_thread_id:
+            callback(*args)
+        else:
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def close(self):
+        """Close the underlying transport"""
+        self.call_soon(self.writer.close)
 
 """
 ===================================================================================
@@ -137,44 +705,72 @@ class OptimizedConferenceServer:
     - UDP (port 5002 by default): For real-time audio/video streaming
     
     ARCHITECTURE:
-    - Multi-threaded design for concurrent client handling
-    - Separate threads for TCP connections and UDP streaming
+    - Two selectable engines sharing the same message handlers:
+      * asyncio: TCP sessions are coroutines, UDP is drained with recvfrom_into() by an
+        add_reader callback on the same loop (uvloop if installed; a receive thread
+        where the loop cannot watch sockets, e.g. Windows' ProactorEventLoop)
+      * threaded: one thread per TCP client plus a blocking UDP receive thread
+    - Background threads for statistics and buffer cleanup
     - Thread-safe data structures with locks for concurrent access
     """
     
-    def __init__(self, host='0.0.0.0', tcp_port=5001):
+    def __init__(self, host='0.0.0.0', tcp_port=5001, engine=DEFAULT_ENGINE,
+                 queue_limit=OUTBOUND_QUEUE_MESSAGES, overflow_policy=OVERFLOW_DROP_OLDEST,
+                 shard_index=0, shard_count=1):
         """
         Initialize the conference server.
         
         PARAMETERS:
         - host: IP address to bind to (0.0.0.0 allows connections from any network interface)
         - tcp_port: Port for TCP connections (UDP will use tcp_port + 1)
+        - engine: 'asyncio' (event loop) or 'threaded' (thread per client)
+        - queue_limit: Max queued outbound TCP messages per client
+        - overflow_policy: 'drop-oldest' or 'drop-newest' (see OutboundQueue)
+        - shard_index/shard_count: This worker's slot in multi-process mode
+          (only meeting codes that hash to shard_index are generated here)
         
         NETWORK SETUP:
         - Creates TCP socket for reliable messaging
         - Creates UDP socket for real-time media streaming
         """
+        if engine not in (ENGINE_ASYNCIO, ENGINE_THREADED):
+            raise ValueError(f"Unknown server engine: {engine}")
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        
         self.host = host
         self.tcp_port = tcp_port
         self.udp_port = tcp_port + 1  # UDP port is always TCP port + 1
+        self.engine = engine
+        self.queue_limit = queue_limit
+        self.overflow_policy = overflow_policy
+        self.shard_index = shard_index
+        self.shard_count = shard_count
         
         # Data structures for managing meetings and clients
         self.meetings: Dict[str, Meeting] = {}  # meeting_code -> Meeting object
         self.client_to_meeting: Dict[str, str] = {}  # client_id -> meeting_code
         self.clients: Dict[str, ClientInfo] = {}  # client_id -> ClientInfo object
+        self.streams: Dict[int, ClientInfo] = {}  # UDP stream_id -> ClientInfo object
+        self.stream_ids = itertools.count(1)  # Next stream ID (0 = server-mixed audio)
         
         # Thread locks for concurrent access safety
-        self.clients_lock = threading.Lock()  # Protects clients dictionary
-        self.meetings_lock = threading.Lock()  # Protects meetings dictionary
+        # These guard only the global maps (join/leave); per-meeting state is
+        # protected by each Meeting's own lock
+        self.clients_lock = threading.Lock()  # Protects clients and streams dictionaries
+        self.meetings_lock = threading.Lock()  # Protects meetings and client_to_meeting
         
         # Network sockets (will be initialized in start())
         self.tcp_socket = None  # TCP socket for reliable communication
         self.udp_socket = None  # UDP socket for real-time streaming
         
+        # asyncio engine state (only used when engine == 'asyncio')
+        self.loop = None  # Event loop running in the engine thread
+        self.stop_event = None  # asyncio.Event set by stop()
+        
         # Pre-allocated buffers for performance optimization
         # Reason: Reusing buffers reduces memory allocation overhead
-        self.udp_send_buffer = bytearray(65536)  # 64KB buffer for UDP packets
-        self.audio_mix_buffer = np.zeros(8000, dtype=np.float32)  # Audio mixing buffer
+        self.udp_buffers = UdpBufferPool()  # recvfrom_into() targets for the UDP port
         
         self.running = False  # Server running state
         
@@ -182,7 +778,11 @@ class OptimizedConferenceServer:
         self.stats = {
             'messages_processed': 0,  # Count of TCP messages handled
             'audio_packets': 0,  # Count of UDP audio packets
+            'mix_ticks': 0,  # Mixer clock ticks run
+            'mix_seconds': 0.0,  # Total time spent mixing (CPU cost of the mixer)
+            'mix_packets': 0,  # Mixed audio packets sent
             'video_packets': 0,  # Count of UDP video packets
+            'receiver_reports': 0,  # Video receiver reports handled
             'start_time': time.time()
         }
         
@@ -197,8 +797,11 @@ class OptimizedConferenceServer:
         
         # Generate session log filename with timestamp
         session_time = datetime.now()
-        log_filename = session_time.strftime('session_%Y%m%d_%H%M%S.log')
-        log_path = log_dir / log_filename
+        log_filename = session_time.strftime('session_%Y%m%d_%H%M%S')
+        if self.shard_count > 1:
+            # Workers start in the same second; keep one log file per worker
+            log_filename += f'_w{self.shard_index}'
+        log_path = log_dir / f'{log_filename}.log'
         
         # Configure logging
         logging.basicConfig(
@@ -211,7 +814,7 @@ class OptimizedConferenceServer:
             ]
         )
         
-        self.logger = logging.getLogger('SERVER')
+        self.logger = logging.getLogger('SERVER' if self.shard_count <= 1 else f'WORKER-{self.shard_index}')
         self.logger.info('='*80)
         self.logger.info(f'Server Session Started')
         self.logger.info(f'Date: {session_time.strftime("%A, %B %d, %Y")}')
@@ -224,7 +827,8 @@ class OptimizedConferenceServer:
         chars = string.ascii_uppercase + string.digits
         while True:
             code = ''.join(random.choices(chars, k=6))
-            if code not in self.meetings:
+            # In multi-process mode only keep codes the supervisor will route here
+            if code not in self.meetings and shard_for_code(code, self.shard_count) == self.shard_index:
                 self.logger.info(f'Generated meeting code: {code}')
                 return code
     
@@ -354,6 +958,7 @@ class OptimizedConferenceServer:
             # SO_REUSEADDR for UDP allows multiple processes to bind to same port
             # Useful for server restart scenarios
             self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.size_udp_buffers()
             
             # Bind UDP socket to port (TCP port + 1)
             # Convention: UDP port is always one more than TCP port
@@ -368,6 +973,7 @@ class OptimizedConferenceServer:
                 self.udp_socket.close()
                 self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
                 self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                self.size_udp_buffers()
                 self.udp_socket.bind((self.host, self.udp_port))
                 self.logger.info(f'UDP socket bound to alternate port {self.host}:{self.udp_port}')
             else:
@@ -386,50 +992,93 @@ class OptimizedConferenceServer:
         self.logger.info('🚀 Server Started Successfully!')
         self.logger.info(f'📡 TCP: {self.host}:{self.tcp_port}')
         self.logger.info(f'📡 UDP: {self.host}:{self.udp_port}')
+        self.logger.info(f'⚙️  Engine: {self.engine}')
         self.logger.info('Waiting for client connections...')
         self.logger.info('='*80)
         
         print(f"🚀 Optimized Server started!")
         print(f"📡 TCP: {self.host}:{self.tcp_port}")
         print(f"📡 UDP: {self.host}:{self.udp_port}")
+        print(f"⚙️  Engine: {self.engine}")
         
         # ============================================================================
         # START BACKGROUND THREADS (Concurrent Processing)
         # ============================================================================
         # Multi-threading allows the server to handle multiple operations simultaneously:
-        # 1. Accept new TCP connections
-        # 2. Process UDP packets (audio/video)
-        # 3. Display performance statistics
-        # 4. Clean up stale data
+        # 1. Accept new TCP connections and process UDP packets (engine dependent)
+        # 2. Display performance statistics
+        # 3. Clean up stale data
         self.logger.info('Starting background threads...')
         
-        # Thread 1: Accept incoming TCP connections (control messages, chat, files)
-        threading.Thread(target=self.accept_connections, daemon=True).start()
-        
-        # Thread 2: Handle UDP packets (real-time audio/video streaming)
-        threading.Thread(target=self.handle_udp_streams, daemon=True).start()
+        if self.engine == ENGINE_ASYNCIO:
+            # Thread 1: Event loop running every TCP session and the UDP reader
+            threading.Thread(target=self.run_event_loop, daemon=True).start()
+        else:
+            # Thread 1: Accept incoming TCP connections (control messages, chat, files)
+            threading.Thread(target=self.accept_connections, daemon=True).start()
+            
+            # Thread 2: Handle UDP packets (real-time audio/video streaming)
+            threading.Thread(target=self.handle_udp_streams, daemon=True).start()
         
         # Thread 3: Display server statistics periodically
         threading.Thread(target=self.display_stats, daemon=True).start()
         
-        # Thread 4: Clean up old audio buffers to prevent memory bloat
-        threading.Thread(target=self.cleanup_stale_buffers, daemon=True).start()
+        # Thread 4: Audio mixer clock (one mix per meeting per audio frame period)
+        threading.Thread(target=self.run_audio_mixer, daemon=True).start()
         
         self.logger.info('All background threads started')
     
-    def cleanup_stale_buffers(self):
-        """Remove old audio buffers to prevent memory bloat"""
+    def run_audio_mixer(self):
+        """
+        Mixer clock: every AUDIO_CLOCK_PERIOD, mix each meeting whose frame is due
+        (every tick for 10 ms meetings, every other tick for 20 ms ones).
+        
+        Output timing follows this clock instead of packet arrival, and a meeting
+        with N talkers costs one mix pass per tick (not one per inbound packet),
+        sending exactly one packet per recipient. Deadlines are absolute so the
+        clock does not drift; if the process stalls badly it resynchronizes
+        rather than firing a burst of catch-up ticks.
+        """
+        period = AUDIO_CLOCK_PERIOD
+        next_tick = time.perf_counter()
+        tick = 0
+        
         while self.running:
-            time.sleep(1.0)
-            current_time = time.time()
-            with self.meetings_lock:
-                for meeting in self.meetings.values():
-                    stale_keys = [
-                        k for k, v in meeting.audio_buffers.items()
-                        if current_time - v['timestamp'] > 0.5
-                    ]
-                    for k in stale_keys:
-                        del meeting.audio_buffers[k]
+            next_tick += period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -5 * period:
+                next_tick = time.perf_counter()
+            
+            tick_start = time.perf_counter()
+            tick += 1
+            sent = 0
+            for meeting in list(self.meetings.values()):  # Atomic snapshot, no global lock
+                if tick % meeting.tick_interval:
+                    continue
+                try:
+                    sent += self.mix_meeting_audio(meeting)
+                except Exception as e:
+                    print(f"Audio mixing error in {meeting.code}: {e}")
+            
+            self.stats['mix_ticks'] += 1
+            self.stats['mix_seconds'] += time.perf_counter() - tick_start
+            self.stats['mix_packets'] += sent
+    
+    def size_udp_buffers(self):
+        """
+        Enlarge the media socket's kernel buffers.
+        
+        Video frames arrive in bursts; with the OS default (~200KB) a burst from a
+        few senders overflows the receive queue and is silently dropped before
+        the relay ever sees it. The OS may cap the request (e.g. net.core.rmem_max).
+        """
+        for option in (socket.SO_RCVBUF, socket.SO_SNDBUF):
+            try:
+                self.udp_socket.setsockopt(socket.SOL_SOCKET, option, UDP_SOCKET_BUFFER)
+            except OSError:
+                pass
     
     def display_stats(self):
         """Display performance statistics"""
@@ -442,10 +1091,20 @@ class OptimizedConferenceServer:
                 video_per_sec = self.stats['video_packets'] / elapsed if elapsed > 0 else 0
                 
                 with self.meetings_lock, self.clients_lock:
+                    depths = [cinfo.queue_depth for cinfo in self.clients.values()]
+                    dropped = sum(cinfo.outbound.dropped for cinfo in self.clients.values())
+                    superseded = sum(cinfo.outbound.superseded for cinfo in self.clients.values())
                     print("-" * 60)
                     print(f"📊 STATS [{datetime.now().strftime('%H:%M:%S')}]")
                     print(f"  Meetings: {len(self.meetings)} | Clients: {len(self.clients)}")
                     print(f"  Msgs/s: {msgs_per_sec:.1f} | Audio/s: {audio_per_sec:.1f} | Video/s: {video_per_sec:.1f}")
+                    print(f"  Outbound queues: max depth {max(depths, default=0)} | dropped {dropped} | "
+                          f"superseded screen frames {superseded}")
+                    ticks = self.stats['mix_ticks']
+                    mix_ms = self.stats['mix_seconds'] * 1000 / ticks if ticks else 0
+                    mix_load = 100 * self.stats['mix_seconds'] / elapsed if elapsed > 0 else 0
+                    print(f"  Mixer: {mix_ms:.2f} ms/tick (clock {AUDIO_CLOCK_PERIOD * 1000:.0f} ms) | "
+                          f"load {mix_load:.1f}% | {self.stats['mix_packets']} packets")
                     print("-" * 60)
             except Exception as e:
                 print(f"Error displaying stats: {e}")
@@ -488,8 +1147,8 @@ class OptimizedConferenceServer:
         PROTOCOL: UDP (User Datagram Protocol)
         PURPOSE: Receive real-time audio/video packets with minimal latency
         
-        PACKET STRUCTURE:
-        [Stream Type (1 byte)][Client ID Length (2 bytes)][Client ID][Media Data]
+        PACKET STRUCTURE (see media/protocol.py):
+        [Type (1)][Flags (1)][Stream ID (4)][Sequence (2)][Timestamp (4)][Media Data]
         
         Stream Types:
         - 'V': Video frame data (JPEG compressed)
@@ -509,27 +1168,157 @@ class OptimizedConferenceServer:
         # Set socket timeout to prevent indefinite blocking
         self.udp_socket.settimeout(0.1)
         
-        while self.running:
-            try:
-                # UDP recvfrom() receives one packet (up to 65535 bytes)
-                # Returns: (data, (sender_ip, sender_port))
-                # Note: UDP has no connection, just receives packets from any source
-                data, addr = self.udp_socket.recvfrom(65535)
+        # This thread owns one preallocated buffer for its whole lifetime
+        index, buffer = self.udp_buffers.acquire()
+        try:
+            while self.running:
+                try:
+                    # recvfrom_into() writes the packet straight into our buffer
+                    # Returns: (nbytes, (sender_ip, sender_port))
+                    # Note: UDP has no connection, just receives packets from any source
+                    nbytes, addr = self.udp_socket.recvfrom_into(buffer)
+                    
+                    # Process the received UDP packet (video or audio) in place
+                    self.handle_udp_packet(buffer[:nbytes], addr)
+                except socket.timeout:
+                    # Timeout is normal, just continue loop to check self.running
+                    continue
+                except Exception as e:
+                    if self.running:
+                        print(f"UDP error: {e}")
+                    time.sleep(0.01)
+        finally:
+            self.udp_buffers.release(index)
+    
+    def read_udp_datagrams(self):
+        """
+        Event loop reader callback for the UDP port (asyncio engine).
+        
+        Drains up to UDP_READ_BATCH datagrams per wakeup with recvfrom_into(),
+        reusing one pooled buffer, so the asyncio engine shares the threaded
+        engine's zero-copy receive path (a DatagramProtocol would hand over a
+        freshly allocated bytes object for every datagram).
+        """
+        acquired = self.udp_buffers.acquire()
+        if acquired is None:
+            return
+        index, buffer = acquired
+        try:
+            for _ in range(UDP_READ_BATCH):
+                try:
+                    nbytes, addr = self.udp_socket.recvfrom_into(buffer)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError as e:
+                    # e.g. ICMP port unreachable from a client that went away
+                    if self.running:
+                        print(f"UDP error: {e}")
+                    continue
+                try:
+                    self.handle_udp_packet(buffer[:nbytes], addr)
+                except Exception as e:
+                    if self.running:
+                        print(f"UDP error: {e}")
+        finally:
+            self.udp_buffers.release(index)
+    
+    def run_event_loop(self):
+        """
+        Run the asyncio engine (TCP sessions + UDP reader callback) on a dedicated thread.
+        
+        Uses uvloop's event loop when it is installed, otherwise the default
+        asyncio loop. The sockets bound in start() are handed to asyncio as-is,
+        so port fallback logic is shared by both engines.
+        """
+        self.loop = uvloop.new_event_loop() if USE_UVLOOP else asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.serve_async())
+        except Exception as e:
+            if self.running:
+                self.logger.error(f'Event loop error: {e}')
+                print(f"❌ Event loop error: {e}")
+        finally:
+            self.loop.close()
+    
+    async def serve_async(self):
+        """Serve TCP and UDP on the event loop until stop() is called"""
+        self.stop_event = asyncio.Event()
+        self.tcp_socket.setblocking(False)
+        self.udp_socket.setblocking(False)
+        
+        tcp_server = await asyncio.start_server(
+            self.handle_client_async, sock=self.tcp_socket
+        )
+        try:
+            self.loop.add_reader(self.udp_socket.fileno(), self.read_udp_datagrams)
+            udp_reader = True
+        except NotImplementedError:
+            # Windows' default ProactorEventLoop has no add_reader (and uvloop is
+            # not available there): receive UDP on the threaded engine's loop
+            udp_reader = False
+            threading.Thread(target=self.handle_udp_streams, daemon=True).start()
+            self.logger.info('Event loop cannot watch sockets, UDP uses a receive thread')
+        self.logger.info(f'Event loop running ({"uvloop" if USE_UVLOOP else "asyncio"})')
+        
+        async with tcp_server:
+            await self.stop_event.wait()
+        if udp_reader:
+            self.loop.remove_reader(self.udp_socket.fileno())
+        self.udp_socket.close()
+    
+    async def handle_client_async(self, reader, writer):
+        """
+        Handle one TCP client as a coroutine (asyncio engine).
+        
+        Same protocol as handle_client(): the first message is an unframed
+        create/join request, every following message is [Length (4 bytes)][Data]
+        (binary frames have TCP_BINARY_FLAG set in the length).
+        """
+        address = writer.get_extra_info('peername')
+        client_socket = StreamSocket(writer, self.loop)
+        client_id = None
+        
+        try:
+            # Read initial message
+            data = await reader.read(4096)
+            if not data:
+                print(f"No data received from {address}")
+                return
+            
+            client_id = self.register_client(client_socket, address, data)
+            
+            # Message loop
+            while self.running and client_id:
+                try:
+                    length_bytes = await reader.readexactly(4)
+                    msg_length = struct.unpack('!I', length_bytes)[0]
+                    binary = msg_length & TCP_BINARY_FLAG
+                    msg_length &= TCP_LENGTH_MASK
+                    
+                    if msg_length > MAX_TCP_MESSAGE:
+                        break
+                    
+                    data = await reader.readexactly(msg_length)
+                    self.stats['messages_processed'] += 1
+                    if binary:
+                        self.handle_binary_message(client_id, length_bytes + data)
+                        continue
+                    message = self._deserialize_message(data)
+                    self.handle_tcp_message(client_id, message)
+                except Exception:
+                    break
                 
-                # Process the received UDP packet (video or audio)
-                self.handle_udp_packet(data, addr)
-            except socket.timeout:
-                # Timeout is normal, just continue loop to check self.running
-                continue
-            except Exception as e:
-                if self.running:
-                    print(f"UDP error: {e}")
-                time.sleep(0.01)
+        except Exception as e:
+            print(f"Error handling client: {e}")
+        finally:
+            if client_id:
+                self.handle_client_disconnect(client_id)
+            client_socket.close()
     
     def handle_client(self, client_socket, address):
         """Handle TCP client connection"""
         client_id = None
-        meeting_code = None
         
         try:
             # Read initial message
@@ -539,138 +1328,38 @@ class OptimizedConferenceServer:
                 client_socket.close()
                 return
             
-            print(f"Received {len(data)} bytes from {address}: {data[:100]}...")
-            
-            try:
-                message = self._deserialize_message(data)
-                print(f"Parsed message: {message}")
-            except Exception as e:
-                print(f"Failed to deserialize message from {address}: {e}")
-                print(f"Raw data: {data}")
-                error_response = self._serialize_message({
-                    'type': 'error',
-                    'message': 'Invalid message format'
-                })
-                client_socket.send(error_response)
-                client_socket.close()
-                return
-            
-            if message['type'] == 'create_meeting':
-                client_id = f"{message['username']}_{address[0]}_{address[1]}"
-                meeting_code = self.generate_meeting_code()
-                
-                self.logger.info(f'Creating meeting: {meeting_code} for {message["username"]} (ID: {client_id})')
-                
-                # Create meeting and client
-                with self.meetings_lock:
-                    meeting = Meeting(meeting_code, client_id)
-                    meeting.participants[client_id] = {
-                        'username': message['username'], 
-                        'is_host': True
-                    }
-                    self.meetings[meeting_code] = meeting
-                    self.client_to_meeting[client_id] = meeting_code
-                
-                self.logger.info(f'Meeting {meeting_code} created successfully with host {message["username"]}')
-                
-                with self.clients_lock:
-                    client_info = ClientInfo(client_socket, message['username'], meeting_code, True)
-                    self.clients[client_id] = client_info
-                
-                response_data = self._serialize_message({
-                    'type': 'meeting_created',
-                    'meeting_code': meeting_code,
-                    'client_id': client_id,
-                    'is_host': True
-                })
-                print(f"Sending meeting_created response: {len(response_data)} bytes")
-                client_socket.send(response_data)
-                
-            elif message['type'] == 'join_meeting':
-                meeting_code = message.get('meeting_code', '').upper()
-                
-                self.logger.info(f'{message["username"]} attempting to join meeting: {meeting_code}')
-                
-                with self.meetings_lock:
-                    if meeting_code not in self.meetings:
-                        self.logger.warning(f'Invalid meeting code: {meeting_code}')
-                        response_data = self._serialize_message({
-                            'type': 'error',
-                            'message': 'Invalid meeting code'
-                        })
-                        print(f"Sending error response: {len(response_data)} bytes")
-                        client_socket.send(response_data)
-                        client_socket.close()
-                        return
-                    
-                    client_id = f"{message['username']}_{address[0]}_{address[1]}"
-                    meeting = self.meetings[meeting_code]
-                    meeting.participants[client_id] = {
-                        'username': message['username'],
-                        'is_host': False
-                    }
-                    self.client_to_meeting[client_id] = meeting_code
-                    
-                    self.logger.info(f'{message["username"]} (ID: {client_id}) joined meeting {meeting_code}')
-                
-                with self.clients_lock:
-                    client_info = ClientInfo(client_socket, message['username'], meeting_code, False)
-                    self.clients[client_id] = client_info
-                
-                # Get participants list
-                with self.meetings_lock:
-                    participants = [
-                        {
-                            'client_id': pid,
-                            'username': pinfo['username'],
-                            'is_host': pinfo['is_host']
-                        }
-                        for pid, pinfo in self.meetings[meeting_code].participants.items()
-                    ]
-                
-                response_data = self._serialize_message({
-                    'type': 'join_success',
-                    'meeting_code': meeting_code,
-                    'client_id': client_id,
-                    'is_host': False,
-                    'participants': participants
-                })
-                print(f"Sending join_success response: {len(response_data)} bytes")
-                client_socket.send(response_data)
-                
-                # Notify others
-                self.broadcast_to_meeting(
-                    meeting_code,
-                    {
-                        'type': 'user_joined',
-                        'client_id': client_id,
-                        'username': message['username']
-                    },
-                    exclude_id=client_id
-                )
+            client_id = self.register_client(client_socket, address, data)
             
             # Message loop
             while self.running and client_id:
                 try:
-                    length_bytes = client_socket.recv(4)
-                    if not length_bytes:
+                    length_bytes = self._recv_exactly(client_socket, 4)
+                    if length_bytes is None:
                         break
                     msg_length = struct.unpack('!I', length_bytes)[0]
+                    binary = msg_length & TCP_BINARY_FLAG
+                    msg_length &= TCP_LENGTH_MASK
                     
-                    if msg_length > 10485760:  # 10MB limit
+                    if msg_length > MAX_TCP_MESSAGE:
                         break
                     
-                    data = b''
-                    while len(data) < msg_length:
-                        chunk = client_socket.recv(min(4096, msg_length - len(data)))
-                        if not chunk:
+                    if binary:
+                        # Read straight into a buffer that already holds the
+                        # length prefix, so it can be relayed as-is
+                        frame = bytearray(4 + msg_length)
+                        frame[:4] = length_bytes
+                        if not self._recv_into(client_socket, memoryview(frame)[4:]):
                             break
-                        data += chunk
-                    
-                    if len(data) == msg_length:
-                        message = self._deserialize_message(data)
                         self.stats['messages_processed'] += 1
-                        self.handle_tcp_message(client_id, message)
+                        self.handle_binary_message(client_id, frame)
+                        continue
+                    
+                    data = self._recv_exactly(client_socket, msg_length)
+                    if data is None:
+                        break
+                    message = self._deserialize_message(data)
+                    self.stats['messages_processed'] += 1
+                    self.handle_tcp_message(client_id, message)
                 except Exception:
                     break
                 
@@ -681,58 +1370,316 @@ class OptimizedConferenceServer:
                 self.handle_client_disconnect(client_id)
             client_socket.close()
     
-    def handle_client_disconnect(self, client_id: str):
-        """Handle client disconnection efficiently"""
-        with self.clients_lock:
-            client_info = self.clients.pop(client_id, None)
-        if not client_info:
-            return
-        
-        meeting_code = client_info.meeting_code
-        username = client_info.username
-        is_host = client_info.is_host
-        new_host_id = None
+    @staticmethod
+    def _recv_into(sock, view) -> bool:
+        """Fill a memoryview from a blocking socket; False if the peer closed"""
+        received = 0
+        while received < len(view):
+            count = sock.recv_into(view[received:])
+            if not count:
+                return False
+            received += count
+        return True
+    
+    def _recv_exactly(self, sock, length) -> Optional[bytes]:
+        """Read exactly length bytes from a blocking socket (None if the peer closed)"""
+        buffer = bytearray(length)
+        if not self._recv_into(sock, memoryview(buffer)):
+            return None
+        return bytes(buffer)
+    
+    def register_client(self, client_socket, address, data) -> Optional[str]:
+        """
+        Process the initial create_meeting / join_meeting request (shared by both engines).
         
-        with self.meetings_lock:
-            meeting = self.meetings.get(meeting_code)
-            if meeting:
-                meeting.participants.pop(client_id, None)
-                self.client_to_meeting.pop(client_id, None)
-                meeting.audio_buffers.pop(client_id, None)
-                
-                # Clear presenter if this client was presenting
-                if meeting.current_presenter == client_id:
-                    meeting.current_presenter = None
-                    self.broadcast_to_meeting(
-                        meeting_code,
-                        {'type': 'screen_share_stopped', 'presenter_id': client_id}
-                    )
-                
-                # Transfer host if needed
-                if is_host and meeting.participants:
-                    new_host_id = next(iter(meeting.participants))
-                    meeting.host_id = new_host_id
-                    meeting.participants[new_host_id]['is_host'] = True
-                    
-                    with self.clients_lock:
-                        if new_host_id in self.clients:
-                            self.clients[new_host_id].is_host = True
-                elif not meeting.participants:
-                    del self.meetings[meeting_code]
-                    return
+        RETURNS: The new client_id, or None if the request was rejected
+        (an error response has already been sent in that case)
+        """
+        client_id = None
+        meeting_code = None
         
-        if new_host_id:
-            self.broadcast_to_meeting(
-                meeting_code,
-                {'type': 'host_changed', 'new_host_id': new_host_id}
-            )
+        print(f"Received {len(data)} bytes from {address}: {data[:100]}...")
         
-        self.broadcast_to_meeting(
-            meeting_code,
-            {
-                'type': 'user_left',
-                'client_id': client_id,
-                'username': username
+        try:
+            message = self._deserialize_message(data)
+            print(f"Parsed message: {message}")
+        except Exception as e:
+            print(f"Failed to deserialize message from {address}: {e}")
+            print(f"Raw data: {data}")
+            error_response = self._serialize_message({
+                'type': 'error',
+                'message': 'Invalid message format'
+            })
+            client_socket.send(error_response)
+            client_socket.close()
+            return None
+            
+        if message['type'] == 'create_meeting':
+            client_id = f"{message['username']}_{address[0]}_{address[1]}"
+            stream_id = next(self.stream_ids)
+            audio_codec = negotiate_audio_codec(message.get('audio_codecs'))
+            audio_format = negotiate_audio_format(message.get('audio_format'))
+            sample_rate = negotiate_capture_rate(audio_format['sample_rate'], message.get('capture_rates'))
+            meeting_code = self.generate_meeting_code()
+            
+            self.logger.info(f'Creating meeting: {meeting_code} for {message["username"]} (ID: {client_id})')
+            
+            # Create meeting and client
+            with self.meetings_lock:
+                meeting = Meeting(meeting_code, client_id, **audio_format)
+                meeting.participants[client_id] = {
+                    'username': message['username'], 
+                    'is_host': True,
+                    'stream_id': stream_id
+                }
+                self.meetings[meeting_code] = meeting
+                self.client_to_meeting[client_id] = meeting_code
+            
+            self.logger.info(f'Meeting {meeting_code} created successfully with host {message["username"]}')
+            
+            response_data = self._serialize_message({
+                'type': 'meeting_created',
+                'meeting_code': meeting_code,
+                'client_id': client_id,
+                'stream_id': stream_id,
+                'audio_codec': audio_codec,
+                'audio_format': self.client_audio_format(meeting, sample_rate),
+                'is_host': True
+            })
+            print(f"Sending meeting_created response: {len(response_data)} bytes")
+            
+            # The response is queued first so it always precedes broadcasts
+            client_info = ClientInfo(client_socket, message['username'], meeting_code, True,
+                                     self.create_outbound_queue(), client_id, stream_id,
+                                     audio_codec, sample_rate, meeting.sample_rate)
+            client_info.outbound.put(response_data)
+            with self.clients_lock:
+                self.clients[client_id] = client_info
+                self.streams[stream_id] = client_info
+            meeting.add_member(client_id, client_info)
+            self.announce_video_layers(meeting)
+            self.send_cached_video(meeting)
+            
+        elif message['type'] == 'join_meeting':
+            meeting_code = message.get('meeting_code', '').upper()
+            
+            self.logger.info(f'{message["username"]} attempting to join meeting: {meeting_code}')
+            
+            with self.meetings_lock:
+                meeting = self.meetings.get(meeting_code)
+                if meeting is None:
+                    self.logger.warning(f'Invalid meeting code: {meeting_code}')
+                    response_data = self._serialize_message({
+                        'type': 'error',
+                        'message': 'Invalid meeting code'
+                    })
+                    print(f"Sending error response: {len(response_data)} bytes")
+                    client_socket.send(response_data)
+                    client_socket.close()
+                    return None
+                
+                client_id = f"{message['username']}_{address[0]}_{address[1]}"
+                stream_id = next(self.stream_ids)
+                audio_codec = negotiate_audio_codec(message.get('audio_codecs'))
+                sample_rate = negotiate_capture_rate(meeting.sample_rate, message.get('capture_rates'))
+                with meeting.lock:
+                    meeting.participants[client_id] = {
+                        'username': message['username'],
+                        'is_host': False,
+                        'stream_id': stream_id
+                    }
+                    # Get participants list
+                    participants = [
+                        {
+                            'client_id': pid,
+                            'username': pinfo['username'],
+                            'is_host': pinfo['is_host'],
+                            'stream_id': pinfo['stream_id']
+                        }
+                        for pid, pinfo in meeting.participants.items()
+                    ]
+                self.client_to_meeting[client_id] = meeting_code
+                
+                self.logger.info(f'{message["username"]} (ID: {client_id}) joined meeting {meeting_code}')
+            
+            response_data = self._serialize_message({
+                'type': 'join_success',
+                'meeting_code': meeting_code,
+                'client_id': client_id,
+                'stream_id': stream_id,
+                'audio_codec': audio_codec,
+                'audio_format': self.client_audio_format(meeting, sample_rate),
+                'is_host': False,
+                'participants': participants
+            })
+            print(f"Sending join_success response: {len(response_data)} bytes")
+            
+            # The response is queued first so it always precedes broadcasts
+            client_info = ClientInfo(client_socket, message['username'], meeting_code, False,
+                                     self.create_outbound_queue(), client_id, stream_id,
+                                     audio_codec, sample_rate, meeting.sample_rate)
+            client_info.outbound.put(response_data)
+            with self.clients_lock:
+                self.clients[client_id] = client_info
+                self.streams[stream_id] = client_info
+            meeting.add_member(client_id, client_info)
+            self.announce_video_layers(meeting)
+            self.send_cached_video(meeting)
+            
+            # Notify others
+            self.broadcast_to_meeting(
+                meeting_code,
+                {
+                    'type': 'user_joined',
+                    'client_id': client_id,
+                    'username': message['username'],
+                    'stream_id': stream_id
+                },
+                exclude_id=client_id
+            )
+        
+        if client_id:
+            self.start_client_writer(client_info)
+        return client_id
+    
+    @staticmethod
+    def client_audio_format(meeting: Meeting, sample_rate: int) -> dict:
+        """Audio format a joining client should capture and play with"""
+        return {
+            'sample_rate': sample_rate,
+            'frame_ms': meeting.frame_ms,
+            'meeting_rate': meeting.sample_rate
+        }
+    
+    def create_outbound_queue(self):
+        """Create a client outbound queue using the server's limits and overflow policy"""
+        return OutboundQueue(max_messages=self.queue_limit, policy=self.overflow_policy)
+    
+    def start_client_writer(self, client_info):
+        """Start the dedicated writer that drains a client's outbound queue"""
+        if self.engine == ENGINE_ASYNCIO:
+            self.loop.create_task(self.write_outbound_async(client_info))
+        else:
+            threading.Thread(target=self.write_outbound, args=(client_info,), daemon=True).start()
+    
+    def write_outbound(self, client_info):
+        """Writer thread (threaded engine): blocking sendall of queued packets"""
+        queue = client_info.outbound
+        while self.running:
+            packet = queue.get()
+            if packet is None:
+                break
+            try:
+                client_info.socket.sendall(packet)
+            except OSError:
+                break
+        queue.close()
+    
+    async def write_outbound_async(self, client_info):
+        """Writer task (asyncio engine): write queued packets, honouring transport backpressure"""
+        queue = client_info.outbound
+        writer = client_info.socket.writer
+        ready = asyncio.Event()
+        queue.on_ready = lambda: client_info.socket.call_soon(ready.set)
+        ready.set()  # Packets may have been queued before the task started
+        try:
+            while True:
+                await ready.wait()
+                ready.clear()
+                for packet in queue.take_all():
+                    writer.write(packet)
+                # While drain() waits on a slow receiver, new packets accumulate
+                # in the bounded queue where the overflow policy applies
+                await writer.drain()
+                if queue.closed:
+                    break
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            queue.close()
+    
+    def get_queue_depths(self) -> Dict[str, int]:
+        """Outbound queue depth per connected client (client_id -> queued messages)"""
+        with self.clients_lock:
+            return {cid: cinfo.queue_depth for cid, cinfo in self.clients.items()}
+    
+    def handle_client_disconnect(self, client_id: str):
+        """Handle client disconnection efficiently"""
+        with self.clients_lock:
+            client_info = self.clients.pop(client_id, None)
+            if client_info:
+                self.streams.pop(client_info.stream_id, None)
+        if not client_info:
+            return
+        client_info.outbound.close()
+        
+        meeting_code = client_info.meeting_code
+        username = client_info.username
+        is_host = client_info.is_host
+        meeting = client_info.meeting
+        new_host_id = None
+        was_presenting = False
+        meeting_empty = False
+        
+        if meeting:
+            with meeting.lock:
+                meeting.participants.pop(client_id, None)
+                meeting.remove_member(client_id)
+                meeting.audio_queues.pop(client_id, None)
+                meeting.speakers.forget(client_id)
+                
+                # Clear presenter if this client was presenting
+                if meeting.current_presenter == client_id:
+                    meeting.current_presenter = None
+                    meeting.screen_cache.clear()
+                    was_presenting = True
+                
+                # Transfer host if needed
+                if is_host and meeting.participants:
+                    new_host_id = next(iter(meeting.participants))
+                    meeting.host_id = new_host_id
+                    meeting.participants[new_host_id]['is_host'] = True
+                    
+                    new_host = meeting.members.get(new_host_id)
+                    if new_host:
+                        new_host.is_host = True
+                meeting_empty = not meeting.participants
+        
+        # Global maps are only touched here (leave) and in register_client (join)
+        with self.meetings_lock:
+            self.client_to_meeting.pop(client_id, None)
+            if meeting_empty:
+                with meeting.lock:
+                    # Re-check under both locks: someone may have joined meanwhile
+                    meeting_empty = (not meeting.participants and
+                                     self.meetings.get(meeting_code) is meeting)
+                    if meeting_empty:
+                        del self.meetings[meeting_code]
+                        meeting.closed = True
+        if meeting_empty:
+            return
+        
+        self.announce_video_layers(meeting)
+        self.send_cached_video(meeting)
+        
+        if was_presenting:
+            self.broadcast_to_meeting(
+                meeting_code,
+                {'type': 'screen_share_stopped', 'presenter_id': client_id}
+            )
+        
+        if new_host_id:
+            self.broadcast_to_meeting(
+                meeting_code,
+                {'type': 'host_changed', 'new_host_id': new_host_id}
+            )
+        
+        self.broadcast_to_meeting(
+            meeting_code,
+            {
+                'type': 'user_left',
+                'client_id': client_id,
+                'username': username
             }
         )
     
@@ -740,11 +1687,12 @@ class OptimizedConferenceServer:
         """Handle TCP messages efficiently"""
         msg_type = message.get('type')
         
-        with self.clients_lock:
-            client_info = self.clients.get(client_id)
-        if not client_info:
+        # Single dict lookup (atomic); no global lock on the per-message path
+        client_info = self.clients.get(client_id)
+        if not client_info or not client_info.meeting:
             return
         
+        meeting = client_info.meeting
         meeting_code = client_info.meeting_code
         is_host = client_info.is_host
         
@@ -764,9 +1712,12 @@ class OptimizedConferenceServer:
             state = message.get('state')
             
             # If video stopped and this client was presenting, clear presenter
-            meeting = self.meetings.get(meeting_code)
-            if meeting and state == 'stopped' and meeting.current_presenter == client_id:
-                meeting.current_presenter = None
+            with meeting.lock:
+                was_presenting = state == 'stopped' and meeting.current_presenter == client_id
+                if was_presenting:
+                    meeting.current_presenter = None
+                    meeting.screen_cache.clear()
+            if was_presenting:
                 self.broadcast_to_meeting(
                     meeting_code,
                     {'type': 'screen_share_stopped', 'presenter_id': client_id}
@@ -782,6 +1733,35 @@ class OptimizedConferenceServer:
                 exclude_id=client_id
             )
         
+        elif msg_type == 'video_subscription':
+            # The participants whose video this client currently renders,
+            # with each tile's size (device pixels) for simulcast layer choice
+            client_ids = message.get('client_ids')
+            tile_layers = {}
+            for sender, size in (message.get('tile_sizes') or {}).items():
+                try:
+                    tile_layers[sender] = video_layer_for_tile(int(size[0]), int(size[1]))
+                except (TypeError, ValueError, IndexError, KeyError):
+                    pass
+            max_kbps = message.get('max_video_kbps')
+            meeting.set_video_subscription(
+                client_id, None if client_ids is None else [cid for cid in client_ids if cid != client_id],
+                tile_layers, max_kbps if isinstance(max_kbps, (int, float)) and max_kbps > 0 else None
+            )
+            self.announce_video_layers(meeting)
+            self.send_cached_video(meeting)
+        
+        elif msg_type == 'screen_refresh':
+            # A viewer's screen canvas is stale: repeat the cached chain to that
+            # viewer alone; only without one is the presenter asked for a full frame
+            with meeting.lock:
+                presenter_id = meeting.current_presenter
+                if presenter_id and presenter_id != client_id:
+                    self.queue_cached_screen(meeting, client_info, presenter_id)
+        
+        elif msg_type == 'receiver_report':
+            self.handle_receiver_report(meeting, client_id, message.get('streams'))
+        
         elif msg_type == 'raise_hand':
             self.broadcast_to_meeting(
                 meeting_code,
@@ -823,19 +1803,16 @@ class OptimizedConferenceServer:
             self.send_to_client(recipient_id, {'sender_id': client_id, **message})
         
         elif is_host:
-            self.handle_host_command(client_id, meeting_code, msg_type, message)
+            self.handle_host_command(client_id, meeting, msg_type, message)
     
-    def handle_host_command(self, client_id: str, meeting_code: str, 
+    def handle_host_command(self, client_id: str, meeting: Meeting,
                            msg_type: str, message: dict):
         """Handle host-specific commands"""
-        with self.meetings_lock:
-            meeting = self.meetings.get(meeting_code)
-        if not meeting:
-            return
+        meeting_code = meeting.code
         
         if msg_type in ['mute_participant', 'unmute_participant']:
             target_id = message.get('target_client_id')
-            with self.meetings_lock:
+            with meeting.lock:
                 if msg_type == 'mute_participant':
                     meeting.muted_participants.add(target_id)
                 else:
@@ -855,7 +1832,7 @@ class OptimizedConferenceServer:
         
         elif msg_type in ['lock_mic', 'unlock_mic']:
             target_id = message.get('target_client_id')
-            with self.meetings_lock:
+            with meeting.lock:
                 if msg_type == 'lock_mic':
                     meeting.locked_mics.add(target_id)
                 else:
@@ -911,279 +1888,447 @@ class OptimizedConferenceServer:
                     )
             else:
                 # Client requesting to start screen sharing
-                meeting = self.meetings.get(meeting_code)
-                if meeting:
-                    if meeting.current_presenter and meeting.current_presenter != client_id:
-                        # Someone else is already presenting
-                        self.send_to_client(
-                            client_id,
-                            {'type': 'screen_share_denied', 'current_presenter': meeting.current_presenter}
-                        )
-                    else:
-                        # Allow screen sharing
+                with meeting.lock:
+                    current_presenter = meeting.current_presenter
+                    allowed = not current_presenter or current_presenter == client_id
+                    if allowed:
                         meeting.current_presenter = client_id
-                        self.broadcast_to_meeting(
-                            meeting_code,
-                            {'type': 'screen_share_started', 'presenter_id': client_id},
-                            exclude_id=client_id
-                        )
+                if not allowed:
+                    # Someone else is already presenting
+                    self.send_to_client(
+                        client_id,
+                        {'type': 'screen_share_denied', 'current_presenter': current_presenter}
+                    )
+                else:
+                    # Allow screen sharing
+                    self.broadcast_to_meeting(
+                        meeting_code,
+                        {'type': 'screen_share_started', 'presenter_id': client_id},
+                        exclude_id=client_id
+                    )
         
         elif msg_type == 'stop_screen_share':
             # Handle screen share stop request
-            meeting = self.meetings.get(meeting_code)
-            if meeting and meeting.current_presenter == client_id:
-                meeting.current_presenter = None
+            with meeting.lock:
+                was_presenting = meeting.current_presenter == client_id
+                if was_presenting:
+                    meeting.current_presenter = None
+                    meeting.screen_cache.clear()
+            if was_presenting:
                 self.broadcast_to_meeting(
                     meeting_code,
                     {'type': 'screen_share_stopped', 'presenter_id': client_id},
                     exclude_id=client_id
                 )
-        
-        elif msg_type == 'screen_frame':
-            # Handle screen frame from presenter
-            meeting = self.meetings.get(meeting_code)
-            if meeting and meeting.current_presenter == client_id:
-                frame_data = message.get('frame_data')
-                if frame_data:
-                    self.logger.debug(f"Broadcasting screen frame from {client_id} to meeting {meeting_code}")
-                    # Broadcast screen frame to all other participants via TCP
-                    self.broadcast_to_meeting(
-                        meeting_code,
-                        {
-                            'type': 'screen_frame',
-                            'presenter_id': client_id,
-                            'frame_data': frame_data
-                        },
-                        exclude_id=client_id
-                    )
-                else:
-                    self.logger.warning(f"Received screen frame from {client_id} with no frame data")
-            else:
-                self.logger.warning(f"Received screen frame from {client_id} but they are not the current presenter")
     
-    def handle_udp_packet(self, data: bytes, addr: tuple):
-        """Handle UDP packets with improved error handling"""
-        if len(data) < 3:
-            return
+    def handle_binary_message(self, client_id: str, frame):
+        """
+        Handle one binary TCP frame (length prefix included).
         
-        try:
-            stream_type = chr(data[0])
-            client_id_len = struct.unpack('!H', data[1:3])[0]
-            
-            if 3 + client_id_len > len(data) or client_id_len > 255:
-                return
-            
-            client_id = data[3:3+client_id_len].decode('utf-8')
-            stream_data = data[3+client_id_len:]
-            
-            # Update UDP address
-            with self.clients_lock:
-                client_info = self.clients.get(client_id)
-                if client_info:
-                    if client_info.udp_address is None:
-                        client_info.udp_address = addr
-                    client_info.last_seen = time.time()
-            
-            meeting_code = self.client_to_meeting.get(client_id)
-            if not meeting_code:
-                return
-            
-            # Handle different stream types
-            if stream_type == 'V' and len(stream_data) > 0:
-                self.stats['video_packets'] += 1
-                self.broadcast_udp_to_meeting(
-                    meeting_code, 'V', client_id, stream_data, exclude_id=client_id
-                )
-            elif stream_type == 'A' and len(stream_data) > 0:
-                self.stats['audio_packets'] += 1
-                self.mix_and_broadcast_audio(meeting_code, client_id, stream_data)
-            elif stream_type == 'I':
-                # Initialization packet - just update address
-                pass
-                
-        except (struct.error, UnicodeDecodeError, ValueError) as e:
-            print(f"UDP packet decode error: {e}")
+        Screen sharing updates are relayed to the rest of the meeting exactly
+        as received: only the fixed header is checked (kind, and that the
+        presenter stream ID is the sender's), the payload is never decoded,
+        re-encoded or copied per recipient.
+        """
+        client_info = self.clients.get(client_id)
+        if not client_info or not client_info.meeting:
             return
-    
-    def mix_and_broadcast_audio(self, meeting_code: str, sender_id: str, audio_data: bytes):
-        """Improved audio mixing with better error handling"""
-        with self.meetings_lock:
-            meeting = self.meetings.get(meeting_code)
-        if not meeting:
+        meeting = client_info.meeting
+        client_info.last_seen = time.time()
+        if len(frame) < 4 + SCREEN_FRAME_HEADER.size:
             return
         
-        # Validate audio data
-        if len(audio_data) == 0 or len(audio_data) % 2 != 0:
+        kind, flags, stream_id = SCREEN_FRAME_HEADER.unpack_from(frame, 4)[:3]
+        if kind != BINARY_SCREEN_FRAME:
             return
-        
-        # Parse and store audio buffer
-        try:
-            audio_array = np.frombuffer(audio_data, dtype=np.int16)
-            if len(audio_array) == 0:
-                return
-                
-            with self.meetings_lock:
-                meeting.audio_buffers[sender_id] = {
-                    'data': audio_array,
-                    'timestamp': time.time()
-                }
-        except (ValueError, TypeError) as e:
-            print(f"Audio buffer error: {e}")
+        if meeting.current_presenter != client_id or stream_id != client_info.stream_id:
+            self.logger.warning(f"Received screen frame from {client_id} but they are not the current presenter")
             return
         
-        with self.meetings_lock:
-            participants = list(meeting.participants.keys())
-        if len(participants) < 2:
+        # Cache and relay under the meeting lock so a viewer being caught up
+        # (send_cached_screen) gets the cached frames and live ones in order.
+        # Latest frame wins per viewer (see OutboundQueue.put_latest): a viewer
+        # still behind on the previous frame gets this one in its place.
+        # Members still in the join handshake are skipped; send_cached_screen
+        # catches them up once their UDP address is known
+        full = bool(flags & SCREEN_FLAG_FULL)
+        with meeting.lock:
+            cached = meeting.screen_cache.add(client_id, frame, full)
+            for cid, cinfo in meeting.tcp_recipients:
+                if cid != client_id and cinfo.udp_address:
+                    cinfo.outbound.put_latest(frame, client_id, full)
+        if not cached:
+            # Too many updates since the last full frame to keep: get a new base
+            self.send_to_client(client_id, {'type': 'screen_refresh'})
+    
+    def handle_udp_packet(self, data: memoryview, addr: tuple):
+        """
+        Handle one media datagram.
+        
+        SENDER LOOKUP: The fixed 12-byte header carries the sender's numeric stream
+        ID, resolved with a single int-keyed dict lookup (no string decoding, no
+        client_to_meeting lookup).
+        
+        ZERO-COPY: data is a memoryview over a pooled receive buffer. Video is
+        relayed by sending the received datagram as-is (its header already names
+        the sender), so the payload is never copied. The view is only valid until
+        this method returns.
+        """
+        if len(data) < MEDIA_HEADER_SIZE:
             return
         
-        current_time = time.time()
-        target_len = len(audio_array)
+        stream_type, flags, stream_id, seq, timestamp = MEDIA_HEADER.unpack_from(data)
         
-        # Pre-filter valid sources with better validation
-        valid_buffers = {}
-        with self.meetings_lock:
-            for pid in participants:
-                if (pid in meeting.audio_buffers and
-                    current_time - meeting.audio_buffers[pid]['timestamp'] < 0.3 and
-                    pid not in meeting.muted_participants and
-                    pid not in meeting.locked_mics):
-                    try:
-                        buffer_data = meeting.audio_buffers[pid]['data']
-                        if len(buffer_data) > 0:
-                            valid_buffers[pid] = buffer_data
-                    except (KeyError, TypeError):
-                        continue
+        # Resolve sender without global locks: one atomic dict lookup,
+        # then everything else goes through the sender's own meeting
+        client_info = self.streams.get(stream_id)
+        if not client_info:
+            return
+        meeting = client_info.meeting
+        if not meeting or meeting.closed:
+            return
+        client_info.last_seen = time.time()
+        
+        # Update UDP address
+        if client_info.udp_address is None:
+            with meeting.lock:
+                client_info.udp_address = addr
+                # New UDP address: republish the meeting's recipient snapshot
+                meeting.refresh_recipients()
+                self.announce_video_layers(meeting)
+                # The client has read its join response: catch it up on the
+                # current screen share as well
+                self.send_cached_screen(meeting, client_info)
+            self.send_cached_video(meeting)
+        
+        # Handle different stream types ('I' initialization packets only
+        # establish the address above)
+        if len(data) == MEDIA_HEADER_SIZE:
+            return
+        if stream_type == STREAM_VIDEO:
+            self.stats['video_packets'] += 1
+            layer = flags & VIDEO_LAYER_MASK
+            if layer not in client_info.video_layers_sent:
+                meeting.add_video_layer(client_info.client_id, layer)
+                self.send_cached_video(meeting)
+            self.relay_udp_packet(meeting, data, client_info.client_id, layer)
+            meeting.video_cache.add(client_info.client_id, layer, data, time.monotonic())
+        elif stream_type == STREAM_AUDIO:
+            self.stats['audio_packets'] += 1
+            self.queue_meeting_audio(meeting, client_info.client_id, data[MEDIA_HEADER_SIZE:], flags)
+    
+    def queue_meeting_audio(self, meeting: Meeting, sender_id: str, audio_data, flags: int = 0):
+        """
+        Queue one inbound audio frame for the sender until the next mixer tick.
         
-        if not valid_buffers:
+        The payload is kept encoded (copied: it outlives the pooled receive
+        buffer) and decoded by the mixer thread, so codec work never runs on
+        the UDP receive path.
+        """
+        if len(audio_data) == 0:
             return
         
-        # Get recipient addresses with lock
-        recipient_addrs = {}
-        with self.clients_lock:
-            for rid in participants:
-                if (rid != sender_id and
-                    rid in self.clients and
-                    self.clients[rid].udp_address):
-                    recipient_addrs[rid] = self.clients[rid].udp_address
+        queue = meeting.audio_queues.get(sender_id)
+        if queue is None:
+            with meeting.lock:
+                queue = meeting.audio_queues.setdefault(sender_id, AudioJitterQueue())
+        queue.push(bytes(audio_data), flags)
+    
+    def mix_meeting_audio(self, meeting: Meeting) -> int:
+        """
+        One mixer tick for one meeting: pull a frame per talker, mix, send.
         
-        if not recipient_addrs:
-            return
+        Every talker's queue is drained each tick (even when nobody can hear
+        them) so queued audio never turns into latency. Only the active speakers
+        (top-K by smoothed level) are mixed; each recipient gets one packet
+        containing those speakers except themselves. A change of speakers is
+        broadcast as an 'active_speakers' TCP event.
         
-        # Mix audio for each recipient
-        for recipient_id, addr in recipient_addrs.items():
-            sources = [
-                sid for sid in valid_buffers
-                if sid != recipient_id
-            ]
+        CODECS: Each source is decoded once with its sender's codec, and each
+        distinct mix is encoded once per codec in use, however many recipients
+        share it. Participants at a different sample rate than the meeting are
+        resampled on the way in and out (their mix is encoded for them alone).
+        
+        LOCKING: Takes only this meeting's lock, once; packets are sent after
+        it is released. RETURNS: number of packets sent.
+        """
+        packets = []
+        speakers = None
+        
+        with meeting.lock:
+            # One frame per talker for this tick
+            frames = {}
+            for pid, queue in meeting.audio_queues.items():
+                payload = queue.pop()
+                if (payload is None or
+                    pid in meeting.muted_participants or
+                    pid in meeting.locked_mics):
+                    continue
+                sender = meeting.members.get(pid)
+                if sender is None:
+                    continue
+                try:
+                    frame = sender.audio_codec.decode(payload)
+                except ValueError:
+                    continue  # Malformed payload for the negotiated codec
+                if sender.uplink_resampler is not None:
+                    frame = sender.uplink_resampler.process(frame)
+                if len(frame) == meeting.frame_samples:  # Anything else is not in the negotiated format
+                    frames[pid] = frame
             
-            if not sources:
-                continue
+            # Track levels even while nobody else is listening, so the speaker
+            # list is already right when someone joins
+            if meeting.speakers.update(frames):
+                speakers = list(meeting.speakers.active)
             
-            try:
-                # Vectorized audio mixing with bounds checking
-                if len(self.audio_mix_buffer) < target_len:
-                    self.audio_mix_buffer = np.zeros(target_len, dtype=np.float32)
-                else:
-                    self.audio_mix_buffer[:target_len] = 0
-                
-                for source_id in sources:
-                    source_audio = valid_buffers[source_id]
-                    add_len = min(target_len, len(source_audio))
-                    if add_len > 0:
-                        self.audio_mix_buffer[:add_len] += source_audio[:add_len].astype(np.float32)
-                
-                # Clip and convert with volume normalization
-                if len(sources) > 1:
-                    # Normalize volume when mixing multiple sources
-                    self.audio_mix_buffer[:target_len] /= len(sources)
-                
-                mixed = np.clip(
-                    self.audio_mix_buffer[:target_len],
-                    -32768, 32767
-                ).astype(np.int16)
+            # Mix only the active speakers that have a frame this tick
+            talkers = [pid for pid in meeting.speakers.active if pid in frames]
+            if talkers and len(meeting.participants) >= 2:
+                # Every talker's N-1 mix plus the full mix, in one vectorized pass
+                rows = {pid: row for row, pid in enumerate(talkers)}
+                mixes = meeting.audio_mixer.mix([frames[pid] for pid in talkers])
+                full_mix = len(talkers)
                 
-                # Send with header
-                packet = b'A\x00\x00' + mixed.tobytes()
-                self.udp_socket.sendto(packet, addr)
+                # One header per mix: stream ID 0 marks server-mixed audio
+                meeting.mix_sequence = next_sequence(meeting.mix_sequence)
+                header = MEDIA_HEADER.pack(STREAM_AUDIO, 0, MIXED_AUDIO_STREAM_ID,
+                                           meeting.mix_sequence, media_timestamp())
                 
-            except Exception as e:
-                print(f"Audio mixing error for {recipient_id}: {e}")
-                continue
-    
-    def broadcast_udp_to_meeting(self, meeting_code: str, stream_type: str,
-                                 sender_id: str, data: bytes, exclude_id: Optional[str] = None):
-        """Broadcast UDP with zero-copy"""
-        sender_id_bytes = sender_id.encode('utf-8')
-        sender_len = len(sender_id_bytes)
-        
-        # Build packet once
-        packet_size = 1 + 2 + sender_len + len(data)
-        if packet_size > len(self.udp_send_buffer):
-            packet = bytearray(packet_size)
-        else:
-            packet = self.udp_send_buffer[:packet_size]
-        
-        packet[0] = ord(stream_type)
-        struct.pack_into('!H', packet, 1, sender_len)
-        packet[3:3+sender_len] = sender_id_bytes
-        packet[3+sender_len:] = data
+                # One packet per recipient (meeting's recipient snapshot); a lone
+                # talker has nobody else to hear, so gets nothing
+                encoded = {}  # (mix row, codec name) -> payload
+                for recipient_id, addr in meeting.udp_recipients:
+                    row = rows.get(recipient_id, full_mix)
+                    if row != full_mix and len(talkers) == 1:
+                        continue
+                    recipient = meeting.members.get(recipient_id)
+                    if recipient is None:
+                        continue
+                    codec = recipient.audio_codec
+                    if recipient.downlink_resampler is not None:
+                        payload = codec.encode(recipient.downlink_resampler.process(mixes[row]))
+                    else:
+                        payload = encoded.get((row, codec.name))
+                        if payload is None:
+                            payload = encoded[(row, codec.name)] = codec.encode(mixes[row])
+                    packets.append((header + payload, addr))
         
-        # Send to all recipients
-        clients_to_send = []
-        with self.clients_lock:
-            for cid, cinfo in self.clients.items():
-                if (cid != exclude_id and
-                    cinfo.meeting_code == meeting_code and
-                    cinfo.udp_address):
-                    clients_to_send.append(cinfo.udp_address)
+        if speakers is not None:
+            self.broadcast_to_meeting(meeting.code, {'type': 'active_speakers', 'speakers': speakers},
+                                      udp_ready_only=True)
         
-        for addr in clients_to_send:
+        # Send outside the lock
+        for packet, addr in packets:
+            try:
+                self.udp_socket.sendto(packet, addr)
+            except OSError:
+                pass
+        return len(packets)
+    
+    def relay_udp_packet(self, meeting: Meeting, packet: memoryview, sender_id: str, layer: int = 0):
+        """
+        Forward a received video datagram to the members that render the sender
+        at this simulcast layer.
+        
+        The packet is sent straight from the receive buffer's memoryview: no
+        rebuilt header, no per-recipient bytes() copy. Video arrives as
+        MTU-sized fragments (media/fragment.py); each is forwarded as soon as it
+        arrives and only receiving clients reassemble frames. Recipients come
+        from the meeting's video_routes (selective forwarding).
+        """
+        sendto = self.udp_socket.sendto
+        # Subscribed recipients (immutable snapshot, no lock needed)
+        for addr in meeting.video_routes.get((sender_id, layer), ()):
             try:
-                self.udp_socket.sendto(bytes(packet), addr)
+                sendto(packet, addr)
             except:
                 pass
     
     def broadcast_to_meeting(self, meeting_code: str, message: dict,
-                            exclude_id: Optional[str] = None):
-        """Broadcast TCP message to meeting"""
+                            exclude_id: Optional[str] = None, udp_ready_only: bool = False):
+        """
+        Broadcast TCP message to meeting. With udp_ready_only, members still in
+        the join handshake (UDP address not known yet) are skipped: they read
+        the unframed join response with a single recv and must get it alone.
+        """
         data = self._serialize_message(message)
         length = struct.pack('!I', len(data))
         packet = length + data
         
-        # Collect sockets
-        sockets_to_send = []
-        with self.clients_lock:
-            for cid, cinfo in self.clients.items():
-                if (cid != exclude_id and
-                    cinfo.meeting_code == meeting_code):
-                    sockets_to_send.append(cinfo.socket)
+        droppable = message.get('type') in DROPPABLE_MESSAGE_TYPES
         
-        # Send to all
-        for sock in sockets_to_send:
+        meeting = self.meetings.get(meeting_code)
+        if not meeting:
+            return
+        
+        # Queue for all members (immutable snapshot, no lock needed);
+        # each member's writer does the actual socket write
+        for cid, cinfo in meeting.tcp_recipients:
+            if cid == exclude_id or (udp_ready_only and not cinfo.udp_address):
+                continue
+            cinfo.outbound.put(packet, droppable)
+    
+    def handle_receiver_report(self, meeting: Meeting, receiver_id: str, streams):
+        """
+        Record a client's report about the video it receives and send each
+        reported sender, at most once per REPORT_INTERVAL, the combined view of
+        all its receivers ('video_feedback', see media/feedback.py).
+        """
+        # Validate the whole report first: a malformed one is dropped, never
+        # allowed to raise into (and end) the reporting client's session
+        now = time.monotonic()
+        entries = []
+        for entry in streams if isinstance(streams, list) else (None,):
+            stream_id = entry.get('stream_id') if isinstance(entry, dict) else None
+            if not isinstance(stream_id, int) or isinstance(stream_id, bool):
+                self.logger.warning(f"Ignoring malformed receiver report from {receiver_id}")
+                return
             try:
-                sock.sendall(packet)
-            except:
-                pass
+                loss, jitter, kbps = (float(entry.get('loss', 0)), float(entry.get('jitter_ms', 0)),
+                                      float(entry.get('kbps', 0)))
+            except (TypeError, ValueError):
+                self.logger.warning(f"Ignoring malformed receiver report from {receiver_id}")
+                return
+            if not all(0.0 <= value < float('inf') for value in (loss, jitter, kbps)):
+                self.logger.warning(f"Ignoring malformed receiver report from {receiver_id}")
+                return
+            entries.append((stream_id, (now, min(loss, 1.0), jitter, kbps)))
+        
+        self.stats['receiver_reports'] += 1
+        feedback = []
+        with meeting.lock:
+            for stream_id, report in entries:
+                sender = self.streams.get(stream_id)
+                if sender is None or sender.meeting is not meeting or sender.client_id == receiver_id:
+                    continue
+                sender.receiver_reports[receiver_id] = report
+                if now - sender.last_video_feedback < REPORT_INTERVAL:
+                    continue
+                sender.last_video_feedback = now
+                
+                # Combine the fresh reports from every receiver of this sender
+                for cid, (at, _, _, _) in list(sender.receiver_reports.items()):
+                    if now - at > REPORT_MAX_AGE or cid not in meeting.members:
+                        del sender.receiver_reports[cid]
+                reports = list(sender.receiver_reports.values())
+                losses = sorted(r[1] for r in reports)
+                jitters = sorted(r[2] for r in reports)
+                feedback.append((sender.client_id, {
+                    'type': 'video_feedback',
+                    'loss': losses[len(losses) // 2],
+                    'max_loss': losses[-1],
+                    'jitter_ms': jitters[len(jitters) // 2],
+                    'kbps': round(sum(r[3] for r in reports), 1),
+                    'receivers': len(reports)
+                }))
+        
+        for sender_id, message in feedback:
+            self.send_to_client(sender_id, message)
+    
+    def announce_video_layers(self, meeting: Meeting):
+        """
+        Tell senders whose simulcast layer demand changed which layers to
+        encode ('video_layers'); an empty list means nobody is watching.
+        
+        Runs under the meeting lock so two concurrent callers cannot queue
+        demands out of order (it only enqueues, never blocks on a socket).
+        Members are skipped until their UDP address is known: before that they
+        cannot send video, and the unframed join response must reach them alone.
+        """
+        with meeting.lock:
+            demand = meeting.video_layer_demand
+            for cid, cinfo in meeting.tcp_recipients:
+                if not cinfo.udp_address:
+                    continue
+                layers = demand.get(cid, ())
+                if layers != cinfo.video_layers_announced:
+                    cinfo.video_layers_announced = layers
+                    self.send_to_client(cid, {'type': 'video_layers', 'layers': list(layers)})
+    
+    def send_cached_video(self, meeting: Meeting):
+        """
+        Replay the cached camera frame of every (sender, layer) newly routed to
+        a receiver (see Meeting FIRST FRAME), so the tile shows a picture
+        without waiting for the sender's next frame. Datagrams are sent
+        straight from the cache; nothing is copied.
+        """
+        if not meeting.new_video_routes:
+            return
+        with meeting.lock:
+            routes, meeting.new_video_routes = meeting.new_video_routes, []
+        sendto = self.udp_socket.sendto
+        for (sender, layer), addr in routes:
+            for packet in meeting.video_cache.frame(sender, layer):
+                try:
+                    sendto(packet, addr)
+                except:
+                    pass
+    
+    def send_cached_screen(self, meeting: Meeting, client_info):
+        """
+        Catch a member that just finished joining up on an ongoing screen share:
+        announce the presenter, then queue the cached full frame and the updates
+        since as a whole (see queue_cached_screen). Without a cached chain (no
+        full frame yet, or it overflowed) the presenter is asked for a full
+        refresh instead.
+        """
+        with meeting.lock:
+            presenter_id = meeting.current_presenter
+            if not presenter_id or presenter_id == client_info.client_id:
+                return
+            self.send_to_client(client_info.client_id,
+                                {'type': 'screen_share_started', 'presenter_id': presenter_id})
+            self.queue_cached_screen(meeting, client_info, presenter_id)
+    
+    def queue_cached_screen(self, meeting: Meeting, client_info, presenter_id: str):
+        """
+        Queue the presenter's cached screen chain (full frame + updates since)
+        for one viewer, or ask the presenter for a full refresh if nothing is
+        cached. The chain is queued as one packet in the presenter's latest-wins
+        slot, so it is kept or dropped as a whole and live frames follow it in
+        order. Callers hold the meeting lock.
+        """
+        frames = meeting.screen_cache.frames_for(presenter_id)
+        if frames:
+            client_info.outbound.put_latest(b''.join(frames), presenter_id, True)
+        else:
+            self.send_to_client(presenter_id, {'type': 'screen_refresh'})
     
     def send_to_client(self, client_id: str, message: dict):
         """Send message to specific client"""
-        with self.clients_lock:
-            client_info = self.clients.get(client_id)
+        client_info = self.clients.get(client_id)  # Atomic lookup, no global lock
         if not client_info:
             return
         
         data = self._serialize_message(message)
         length = struct.pack('!I', len(data))
         
-        try:
-            client_info.socket.sendall(length + data)
-        except:
-            pass
+        client_info.outbound.put(length + data, message.get('type') in DROPPABLE_MESSAGE_TYPES)
 
     def stop(self):
         """Stop the server"""
         self.running = False
         
+        if self.loop and self.stop_event and not self.loop.is_closed():
+            # asyncio engine: the event loop owns both sockets and closes them
+            # when serve_async() returns
+            try:
+                self.loop.call_soon_threadsafe(self.stop_event.set)
+            except RuntimeError:
+                pass
+        else:
+            self.close_sockets()
+        
+        with self.clients_lock:
+            for client_id, client_info in self.clients.items():
+                try:
+                    client_info.socket.close()
+                except:
+                    pass
+            self.clients.clear()
+    
+    def close_sockets(self):
+        """Close the listening TCP socket and the UDP media socket"""
         if self.tcp_socket:
             try:
                 self.tcp_socket.close()
@@ -1195,17 +2340,196 @@ class OptimizedConferenceServer:
                 self.udp_socket.close()
             except:
                 pass
+
+"""
+===================================================================================
+MULTI-PROCESS MODE (MEETINGS SHARDED ACROSS CPU CORES)
+===================================================================================
+"""
+
+def run_shard_worker(shard_index, shard_count, host, tcp_port, engine,
+                     queue_limit, overflow_policy, ready_queue):
+    """
+    Entry point of one worker process.
+    
+    Runs a complete OptimizedConferenceServer (own GIL, own audio mixing and
+    relay) and reports the ports it actually bound back to the supervisor.
+    """
+    server = OptimizedConferenceServer(host, tcp_port, engine=engine,
+                                       queue_limit=queue_limit,
+                                       overflow_policy=overflow_policy,
+                                       shard_index=shard_index,
+                                       shard_count=shard_count)
+    server.start()
+    ready_queue.put((shard_index, server.tcp_port, server.udp_port))
+    
+    try:
+        while server.running:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+class ShardSupervisor:
+    """
+    Front door for multi-process mode.
+    
+    PURPOSE: Spreads meetings over N worker processes so audio mixing and media
+    relay for different meetings run on different CPU cores.
+    
+    ROUTING:
+    - Clients connect to the public TCP port as usual and send create/join
+    - create_meeting: the next worker in round-robin order is chosen
+      (workers only generate codes that hash to themselves)
+    - join_meeting: the worker is shard_for_code(meeting_code)
+    - The supervisor replies {'type': 'redirect', 'tcp_port', 'udp_port'} and
+      closes; the client reconnects to that worker and resends its request
+    
+    Worker i listens on TCP port (tcp_port + 2 + 2*i) and UDP port one above it
+    (or the next free ports if those are taken).
+    """
+    def __init__(self, host='0.0.0.0', tcp_port=5001, workers=2, engine=DEFAULT_ENGINE,
+                 queue_limit=OUTBOUND_QUEUE_MESSAGES, overflow_policy=OVERFLOW_DROP_OLDEST):
+        self.host = host
+        self.tcp_port = tcp_port
+        self.worker_count = workers
+        self.engine = engine
+        self.queue_limit = queue_limit
+        self.overflow_policy = overflow_policy
+        
+        self.processes = []  # multiprocessing.Process per worker
+        self.worker_ports: Dict[int, tuple] = {}  # shard_index -> (tcp_port, udp_port)
+        self.next_worker = 0  # Round-robin cursor for new meetings
+        self.route_lock = threading.Lock()
+        self.tcp_socket = None
+        self.running = False
+        self.logger = logging.getLogger('SUPERVISOR')
+    
+    def start(self):
+        """Spawn the workers, wait for their ports, then accept client connections"""
+        # 'spawn' behaves the same on Windows, macOS and Linux
+        ctx = multiprocessing.get_context('spawn')
+        ready_queue = ctx.Queue()
+        
+        for index in range(self.worker_count):
+            process = ctx.Process(
+                target=run_shard_worker,
+                args=(index, self.worker_count, self.host, self.tcp_port + 2 + 2 * index,
+                      self.engine, self.queue_limit, self.overflow_policy, ready_queue),
+                name=f'loop-worker-{index}',
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+        
+        for _ in range(self.worker_count):
+            index, worker_tcp, worker_udp = ready_queue.get(timeout=30)
+            self.worker_ports[index] = (worker_tcp, worker_udp)
+            print(f"  Worker {index}: TCP {worker_tcp} | UDP {worker_udp}")
+        
+        self.tcp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.tcp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.tcp_socket.bind((self.host, self.tcp_port))
+        self.tcp_socket.listen(64)
+        self.running = True
         
-        with self.clients_lock:
-            for client_id, client_info in self.clients.items():
-                try:
-                    client_info.socket.close()
-                except:
-                    pass
-            self.clients.clear()
+        print(f"🚀 Supervisor started with {self.worker_count} workers")
+        print(f"📡 TCP: {self.host}:{self.tcp_port}")
+        self.logger.info(f'Supervisor listening on {self.host}:{self.tcp_port} '
+                         f'with {self.worker_count} workers')
+        
+        threading.Thread(target=self.accept_connections, daemon=True).start()
+    
+    def accept_connections(self):
+        """Accept clients and route each one on a short-lived thread"""
+        while self.running:
+            try:
+                client_socket, address = self.tcp_socket.accept()
+                threading.Thread(target=self.route_client, args=(client_socket, address),
+                                 daemon=True).start()
+            except Exception as e:
+                if self.running:
+                    print(f"❌ Error accepting connection: {e}")
+    
+    def pick_worker(self, message: dict) -> Optional[int]:
+        """Choose the worker for a create/join request (None if unroutable)"""
+        if message.get('type') == 'create_meeting':
+            with self.route_lock:
+                index = self.next_worker
+                self.next_worker = (self.next_worker + 1) % self.worker_count
+            return index
+        if message.get('type') == 'join_meeting':
+            return shard_for_code(message.get('meeting_code', ''), self.worker_count)
+        return None
+    
+    def route_client(self, client_socket, address):
+        """Read the initial request and redirect the client to its worker"""
+        try:
+            client_socket.settimeout(10)
+            data = client_socket.recv(4096)
+            if not data:
+                return
+            
+            try:
+                message = json.loads(data.decode('utf-8'))
+                index = self.pick_worker(message)
+            except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+                index = None
+            
+            if index is None:
+                response = {'type': 'error', 'message': 'Invalid message format'}
+            else:
+                worker_tcp, worker_udp = self.worker_ports[index]
+                response = {'type': 'redirect', 'tcp_port': worker_tcp, 'udp_port': worker_udp}
+                self.logger.info(f'{address[0]}:{address[1]} {message.get("type")} -> worker {index}')
+            client_socket.sendall(json.dumps(response).encode('utf-8'))
+        except OSError as e:
+            print(f"Routing error for {address}: {e}")
+        finally:
+            client_socket.close()
+    
+    def stop(self):
+        """Stop routing and terminate the workers"""
+        self.running = False
+        if self.tcp_socket:
+            try:
+                self.tcp_socket.close()
+            except:
+                pass
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            process.join(timeout=2)
 
 def main():
-    server = OptimizedConferenceServer()
+    multiprocessing.freeze_support()  # Required for spawned workers in frozen executables
+    
+    parser = argparse.ArgumentParser(description='Loop conference server')
+    parser.add_argument('--host', default='0.0.0.0', help='Address to bind (default: all interfaces)')
+    parser.add_argument('--port', type=int, default=5001, help='TCP port (UDP uses port + 1)')
+    parser.add_argument('--engine', choices=[ENGINE_ASYNCIO, ENGINE_THREADED], default=DEFAULT_ENGINE,
+                        help='Connection engine (default: %(default)s)')
+    parser.add_argument('--queue-limit', type=int, default=OUTBOUND_QUEUE_MESSAGES,
+                        help='Max queued outbound messages per client (default: %(default)s)')
+    parser.add_argument('--overflow-policy', choices=OVERFLOW_POLICIES, default=OVERFLOW_DROP_OLDEST,
+                        help='What to drop when a client queue is full (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Shard meetings across N worker processes (default: single process)')
+    args = parser.parse_args()
+    
+    if args.workers > 1:
+        logging.basicConfig(level=logging.INFO,
+                            format='[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
+                            datefmt='%Y-%m-%d %H:%M:%S')
+        server = ShardSupervisor(args.host, args.port, workers=args.workers, engine=args.engine,
+                                 queue_limit=args.queue_limit,
+                                 overflow_policy=args.overflow_policy)
+    else:
+        server = OptimizedConferenceServer(args.host, args.port, engine=args.engine,
+                                           queue_limit=args.queue_limit,
+                                           overflow_policy=args.overflow_policy)
     server.start()
     
     try:
@@ -0,0 +1,277 @@
+"""
+===================================================================================
+SERVER BENCHMARKS - SERVER_BENCHMARKS.PY
+===================================================================================
+Repeatable performance measurements for the conferencing server's hot paths.
+Each benchmark starts a real server (or calls the real server code) on the
+local machine and prints its results; nothing here is needed to run Loop.
+
+BENCHMARKS:
+- udp-relay: Video relay throughput and per-packet memory on the UDP port
+  (one sender, N receivers, all over loopback)
+- audio-mix: Cost of one mixer tick for 2-50 talkers, vectorized N-1 mixer
+  versus the previous per-recipient loop
+- audio-codecs: Bytes per frame, encode/decode time and quality of each codec
+
+USAGE:
+    python server_benchmarks.py udp-relay [--packets N] [--size BYTES]
+                                          [--receivers N] [--engine asyncio|threaded]
+    python server_benchmarks.py audio-mix [--ticks N] [--talkers 2 5 10 ...]
+                                          [--rate HZ] [--frame-ms MS]
+    python server_benchmarks.py audio-codecs [--frames N] [--rate HZ] [--frame-ms MS]
+
+    Audio benchmarks default to the meeting default (16 kHz, 20 ms frames);
+    --rate 44100 --frame-ms 23.22 reproduces the old fixed 1024-sample format.
+===================================================================================
+"""
+
+import argparse
+import json
+import socket
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+import server as conference_server
+from media import STREAM_INIT, STREAM_VIDEO, NMinusOneMixer, build_media_packet
+from media import MAX_DATAGRAM_SIZE, MEDIA_HEADER_SIZE
+from media import AUDIO_CODECS, DEFAULT_SAMPLE_RATE, DEFAULT_FRAME_MS
+
+def find_free_port() -> int:
+    """Ask the OS for a currently unused TCP port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+def start_server(engine: str):
+    """Start a quiet local server and return it once it is accepting clients"""
+    server = conference_server.OptimizedConferenceServer('127.0.0.1', find_free_port(), engine=engine)
+    server.start()
+    time.sleep(0.3)
+    return server
+
+def join_meeting(server, request: dict):
+    """
+    Perform the create/join handshake and open a UDP socket for the client.
+
+    Returns (tcp_socket, udp_socket, response). The UDP socket has already sent
+    its initialization packet, so the server knows where to relay media.
+    """
+    tcp = socket.create_connection(('127.0.0.1', server.tcp_port))
+    tcp.sendall(json.dumps(request).encode('utf-8'))
+    tcp.settimeout(5)
+    response = json.loads(tcp.recv(65536).decode('utf-8'))
+
+    udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    udp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    udp.bind(('127.0.0.1', 0))
+    udp.settimeout(0.5)
+    udp.sendto(build_media_packet(STREAM_INIT, response['stream_id'], 0, 0, b'init'),
+               ('127.0.0.1', server.udp_port))
+    return tcp, udp, response
+
+def drain_udp(udp: socket.socket, counts: list, slot: int, stop: threading.Event):
+    """Count datagrams arriving at one receiver (recv_into: no allocations here)"""
+    buffer = bytearray(conference_server.UDP_MAX_DATAGRAM)
+    while not stop.is_set():
+        try:
+            udp.recv_into(buffer)
+            counts[slot] += 1
+        except socket.timeout:
+            continue
+        except OSError:
+            break
+
+def send_burst(udp: socket.socket, packet: bytes, address: tuple, packets: int):
+    """Send packets, pausing briefly every 64 so loopback buffers do not overflow"""
+    for i in range(packets):
+        udp.sendto(packet, address)
+        if i % 64 == 63:
+            time.sleep(0.001)
+
+def bench_udp_relay(packets: int, size: int, receivers: int, engine: str):
+    """
+    Measure the video relay path: sender -> server -> every other participant.
+
+    PHASE 1 (throughput): packets relayed per second, delivery ratio.
+    PHASE 2 (memory): tracemalloc peak while relaying. A copying receive path
+    holds at least one payload-sized buffer per packet in flight, so its peak
+    grows with --size; the pooled recvfrom_into path should stay far below
+    one datagram regardless of size.
+    """
+    server = start_server(engine)
+    try:
+        host_tcp, sender, created = join_meeting(server, {'type': 'create_meeting', 'username': 'sender'})
+        members = [join_meeting(server, {'type': 'join_meeting', 'username': f'viewer{i}',
+                                         'meeting_code': created['meeting_code']})
+                   for i in range(receivers)]
+        time.sleep(0.3)
+
+        packet = build_media_packet(STREAM_VIDEO, created['stream_id'], 0, 0, b'\x00' * size)
+        address = ('127.0.0.1', server.udp_port)
+        counts = [0] * receivers
+        stop = threading.Event()
+        threads = [threading.Thread(target=drain_udp, args=(udp, counts, i, stop), daemon=True)
+                   for i, (_, udp, _) in enumerate(members)]
+        for thread in threads:
+            thread.start()
+
+        # Phase 1: throughput
+        start = time.perf_counter()
+        send_burst(sender, packet, address, packets)
+        deadline = time.time() + 2
+        while sum(counts) < packets * receivers and time.time() < deadline:
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        delivered = sum(counts)
+
+        # Phase 2: memory held while relaying
+        sample = min(packets, 2000)
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        send_burst(sender, packet, address, sample)
+        time.sleep(0.2)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=1)
+        for tcp, udp, _ in members + [(host_tcp, sender, created)]:
+            tcp.close()
+            udp.close()
+
+        print("-" * 60)
+        print(f"📊 UDP relay ({engine}) - {packets} packets x {size} bytes -> {receivers} receivers")
+        print(f"  Delivered: {delivered}/{packets * receivers} "
+              f"({100.0 * delivered / max(1, packets * receivers):.1f}%)")
+        print(f"  Relayed: {delivered / elapsed:,.0f} packets/s | "
+              f"{delivered * len(packet) / elapsed / 1e6:,.1f} MB/s")
+        print(f"  Peak extra memory while relaying {sample} packets: {peak - baseline:,} bytes "
+              f"(one datagram = {len(packet):,} bytes)")
+        print("-" * 60)
+    finally:
+        server.stop()
+        time.sleep(0.3)
+
+def per_recipient_mix(frames, mix_buffer):
+    """
+    The mixer as it was before NMinusOneMixer (reference for audio-mix):
+    for every recipient, zero a buffer, re-add every other source, average, clip.
+    """
+    target_len = max(len(frame) for frame in frames)
+    mixes = []
+    for recipient in range(len(frames) + 1):  # + one listen-only recipient
+        sources = [i for i in range(len(frames)) if i != recipient]
+        mix_buffer[:target_len] = 0
+        for source in sources:
+            mix_buffer[:len(frames[source])] += frames[source].astype(np.float32)
+        if len(sources) > 1:
+            mix_buffer[:target_len] /= len(sources)
+        mixes.append(np.clip(mix_buffer[:target_len], -32768, 32767).astype(np.int16))
+    return mixes
+
+def time_ticks(mix_tick, ticks: int) -> float:
+    """Average seconds per call of mix_tick()"""
+    mix_tick()  # Warm up (array growth, caches)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        mix_tick()
+    return (time.perf_counter() - start) / ticks
+
+def audio_frame(rate: int, frame_ms: float):
+    """(samples per frame, frame period in seconds) for a benchmark format"""
+    return round(rate * frame_ms / 1000), frame_ms / 1000
+
+def bench_audio_mix(ticks: int, talker_counts: list, rate: int, frame_ms: float):
+    """
+    Time one mixer tick (all recipients' mixes) as the number of talkers grows.
+
+    Every talker sends a full frame each tick, which is the worst case; one
+    extra listen-only recipient receives the full mix. The budget column is
+    the share of real time spent mixing (cost per tick / frame period).
+    """
+    samples, budget = audio_frame(rate, frame_ms)
+    rng = np.random.default_rng(0)
+    mixer = NMinusOneMixer(frame_samples=samples)
+    mix_buffer = np.zeros(samples, dtype=np.float32)
+
+    print("-" * 60)
+    print(f"📊 Audio mix - {rate} Hz, {samples} samples/frame, {ticks} ticks, "
+          f"tick budget {budget * 1000:.1f} ms")
+    print(f"  {'talkers':>7} | {'per-recipient':>13} | {'vectorized':>10} | {'speedup':>7} | {'budget':>6}")
+    for talkers in talker_counts:
+        frames = [rng.integers(-8000, 8000, samples, dtype=np.int16) for _ in range(talkers)]
+        legacy = time_ticks(lambda: per_recipient_mix(frames, mix_buffer), ticks)
+        vectorized = time_ticks(lambda: mixer.mix(frames), ticks)
+        print(f"  {talkers:>7} | {legacy * 1e6:>10.0f} us | {vectorized * 1e6:>7.0f} us | "
+              f"{legacy / vectorized:>6.1f}x | {100 * vectorized / budget:>5.1f}%")
+    print("-" * 60)
+
+def bench_audio_codecs(frames: int, rate: int, frame_ms: float):
+    """
+    Compare the audio codecs on one frame of speech-like audio (a few tones
+    plus noise): wire size and bitrate, CPU per frame and signal-to-noise ratio.
+    """
+    samples, budget = audio_frame(rate, frame_ms)
+    rng = np.random.default_rng(0)
+    t = np.arange(samples) / rate
+    signal = (4000 * np.sin(2 * np.pi * 220 * t) + 2000 * np.sin(2 * np.pi * 870 * t)
+              + rng.normal(0, 300, samples))
+    frame = signal.astype(np.int16)
+    raw_bytes = frame.nbytes
+
+    print("-" * 60)
+    print(f"📊 Audio codecs - {rate} Hz, {samples} samples/frame, {frames} frames, "
+          f"frame period {budget * 1000:.1f} ms")
+    print(f"  {'codec':>10} | {'bytes':>5} | {'kbit/s':>6} | {'ratio':>5} | {'encode':>9} | "
+          f"{'decode':>9} | {'SNR':>7}")
+    for name, codec in AUDIO_CODECS.items():
+        payload = codec.encode(frame)
+        decoded = codec.decode(payload)
+        encode = time_ticks(lambda: codec.encode(frame), frames)
+        decode = time_ticks(lambda: codec.decode(payload), frames)
+        noise = np.mean((decoded.astype(np.float64) - frame) ** 2)
+        snr = 10 * np.log10(np.mean(frame.astype(np.float64) ** 2) / noise) if noise else float('inf')
+        print(f"  {name:>10} | {len(payload):>5} | {len(payload) * 8 / budget / 1000:>6.1f} | "
+              f"{raw_bytes / len(payload):>4.1f}x | "
+              f"{encode * 1e6:>6.0f} us | {decode * 1e6:>6.0f} us | {snr:>4.1f} dB")
+    print("-" * 60)
+
+def main():
+    parser = argparse.ArgumentParser(description='Loop server benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    relay = subparsers.add_parser('udp-relay', help='Video relay throughput and memory')
+    relay.add_argument('--packets', type=int, default=20000)
+    relay.add_argument('--size', type=int, default=MAX_DATAGRAM_SIZE - MEDIA_HEADER_SIZE,
+                       help='Video payload bytes per packet (default: one full video fragment)')
+    relay.add_argument('--receivers', type=int, default=4)
+    relay.add_argument('--engine', choices=[conference_server.ENGINE_ASYNCIO,
+                                            conference_server.ENGINE_THREADED],
+                       default=conference_server.DEFAULT_ENGINE)
+
+    mix = subparsers.add_parser('audio-mix', help='Mixer tick cost versus number of talkers')
+    mix.add_argument('--ticks', type=int, default=200)
+    mix.add_argument('--talkers', type=int, nargs='+', default=[2, 5, 10, 20, 30, 50])
+    mix.add_argument('--rate', type=int, default=DEFAULT_SAMPLE_RATE)
+    mix.add_argument('--frame-ms', type=float, default=DEFAULT_FRAME_MS)
+
+    codecs = subparsers.add_parser('audio-codecs', help='Audio codec size, speed and quality')
+    codecs.add_argument('--frames', type=int, default=200)
+    codecs.add_argument('--rate', type=int, default=DEFAULT_SAMPLE_RATE)
+    codecs.add_argument('--frame-ms', type=float, default=DEFAULT_FRAME_MS)
+
+    args = parser.parse_args()
+    if args.benchmark == 'udp-relay':
+        bench_udp_relay(args.packets, args.size, args.receivers, args.engine)
+    elif args.benchmark == 'audio-mix':
+        bench_audio_mix(args.ticks, args.talkers, args.rate, args.frame_ms)
+    elif args.benchmark == 'audio-codecs':
+        bench_audio_codecs(args.frames, args.rate, args.frame_ms)
+
+if __name__ == '__main__':
+    main()
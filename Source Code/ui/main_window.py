@@ -53,12 +53,12 @@ import numpy as np  # Numerical operations for audio/video
 import pyaudio  # Audio capture and playback
 import base64  # Encoding binary data for JSON transmission
 import threading  # Concurrent operations
+import time  # Encode timing
 import uuid  # Unique identifiers
 import os  # File operations
 from datetime import datetime  # Timestamps
 import mss  # Screen capture library
 import mss.tools  # Screen capture tools
-import queue  # Thread-safe queues for audio
 import random  # Random number generation
 import hashlib  # Hashing for color generation
 import json  # JSON serialization
@@ -68,6 +68,11 @@ from PIL import Image, ImageDraw, ImageFont  # Image processing
 
 # Import custom UI components
 from .login_dialog import EnhancedLoginDialog
+from media import VoiceActivityDetector  # Silence suppression for the microphone
+from media import AUDIO_SAMPLE_RATES  # Rates offered to the server at join
+from media import VIDEO_LAYERS  # Simulcast resolutions encoded for the camera
+from media import FrameSlot  # Latest-frame hand-off from camera capture to the encoder
+from media import ScreenCanvas  # Rebuilds a shared screen from dirty-tile updates
 from .styles import MAIN_STYLESHEET
 
 
@@ -272,6 +277,7 @@ class ParticipantVideoWidget(QFrame):
         self.is_muted = False
         self.is_mic_locked = False
         self.hand_raised = False
+        self.is_speaking = False
         self.profile_image = profile_image
         self.setObjectName("participant_video_widget")
         self.setMinimumSize(320, 240)
@@ -463,7 +469,16 @@ class ParticipantVideoWidget(QFrame):
     def set_hand_raised(self, raised):
         self.hand_raised = raised
         self.hand_raise_indicator.setVisible(raised)
-        if raised:
+        self.update_border()
+    
+    def set_speaking(self, speaking):
+        """Highlight this tile while the server lists the participant as an active speaker"""
+        if speaking != self.is_speaking:
+            self.is_speaking = speaking
+            self.update_border()
+    
+    def update_border(self):
+        if self.hand_raised:
             # Add border highlight when hand is raised
             self.setStyleSheet("""
                 QFrame#participant_video_widget {
@@ -471,6 +486,12 @@ class ParticipantVideoWidget(QFrame):
                     box-shadow: 0 4px 12px rgba(255, 185, 0, 0.3);
                 }
             """)
+        elif self.is_speaking:
+            self.setStyleSheet("""
+                QFrame#participant_video_widget {
+                    border: 3px solid #0078d4;
+                }
+            """)
         else:
             self.setStyleSheet("""
                 QFrame#participant_video_widget {
@@ -800,6 +821,136 @@ class ScreenCaptureThread(QThread):
         except Exception as e: print(f"Screen capture error: {e}")
     def stop(self): self.running = False; self.wait()
 
+PREVIEW_INTERVAL = 1 / 30  # Self-view refresh cap (seconds between previews)
+
+class CameraCaptureThread(QThread):
+    """
+    Reads the webcam and hands every frame to the encoder.
+    
+    PURPOSE: camera.read() blocks until the camera has a frame; doing that (and
+    the resize) on the GUI thread stalled chat and controls and let a busy UI
+    lower the frame rate. This thread reads at the camera's own rate and
+    overwrites the encoder's single-slot FrameSlot, so the encoder always
+    takes the newest frame and stale ones are dropped, never queued.
+    
+    SELF-VIEW: preview_ready is emitted at most every PREVIEW_INTERVAL and only
+    after the GUI painted the previous preview (see show_local_video), so the
+    GUI never has a backlog of frames to paint.
+    """
+    preview_ready = pyqtSignal(np.ndarray)
+    def __init__(self, camera, slot, timings):
+        super().__init__()
+        self.camera = camera; self.slot = slot; self.timings = timings
+        self.running = False
+        self.preview_pending = False  # A preview was emitted and not painted yet
+    def run(self):
+        self.running = True
+        next_preview = 0.0
+        try:
+            while self.running:
+                started = time.perf_counter()
+                ret, frame = self.camera.read()
+                read = time.perf_counter()
+                self.timings.add('capture', read - started)
+                if not ret:
+                    self.msleep(10)
+                    continue
+                # 640x480 is the full-size simulcast layer
+                frame = cv2.resize(frame, VIDEO_LAYERS[0])
+                now = time.perf_counter()
+                self.timings.add('resize', now - read)
+                self.slot.put(frame)
+                if not self.preview_pending and now >= next_preview:
+                    self.preview_pending = True
+                    next_preview = now + PREVIEW_INTERVAL
+                    self.preview_ready.emit(frame)
+        except Exception as e: print(f"Camera capture error: {e}")
+    def stop(self): self.running = False; self.wait()
+
+class VideoEncodeThread(QThread):
+    """
+    Encodes the newest captured camera frame and sends it via UDP.
+    
+    VIDEO PROCESSING (per frame taken from the FrameSlot):
+    1. Skip it when the client's FrameChangeDetector finds no change since
+       the last frame sent (a keep-alive frame still goes out every second)
+    2. Scale down to each simulcast layer somebody is watching
+       (640x480, 320x240, 160x120; the server says which)
+    3. Compress each layer to JPEG (quality 60%) and send it via UDP,
+       tagged with its layer
+    
+    ADAPTIVE BITRATE:
+    The client's VideoRateController (driven by receiver reports) lowers
+    JPEG quality, resolution (all layers scaled) and frame rate when
+    receivers see loss, and raises them again when clean. The frame rate is
+    applied here: after each frame the thread waits out the rest of the
+    frame interval while the capture thread keeps replacing the slot's frame.
+    
+    PROTOCOL: UDP (User Datagram Protocol)
+    - Packet size: ~10-30 KB per full-size frame (depends on content)
+    - Frame rate: 20 FPS
+    - Total bandwidth: ~200-600 KB/s for the full-size layer; the smaller
+      layers add roughly a third and a tenth of that
+    
+    TIMINGS: queue wait, detect, encode and send times go to the client's
+    video_timings (logged at disconnect).
+    """
+    def __init__(self, client, slot):
+        super().__init__()
+        self.client = client; self.slot = slot
+        self.running = False
+    def run(self):
+        self.running = True
+        client = self.client
+        timings = client.video_timings
+        while self.running:
+            item = self.slot.take(0.5)
+            if item is None:
+                continue
+            frame, captured = item
+            started = time.perf_counter()
+            timings.add('queue', started - captured)
+            # Current rate controller step (read once: updated from the TCP thread)
+            _, rate_scale, rate_fps, rate_quality = client.video_rate.step
+            try:
+                # Nothing moved since the last frame sent: skip encode and send
+                changed = client.video_change.check(frame)
+                timings.add('detect', time.perf_counter() - started)
+                if changed:
+                    self.encode_and_send(frame, rate_scale, rate_quality)
+            except Exception as e:
+                print(f"Video encode error: {e}")
+            
+            # Hold the rate controller's frame rate
+            remaining = 1.0 / rate_fps - (time.perf_counter() - started)
+            if remaining > 0 and self.running:
+                self.msleep(int(remaining * 1000))
+    def encode_and_send(self, frame, rate_scale, rate_quality):
+        client = self.client
+        timings = client.video_timings
+        encoded = []
+        started = time.perf_counter()
+        # Simulcast: one JPEG per layer the server says is watched
+        # (none while nobody renders this camera)
+        for layer in client.video_layers:
+            width, height = VIDEO_LAYERS[layer]
+            size = (int(width * rate_scale), int(height * rate_scale))
+            scaled = frame if size == VIDEO_LAYERS[0] else cv2.resize(
+                frame, size, interpolation=cv2.INTER_AREA)
+            _, buf = cv2.imencode('.jpg', scaled, [cv2.IMWRITE_JPEG_QUALITY, rate_quality])
+            encoded.append((layer, buf))
+        encode_seconds = time.perf_counter() - started
+        timings.add('encode', encode_seconds)
+        
+        sent_bytes = 0
+        for layer, buf in encoded:
+            # The layer index travels in the header flags
+            client.send_udp_stream('V', buf.tobytes(), flags=layer)
+            sent_bytes += len(buf)
+        timings.add('send', time.perf_counter() - started - encode_seconds)
+        client.video_change.record(sent_bytes, encode_seconds)
+    def stop(self): self.running = False; self.slot.close(); self.wait()
+
 class EnhancedMainWindow(QMainWindow):
     def __init__(self, client):
         super().__init__()
@@ -811,6 +962,7 @@ class EnhancedMainWindow(QMainWindow):
         self.setStyleSheet(MAIN_STYLESHEET)
         
         self.video_widgets = {}
+        self.active_speakers = []  # Server's current active speakers, loudest first
         self.is_host = False
         self.is_muted_by_host = False
         self.is_mic_locked_by_host = False
@@ -822,7 +974,8 @@ class EnhancedMainWindow(QMainWindow):
         
 
         
-        self.camera = None; self.video_timer = None; self.screen_capture_thread = None
+        self.camera = None; self.camera_thread = None; self.encode_thread = None; self.screen_capture_thread = None
+        self.screen_canvas = ScreenCanvas(); self.screen_canvas_owner = None  # Presenter's screen as received
         self.ui_running = True
         
         # Profile picture management
@@ -841,12 +994,12 @@ class EnhancedMainWindow(QMainWindow):
         self.output_device_index = None
         self.init_audio_devices()
         self.audio_thread_input = None; self.audio_thread_output = None
-        self.audio_output_queue = queue.Queue()
-        self.audio_chunk_size, self.audio_rate = 1024, 44100
         self.focused_client_id = None
         self.grid_size = 0
         self.current_page = 0
         if not self.show_login(): import sys; sys.exit()
+        # Capture/playback format negotiated at join (e.g. 16 kHz, 20 ms = 320 samples)
+        self.audio_chunk_size, self.audio_rate = self.client.audio_frame_samples, self.client.audio_rate
         if self.p_audio:
             self.audio_thread_output = threading.Thread(target=self._audio_write_thread, daemon=True)
             self.audio_thread_output.start()
@@ -901,11 +1054,31 @@ class EnhancedMainWindow(QMainWindow):
             
             if self.output_device_index is None:
                 print("❌ ERROR: No output devices (speakers) found.")
+            
+            # Sample rates both devices accept, offered to the server at join
+            self.client.capture_rates = self.supported_audio_rates()
+            print(f"🎚️ Supported audio rates: {self.client.capture_rates}")
                 
         except Exception as e:
             print(f"❌ PyAudio initialization failed: {e}")
             self.p_audio = None
     
+    def supported_audio_rates(self):
+        """Meeting sample rates the selected microphone and speakers can both open"""
+        rates = []
+        for rate in AUDIO_SAMPLE_RATES:
+            try:
+                if self.input_device_index is not None:
+                    self.p_audio.is_format_supported(rate, input_device=self.input_device_index,
+                                                     input_channels=1, input_format=pyaudio.paInt16)
+                if self.output_device_index is not None:
+                    self.p_audio.is_format_supported(rate, output_device=self.output_device_index,
+                                                     output_channels=1, output_format=pyaudio.paInt16)
+                rates.append(rate)
+            except ValueError:
+                continue
+        return rates or list(AUDIO_SAMPLE_RATES)
+    
     def get_color_from_name(self, name):
         """Dark blue color palette for dark mode"""
         colors = [
@@ -2064,6 +2237,10 @@ class EnhancedMainWindow(QMainWindow):
             if self.client.client_id in self.video_widgets:
                 self.pip_video_container.layout().addWidget(self.video_widgets[self.client.client_id])
                 self.video_widgets[self.client.client_id].setVisible(True)
+            # Only the focused participant's video is needed
+            self.video_tiles = ([self.focused_client_id], self.focused_widget_container, 1, 1)
+            self.refresh_video_subscription()
+            self.refresh_video_subscription_after_layout()
             return
 
         grid_layout = self.main_view_stack.widget(0).layout()
@@ -2073,6 +2250,10 @@ class EnhancedMainWindow(QMainWindow):
         max_items = self.grid_size if self.grid_size > 0 else len(widgets_to_show)
         if max_items == 0: max_items = 1
         
+        # When the grid is paged, bring active speakers to the first page
+        if len(widgets_to_show) > max_items and self.active_speakers:
+            widgets_to_show.sort(key=lambda w: w.client_id not in self.active_speakers)
+        
         start_index = self.current_page * max_items
         end_index = start_index + max_items
         
@@ -2083,6 +2264,36 @@ class EnhancedMainWindow(QMainWindow):
         for i, widget in enumerate(page_widgets):
             widget.setVisible(True)
             grid_layout.addWidget(widget, i // cols, i % cols)
+        
+        # Ask the server to forward video only for the tiles on this page
+        rows = max(1, -(-len(page_widgets) // cols))
+        self.video_tiles = ([widget.client_id for widget in page_widgets],
+                            self.main_view_stack, cols, rows)
+        self.refresh_video_subscription()
+        self.refresh_video_subscription_after_layout()
+    
+    def refresh_video_subscription_after_layout(self):
+        """
+        Re-measure the tiles once Qt has laid out the new grid: sizes read
+        right after the widgets were added still describe the old layout, so
+        the server would keep forwarding the wrong simulcast layer
+        """
+        QTimer.singleShot(0, self.refresh_video_subscription)
+    
+    def refresh_video_subscription(self):
+        """
+        Send the rendered tiles and their on-screen size (device pixels) so the
+        server forwards each stream at the simulcast layer that fits the tile.
+        Called on layout changes and window resizes; the client only sends when
+        something the server cares about changed.
+        """
+        tiles = getattr(self, 'video_tiles', None)
+        if not tiles:
+            return
+        client_ids, container, cols, rows = tiles
+        scale = container.devicePixelRatioF()
+        tile_size = (container.width() * scale / cols, container.height() * scale / rows)
+        self.client.send_video_subscription(client_ids, tile_size)
 
     def toggle_focus_mode(self, client_id):
         is_exiting = self.focused_client_id == client_id
@@ -2100,11 +2311,18 @@ class EnhancedMainWindow(QMainWindow):
         self.resizeEvent(None)
         
     def resizeEvent(self, event):
+        """
+        Handle window resize: keep the picture-in-picture in its corner, send
+        the new tile size to the server and adjust chat message widths
+        """
+        if event: super().resizeEvent(event)
         if self.pip_video_container.isVisible():
             x = self.main_view_stack.width() - self.pip_video_container.width() - 20
             y = self.main_view_stack.height() - self.pip_video_container.height() - 20
             self.pip_video_container.move(x, y)
-        if event: super().resizeEvent(event)
+        self.refresh_video_subscription()
+        # Delay the adjustment to ensure layout is complete
+        QTimer.singleShot(100, self.adjust_message_widths)
         
     def toggle_camera(self, checked):
         if checked: self.start_video()
@@ -2116,12 +2334,14 @@ class EnhancedMainWindow(QMainWindow):
         
         VIDEO CAPTURE PROCESS:
         1. Open webcam using OpenCV (cv2.VideoCapture)
-        2. Start timer to capture frames periodically
-        3. Each frame is captured, compressed, and sent via UDP
+        2. Start the capture thread (CameraCaptureThread), which reads frames
+           and passes the newest one to the encoder through a FrameSlot
+        3. Start the encoder thread (VideoEncodeThread), which compresses and
+           sends frames via UDP; the GUI thread only paints the self-view
         
         PROTOCOL: UDP (User Datagram Protocol)
         - Video frames sent via UDP for low latency
-        - Frame rate: 20 FPS (50ms timer interval)
+        - Frame rate: 20 FPS (lowered by the rate controller under loss)
         - Resolution: 640x480 pixels
         - Compression: JPEG quality 60% (balance between quality and bandwidth)
         
@@ -2140,11 +2360,15 @@ class EnhancedMainWindow(QMainWindow):
             
             self.video_enabled = True
             self.cam_button.setChecked(True)
+            self.client.video_change.reset()  # First frame always goes out
             
-            # Create timer to capture frames at 20 FPS (every 50ms)
-            self.video_timer = QTimer(self)
-            self.video_timer.timeout.connect(self.capture_and_send_video)
-            self.video_timer.start(50)  # 50ms = 20 FPS
+            # Capture and encode off the GUI thread (newest frame wins between them)
+            slot = FrameSlot()
+            self.encode_thread = VideoEncodeThread(self.client, slot)
+            self.camera_thread = CameraCaptureThread(self.camera, slot, self.client.video_timings)
+            self.camera_thread.preview_ready.connect(self.show_local_video)
+            self.encode_thread.start()
+            self.camera_thread.start()
             
             # Notify server that video is starting (TCP control message)
             self.client.send_video_state(True)
@@ -2157,13 +2381,14 @@ class EnhancedMainWindow(QMainWindow):
         Stop video capture and release camera.
         
         CLEANUP:
-        - Stop capture timer
+        - Stop capture and encoder threads
         - Release camera resource
         - Clear video display
         - Notify server via TCP
         """
         self.video_enabled = False
-        if self.video_timer: self.video_timer.stop()
+        if self.camera_thread: self.camera_thread.stop(); self.camera_thread = None
+        if self.encode_thread: self.encode_thread.stop(); self.encode_thread = None
         if self.camera: self.camera.release(); self.camera = None
         self.cam_button.setChecked(False)
         if self.client.client_id in self.video_widgets:
@@ -2172,43 +2397,19 @@ class EnhancedMainWindow(QMainWindow):
         # Notify server that video stopped (TCP control message)
         self.client.send_video_state(False)
 
-    def capture_and_send_video(self):
+    def show_local_video(self, frame):
         """
-        Capture one video frame and send it to server via UDP.
-        
-        VIDEO PROCESSING:
-        1. Read frame from camera (OpenCV)
-        2. Resize to 640x480 (bandwidth optimization)
-        3. Compress to JPEG format (quality 60%)
-        4. Send compressed data via UDP
-        
-        PROTOCOL: UDP (User Datagram Protocol)
-        - Packet size: ~10-30 KB per frame (depends on content)
-        - Frame rate: 20 FPS
-        - Total bandwidth: ~200-600 KB/s per video stream
-        
-        COMPRESSION:
-        - JPEG quality 60%: Good balance between quality and size
-        - Higher quality = larger packets = more bandwidth
-        - Lower quality = smaller packets = less bandwidth but worse quality
+        Paint the self-view (GUI thread). Called at most at display rate by
+        CameraCaptureThread, which waits for this before emitting another.
         """
-        if self.camera and self.video_enabled:
-            # Read one frame from camera
-            ret, frame = self.camera.read()
-            if ret:
-                # Resize frame to 640x480 (reduces bandwidth)
-                frame = cv2.resize(frame, (640, 480))
-                
-                # Display frame locally
+        started = time.perf_counter()
+        try:
+            if self.video_enabled and self.client.client_id in self.video_widgets:
                 self.video_widgets[self.client.client_id].set_frame(frame)
-                
-                # Compress frame to JPEG format (quality 60%)
-                # Returns: (success, buffer)
-                _, buf = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 60])
-                
-                # Send compressed frame via UDP (stream type 'V' for video)
-                # UDP ensures low latency for real-time video
-                self.client.send_udp_stream('V', buf.tobytes())
+        finally:
+            if self.camera_thread:
+                self.camera_thread.preview_pending = False
+            self.client.video_timings.add('preview', time.perf_counter() - started)
 
     def toggle_microphone(self, checked):
         if checked: 
@@ -2234,10 +2435,10 @@ class EnhancedMainWindow(QMainWindow):
         
         PROTOCOL: UDP (User Datagram Protocol)
         - Audio packets sent via UDP for low latency
-        - Sample rate: 44.1 kHz (CD quality)
-        - Format: 16-bit PCM (uncompressed)
-        - Chunk size: 1024 samples (~23ms of audio)
-        - Packet size: ~2 KB per chunk
+        - Sample rate: negotiated per meeting (default 16 kHz wideband)
+        - Format: 16-bit PCM, compressed with the negotiated codec when sent
+        - Chunk size: one 10/20 ms frame (320 samples at 16 kHz / 20 ms)
+        - Packet size: 164-640 bytes per chunk at 16 kHz, depending on codec
         
         WHY UDP FOR AUDIO:
         - Real-time delivery critical for conversation
@@ -2314,27 +2515,31 @@ class EnhancedMainWindow(QMainWindow):
                     print("Opened audio stream with system default")
                 
                 # Stream opened successfully, start capturing
+                # Voice activity gate: silent chunks are not sent at all
+                vad = VoiceActivityDetector(frame_ms=self.client.audio_frame_ms)
+                mic_was_active = None
                 while self.audio_enabled:
                     try:
                         data = stream.read(self.audio_chunk_size, exception_on_overflow=False)
                         if self.audio_enabled and data:
-                            # Show mic activity
                             audio_data = np.frombuffer(data, dtype=np.int16)
-                            level = np.abs(audio_data).mean()
-                            if level > 100:  # Threshold for activity
-                                QMetaObject.invokeMethod(self.mic_activity_label, 'setStyleSheet', 
-                                                        Qt.ConnectionType.QueuedConnection,
-                                                        Q_ARG(str, "background-color: #0f0; border-radius: 6px;"))
-                            else:
+                            send, flags, level = vad.process(audio_data)
+                            
+                            # Show mic activity (only restyle when it changes)
+                            if vad.active != mic_was_active:
+                                mic_was_active = vad.active
+                                color = "#0f0" if vad.active else "#333"
                                 QMetaObject.invokeMethod(self.mic_activity_label, 'setStyleSheet', 
                                                         Qt.ConnectionType.QueuedConnection,
-                                                        Q_ARG(str, "background-color: #333; border-radius: 6px;"))
+                                                        Q_ARG(str, f"background-color: {color}; border-radius: 6px;"))
                             
-                            self.client.send_udp_stream('A', data)
+                            if send:
+                                self.client.send_udp_stream('A', data, flags)
                     except Exception as read_error:
                         if self.audio_enabled:
                             print(f"Audio read error: {read_error}")
                             break
+                print(f"Silence suppression: {vad.suppressed_ratio:.0%} of audio chunks not sent")
                 break  # Exit retry loop if successful
                         
             except Exception as e:
@@ -2385,11 +2590,13 @@ class EnhancedMainWindow(QMainWindow):
                 stream = self.p_audio.open(format=pyaudio.paInt16, channels=1, rate=self.audio_rate, 
                                          output=True, frames_per_buffer=self.audio_chunk_size)
             
+            # Paced by the device: each blocking write asks the client's jitter
+            # buffer for exactly one frame (silence while it is empty or priming)
+            silence = bytes(self.audio_chunk_size * 2)
+            playout = self.client.audio_playout
             while self.ui_running:
-                data = self.audio_output_queue.get()
-                if data is None: break
-                if stream: stream.write(data)
-                self.audio_output_queue.task_done()
+                frame = playout.pop()
+                stream.write(silence if frame is None else frame.tobytes())
         except Exception as e: 
             print(f"Audio output error: {e}")
         finally:
@@ -2445,7 +2652,8 @@ class EnhancedMainWindow(QMainWindow):
         self.screen_sharing = True
         self.screen_button.setChecked(True)
         
-        # Start screen capture thread (captures at 3 FPS)
+        # Start screen capture thread (captures at 3 FPS); the first frame is sent in full
+        self.client.screen_tiles.reset()
         self.screen_capture_thread = ScreenCaptureThread()
         self.screen_capture_thread.frame_ready.connect(self.send_screen_frame)
         self.screen_capture_thread.start()
@@ -2486,14 +2694,18 @@ class EnhancedMainWindow(QMainWindow):
         Send one screen frame to server via TCP.
         
         SCREEN FRAME PROCESSING:
-        1. Compress frame to JPEG (quality 60%)
-        2. Encode to base64 (for JSON transmission)
-        3. Send via TCP (guaranteed delivery)
+        1. Find the tiles that changed since the last frame (media/tiles.py);
+           stop here if nothing did
+        2. Compress each changed rectangle, or the whole frame for a full
+           refresh, to JPEG (quality 60%)
+        3. Send via TCP as one binary frame (guaranteed delivery)
         
         PROTOCOL: TCP (Transmission Control Protocol)
-        - Packet size: ~50-200 KB per frame (depends on screen content)
+        - Packet size: ~50-200 KB per full frame (depends on screen content),
+          a few KB for typical incremental updates, nothing for a static slide
         - Frame rate: 3 FPS (333ms between frames)
-        - Total bandwidth: ~150-600 KB/s
+        - Total bandwidth: ~150-600 KB/s while everything changes (video,
+          animations), close to zero while the screen is static
         
         WHY TCP:
         - Screen content (text, slides) must be clear and readable
@@ -2501,27 +2713,33 @@ class EnhancedMainWindow(QMainWindow):
         - Guaranteed delivery ensures quality
         - 3 FPS is slow enough that TCP latency is acceptable
         
-        BASE64 ENCODING:
-        - Binary image data encoded to text format
-        - Allows embedding in JSON messages
-        - Increases size by ~33% but ensures compatibility
+        BINARY FRAMES:
+        - JPEG bytes travel raw behind a small header (no base64, no JSON)
+        - Saves the ~33% base64 inflation and the encode/decode passes on
+          presenter, server and every viewer
         """
         if self.screen_sharing and hasattr(self.client, 'connected') and self.client.connected:
             # Display frame locally
             self.video_widgets[self.client.client_id].set_frame(frame)
             
-            # Compress frame to JPEG format (quality 60%)
-            # Balance between quality and bandwidth for screen content
-            _, buf = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 60])
+            # Only the regions that changed (None: static screen, send nothing)
+            update = self.client.screen_tiles.update(frame)
+            if update is None:
+                return
+            full, regions = update
             
-            # Encode to base64 for JSON transmission
-            # Base64 converts binary data to text format
-            frame_data = base64.b64encode(buf.tobytes()).decode('utf-8')
+            # Compress each region to JPEG format (quality 60%)
+            # Balance between quality and bandwidth for screen content
+            tiles = []
+            for x, y, region in regions:
+                _, buf = cv2.imencode('.jpg', np.ascontiguousarray(region),
+                                      [cv2.IMWRITE_JPEG_QUALITY, 60])
+                tiles.append((x, y, buf.tobytes()))
             
-            # Send screen frame via TCP for reliability and clarity
-            # TCP ensures the frame arrives without corruption
+            # Send screen update via TCP for reliability and clarity
+            # TCP ensures the update arrives without corruption
             try:
-                self.client.send_screen_frame_tcp(frame_data)
+                self.client.send_screen_frame_tcp(frame.shape[1], frame.shape[0], full, tiles)
             except Exception as e:
                 print(f"Error sending screen frame: {e}")
                 # If sending fails, stop screen sharing
@@ -2659,12 +2877,6 @@ class EnhancedMainWindow(QMainWindow):
                     if bubble:
                         bubble.setMaximumWidth(max_bubble_width)
     
-    def resizeEvent(self, event):
-        """Handle window resize to adjust message widths"""
-        super().resizeEvent(event)
-        # Delay the adjustment to ensure layout is complete
-        QTimer.singleShot(100, self.adjust_message_widths)
-    
     def show_typing_indicator(self, username):
         """Show typing indicator for a user"""
         if hasattr(self, 'typing_indicator'):
@@ -3189,6 +3401,14 @@ class EnhancedMainWindow(QMainWindow):
             self.video_widgets[msg['client_id']].set_mic_locked(False)
             self.update_participant_ui()
         
+        # Active speakers (server's top-K loudest talkers)
+        elif msg_type == 'active_speakers':
+            self.active_speakers = msg.get('speakers', [])
+            for cid, widget in self.video_widgets.items():
+                widget.set_speaking(cid in self.active_speakers)
+            if not self.focused_client_id and self.grid_size > 0 and len(self.video_widgets) > self.grid_size:
+                self.update_video_grid()
+        
         # Emoji reactions
         elif msg_type == 'emoji_reaction':
             client_id = msg.get('client_id')
@@ -3314,45 +3534,48 @@ class EnhancedMainWindow(QMainWindow):
             progress = msg.get('progress', 0)
             # Could update progress bar here if needed
 
-    @pyqtSlot(str, bytes)
-    def handle_video_stream(self, cid, data):
-        """Handle incoming video stream with proper error handling"""
+    @pyqtSlot(str, object)
+    def handle_screen_update(self, presenter_id, update):
+        """
+        Paint a screen sharing update (full frame or changed rectangles) onto
+        the presenter's persistent canvas and show the result.
+        """
         try:
-            if not data or len(data) == 0:
-                print(f"Warning: Empty video data received from {cid}")
+            if presenter_id not in self.video_widgets:
                 return
-                
+            if presenter_id != self.screen_canvas_owner:
+                self.screen_canvas.reset()
+                self.screen_canvas_owner = presenter_id
+            
+            regions = [(x, y, cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR))
+                       for x, y, data in update['tiles']]
+            width, height = update.get('width'), update.get('height')
+            if not width or not height:
+                # Sender without tile support: the full frame defines the size
+                if not update['full'] or regions[0][2] is None:
+                    return
+                height, width = regions[0][2].shape[:2]
+            
+            canvas = self.screen_canvas.apply(width, height, update['full'], regions)
+            if canvas is not None:
+                self.video_widgets[presenter_id].set_frame(canvas)
+        except Exception as e:
+            print(f"Error applying screen update from {presenter_id}: {e}")
+    
+    def handle_video_stream(self, cid, frame):
+        """
+        Paint a received video frame. Frames arrive already decoded: the
+        client's decode workers run cv2.imdecode and drop frames a sender
+        produces faster than they can be decoded, so the GUI thread only paints.
+        """
+        try:
             if cid not in self.video_widgets:
                 print(f"Warning: No video widget found for client {cid}")
                 return
-            
-            # Decode the video frame
-            try:
-                # Convert bytes to numpy array
-                nparr = np.frombuffer(data, np.uint8)
-                if len(nparr) == 0:
-                    print(f"Warning: Empty numpy array for client {cid}")
-                    return
-                
-                # Decode the image
-                frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                if frame is None:
-                    print(f"Warning: Failed to decode video frame from {cid}")
-                    return
-                
-                # Set the frame to the video widget
-                self.video_widgets[cid].set_frame(frame)
-                
-            except Exception as decode_error:
-                print(f"Error decoding video frame from {cid}: {decode_error}")
-                
+            self.video_widgets[cid].set_frame(frame)
         except Exception as e:
             print(f"Error handling video stream from {cid}: {e}")
 
-    @pyqtSlot(object, bytes)
-    def handle_audio_stream(self, cid, data):
-        if self.p_audio and self.audio_thread_output and self.audio_thread_output.is_alive(): self.audio_output_queue.put(data)
-
     def test_microphone(self):
         """Test microphone input with visual feedback"""
         if not self.p_audio:
@@ -3928,7 +4151,6 @@ class EnhancedMainWindow(QMainWindow):
 
     def closeEvent(self, event):
         self.ui_running = False; self.audio_enabled = False
-        if hasattr(self, 'audio_output_queue'): self.audio_output_queue.put(None)
         self.stop_video(); self.stop_screen_share(); self.client.disconnect()
         for f in self.incoming_files.values(): f['fh'].close()
         if self.audio_thread_input and self.audio_thread_input.is_alive(): self.audio_thread_input.join(0.2)